@@ -1,7 +1,8 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from ergosafe.db.models import User, Camera
 from ergosafe.db.database import init_db
@@ -18,10 +19,14 @@ from ergosafe.db.crud import (
 from ergosafe.streaming.stream_manager import (
     start_acquisition,
     get_stream,
+    get_snapshot,
     stop_camera_stream,
+    get_motion_stats,
+    get_cpu_report,
 )
-from ergosafe.influx.influx_conf.query_scores import query_latest_table
-from ergosafe.influx.influx_conf.influx_config import INFLUX_BUCKET
+from ergosafe.influx.score_cache import score_cache
+from ergosafe.influx.sender import get_sender
+from ergosafe.influx.writer import get_writer
 
 app = FastAPI()
 
@@ -66,11 +71,38 @@ def api_start_stream(camera_id: int):
 
 
 @app.get("/stream/{camera_id}")
-def api_get_stream(camera_id: int):
-    stream = get_stream(camera_id)
+async def api_get_stream(camera_id: int, quality: int | None = None, width: int | None = None):
+    # Async: os viewers aguardam no event loop em vez de ocuparem o threadpool
+    stream = await get_stream(camera_id, quality, width)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream não disponível")
     return stream
+
+
+@app.get("/snapshot/{camera_id}")
+async def api_get_snapshot(camera_id: int, quality: int | None = None, width: int | None = None,
+                           if_none_match: str | None = Header(None)):
+    snapshot = await get_snapshot(camera_id, quality, width)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Snapshot não disponível")
+    version, jpeg = snapshot
+    # ETag muda a cada frame publicado: 304 se o cliente já tem este frame
+    etag = f'"{camera_id}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=jpeg, media_type="image/jpeg", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match: "*" ou lista de tags separadas por vírgulas; comparação fraca (ignora W/)
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
  
  
 @app.get("/stop/{camera_id}")
@@ -78,6 +110,18 @@ def stop_acquisition(camera_id: int):
     stop_camera_stream(camera_id)
     return {"message": "Camera Stopped"}
 
+@app.get("/stats/motion")
+def api_get_motion_stats():
+    return get_motion_stats()
+
+@app.get("/stats/cpu")
+def api_get_cpu_report():
+    return get_cpu_report()
+
+@app.get("/stats/influx")
+def api_get_influx_stats():
+    return {"writer": get_writer().get_stats(), "sender": get_sender().get_stats(), "score_cache": score_cache.get_stats()}
+
 @app.delete("/users/{user_id}")
 def api_delete_user(user_id: int):
     if not delete_user(user_id):
@@ -94,18 +138,27 @@ def api_delete_camera(camera_id: int):
 #=== Scores ===
 
 @app.get("/reba/{camera_id}/{operator}")
-def api_get_reba_table(camera_id: int, operator: str):
+async def api_get_reba_table(camera_id: int, operator: str):
     camera_tag = f"camera_{camera_id}"
-    data = query_latest_table(bucket=INFLUX_BUCKET, measurement="reba_table", camera=camera_tag, operator=operator)
+    data = await _latest_table("reba_table", camera_tag, operator)
     if not data:
         raise HTTPException(status_code=404, detail="Dados REBA não encontrados")
     return {"camera": camera_tag, "operator": operator, "reba_table": data}
 
 
 @app.get("/rula/{camera_id}/{operator}")
-def api_get_rula_table(camera_id: int, operator: str):
+async def api_get_rula_table(camera_id: int, operator: str):
     camera_tag = f"camera_{camera_id}"
-    data = query_latest_table(bucket=INFLUX_BUCKET, measurement="rula_table", camera=camera_tag, operator=operator)
+    data = await _latest_table("rula_table", camera_tag, operator)
     if not data:
         raise HTTPException(status_code=404, detail="Dados RULA não encontrados")
     return {"camera": camera_tag, "operator": operator, "rula_table": data}
+
+
+async def _latest_table(measurement: str, camera_tag: str, operator: str):
+    # Cache em memória (publicada pelo pipeline); o InfluxDB só é consultado, no threadpool, em caso de falha
+    operator_tag = f"user_{operator}"
+    data = score_cache.peek(measurement, camera_tag, operator_tag)
+    if data is None:
+        data = await run_in_threadpool(score_cache.get, measurement, camera_tag, operator_tag)
+    return data
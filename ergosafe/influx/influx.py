@@ -1,14 +1,54 @@
 from influxdb_client import Point
-from ergosafe.influx.influx_conf.influx_client import write_api
-from ergosafe.influx.influx_conf.influx_config import INFLUX_BUCKET
+from ergosafe.influx.influx_conf.influx_config import INFLUX_POSE_SCHEMA
+from ergosafe.influx.writer import get_writer
 import time
 
 
-def send_pose_data(camera_id: str, keypoints: list, angles: list, reba_score=None, rula_score=None, operator="default"):
-    timestamp = int(time.time() * 1e9)
+def _with_track(point, track_id):
+    # Modo multi-pessoa: distingue as pessoas da mesma câmara
+    return point.tag("track", str(track_id)) if track_id is not None else point
+
+
+def wide_pose_point(camera_id: str, keypoints: list, angles: list, reba_score=None, rula_score=None,
+                    operator="default", track_id=None, timestamp=None):
+    """
+    Esquema "wide": um ponto pose por emissão, com campos kp{i}_x / kp{i}_y /
+    kp{i}_c, angle_{i}, reba_score e rula_score.
+    """
+    timestamp = int(time.time() * 1e9) if timestamp is None else timestamp
+    point = (
+        Point("pose")
+        .tag("camera", f"camera_{camera_id}")
+        .tag("operator", operator)
+        .time(timestamp)
+    )
+    for idx, (x, y, c) in enumerate(keypoints):
+        point.field(f"kp{idx}_x", float(x)).field(f"kp{idx}_y", float(y)).field(f"kp{idx}_c", float(c))
+    for i, a in enumerate(angles):
+        point.field(f"angle_{i}", float(a))
+    if reba_score is not None:
+        point.field("reba_score", float(reba_score))
+    if rula_score is not None:
+        point.field("rula_score", float(rula_score))
+    return _with_track(point, track_id)
+
+
+def pose_points(camera_id: str, keypoints: list, angles: list, reba_score=None, rula_score=None, operator="default",
+                track_id=None, timestamp=None, schema=INFLUX_POSE_SCHEMA):
+    """
+    Pontos de uma emissão no esquema configurado: keypoint / angle / score
+    ("points"), um único ponto pose ("wide") ou ambos ("both").
+    """
+    timestamp = int(time.time() * 1e9) if timestamp is None else timestamp
+    points = []
+    if schema in ("wide", "both"):
+        points.append(wide_pose_point(camera_id, keypoints, angles, reba_score, rula_score, operator, track_id,
+                                      timestamp))
+    if schema == "wide":
+        return points
     camera_tag = f"camera_{camera_id}"
 
-    # === Enviar keypoints ===
+    # === Keypoints ===
     for idx, (x, y, c) in enumerate(keypoints):
         point = (
             Point("keypoint")
@@ -20,9 +60,9 @@ def send_pose_data(camera_id: str, keypoints: list, angles: list, reba_score=Non
             .field("confidence", float(c))
             .time(timestamp)
         )
-        write_api.write(bucket=INFLUX_BUCKET, record=point)
+        points.append(_with_track(point, track_id))
 
-    # === Enviar ângulos ===
+    # === Ângulos ===
     for i, a in enumerate(angles):
         point = (
             Point("angle")
@@ -32,9 +72,9 @@ def send_pose_data(camera_id: str, keypoints: list, angles: list, reba_score=Non
             .field("value", float(a))
             .time(timestamp)
         )
-        write_api.write(bucket=INFLUX_BUCKET, record=point)
+        points.append(_with_track(point, track_id))
 
-    # === Enviar scores RULA/REBA (se disponíveis) ===
+    # === Scores RULA/REBA (se disponíveis) ===
     if reba_score is not None or rula_score is not None:
         score_point = (
             Point("score")
@@ -46,34 +86,57 @@ def send_pose_data(camera_id: str, keypoints: list, angles: list, reba_score=Non
             score_point = score_point.field("reba_score", float(reba_score))
         if rula_score is not None:
             score_point = score_point.field("rula_score", float(rula_score))
+        points.append(_with_track(score_point, track_id))
 
-        write_api.write(bucket=INFLUX_BUCKET, record=score_point)
+    return points
 
-def send_reba_table(camera_id: str, table: dict, operator="default"):
-    timestamp = int(time.time() * 1e9)
+
+def table_points(measurement: str, camera_id: str, table: dict, operator="default", track_id=None, timestamp=None):
+    """
+    Um ponto por label da tabela REBA / RULA (measurement "reba_table" / "rula_table").
+    """
+    timestamp = int(time.time() * 1e9) if timestamp is None else timestamp
     camera_tag = f"camera_{camera_id}"
+    points = []
     for label, value in table.items():
         point = (
-            Point("reba_table")
+            Point(measurement)
             .tag("camera", camera_tag)
             .tag("operator", operator)
             .tag("label", label)
             .field("value", float(value))
             .time(timestamp)
         )
-        write_api.write(bucket=INFLUX_BUCKET, record=point)
+        points.append(_with_track(point, track_id))
+    return points
+
+
+def write_points(points):
+    # Para a fila do escritor em lote (não bloqueia na rede)
+    return get_writer().write(point.to_line_protocol() for point in points)
+
+
+def send_pose_data(camera_id: str, keypoints: list, angles: list, reba_score=None, rula_score=None, operator="default",
+                   track_id=None):
+    write_points(pose_points(camera_id, keypoints, angles, reba_score, rula_score, operator, track_id))
 
 
-def send_rula_table(camera_id: str, table: dict, operator="default"):
+def send_reba_table(camera_id: str, table: dict, operator="default", track_id=None):
+    write_points(table_points("reba_table", camera_id, table, operator, track_id))
+
+
+def send_rula_table(camera_id: str, table: dict, operator="default", track_id=None):
+    write_points(table_points("rula_table", camera_id, table, operator, track_id))
+
+
+def send_emission(camera_id: str, keypoints: list, angles: list, reba_table: dict, rula_table: dict, reba_score=None,
+                  rula_score=None, operator="default", track_id=None):
+    """
+    Tabelas, keypoints, ângulos e scores de uma emissão com o mesmo timestamp,
+    entregues ao escritor de uma só vez (no máximo um pedido HTTP).
+    """
     timestamp = int(time.time() * 1e9)
-    camera_tag = f"camera_{camera_id}"
-    for label, value in table.items():
-        point = (
-            Point("rula_table")
-            .tag("camera", camera_tag)
-            .tag("operator", operator)
-            .tag("label", label)
-            .field("value", float(value))
-            .time(timestamp)
-        )
-        write_api.write(bucket=INFLUX_BUCKET, record=point)
\ No newline at end of file
+    points = (table_points("reba_table", camera_id, reba_table, operator, track_id, timestamp)
+              + table_points("rula_table", camera_id, rula_table, operator, track_id, timestamp)
+              + pose_points(camera_id, keypoints, angles, reba_score, rula_score, operator, track_id, timestamp))
+    return write_points(points)
@@ -1,11 +1,12 @@
 from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
-from .influx_config import INFLUX_URL, INFLUX_TOKEN, INFLUX_ORG
+from .influx_config import INFLUX_URL, INFLUX_TOKEN, INFLUX_ORG, INFLUX_TIMEOUT_MS
 
 client = InfluxDBClient(
     url=INFLUX_URL,
     token=INFLUX_TOKEN,
     org=INFLUX_ORG,
+    timeout=INFLUX_TIMEOUT_MS,
 )
 
 write_api = client.write_api(write_options=SYNCHRONOUS)
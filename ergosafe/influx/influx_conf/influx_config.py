@@ -1,4 +1,37 @@
+from pathlib import Path
+
 INFLUX_URL = "http://localhost:8086"
 INFLUX_TOKEN = "citin_token"
 INFLUX_ORG = "citin"
 INFLUX_BUCKET = "ergosafe"
+
+# Escrita em lote (ergosafe.influx.writer): linhas por pedido HTTP, intervalo
+# máximo entre envios (s), limite da fila (linhas) e política com a fila cheia
+INFLUX_BATCH_SIZE = 5000
+INFLUX_FLUSH_INTERVAL = 1.0
+INFLUX_MAX_QUEUED = 50000
+INFLUX_QUEUE_POLICY = "drop"  # "drop" ou "block"
+
+# Esquema dos keypoints / ângulos: "points" (um ponto keypoint / angle por índice),
+# "wide" (um ponto pose por emissão com kp5_x, kp5_y, kp5_c, angle_10, scores) ou
+# "both" (escreve os dois, durante a migração)
+INFLUX_POSE_SCHEMA = "points"
+
+# Spool em disco (ergosafe.influx.spool) para quando o InfluxDB está lento ou em baixo;
+# None desativa. Segmentos de INFLUX_SPOOL_SEGMENT_BYTES, no máximo INFLUX_SPOOL_MAX_BYTES
+# no diretório; o replay tenta a cada INFLUX_SPOOL_RETRY_INTERVAL s, em lotes de
+# INFLUX_SPOOL_REPLAY_BATCH linhas. Por defeito em spool/influx na raiz do projeto
+# (ao lado de ergosafe/), independente do diretório de trabalho
+INFLUX_SPOOL_DIR = str(Path(__file__).resolve().parents[3] / "spool" / "influx")
+INFLUX_SPOOL_SEGMENT_BYTES = 8 * 1024 * 1024
+INFLUX_SPOOL_MAX_BYTES = 512 * 1024 * 1024
+INFLUX_SPOOL_RETRY_INTERVAL = 5.0
+INFLUX_SPOOL_REPLAY_BATCH = 20000
+
+# Timeout dos pedidos HTTP ao InfluxDB (ms): um backend lento passa para o spool
+INFLUX_TIMEOUT_MS = 5000
+
+# Endpoints /reba e /rula (ergosafe.influx.score_cache): idade máxima (s) das tabelas
+# publicadas pelo pipeline e validade (s) das consultas ao InfluxDB feitas em caso de falha
+SCORE_CACHE_MAX_AGE = 300
+INFLUX_QUERY_TTL = 5.0
@@ -4,6 +4,7 @@ from ergosafe.influx.influx_conf.influx_config import (
     INFLUX_URL,
     INFLUX_TOKEN,
     INFLUX_ORG,
+    INFLUX_POSE_SCHEMA,
 )
 
 client = InfluxDBClient(url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG)
@@ -19,7 +20,6 @@ def query_latest_table(bucket: str, measurement: str, camera: str, operator: str
           |> last()
     '''
     result = query_api.query(org=INFLUX_ORG, query=query)
-    print(query)
 
     values = {}
     for table in result:
@@ -27,3 +27,90 @@ def query_latest_table(bucket: str, measurement: str, camera: str, operator: str
             key = record.values.get("label") or record.get_field()
             values[key] = record.get_value()
     return values
+
+
+# === Keypoints / ângulos (ver INFLUX_POSE_SCHEMA) ===
+
+def _pose_query(bucket: str, measurement: str, columns: str, camera: str, operator: str, start: str, stop: str,
+                latest: bool):
+    # Uma linha por emissão (e track) com os campos em colunas; latest: só a última
+    return f'''
+        from(bucket: "{bucket}")
+          |> range(start: {start}, stop: {stop})
+          |> filter(fn: (r) => r._measurement == "{measurement}")
+          |> filter(fn: (r) => r["camera"] == "{camera}")
+          |> filter(fn: (r) => r["operator"] == "{operator}")
+          {"|> last()" if latest else ""}
+          |> pivot(rowKey: ["_time"], columnKey: [{columns}], valueColumn: "_value")
+          |> group()
+          |> sort(columns: ["_time"])
+    '''
+
+
+def _rows(result):
+    rows = []
+    for table in result:
+        for record in table.records:
+            row = dict(record.values)
+            # Esquema "points": colunas "<index>_x" / "<angle_index>_value" -> nomes do esquema "wide"
+            idx = 0
+            while f"{idx}_x" in row:
+                row[f"kp{idx}_x"], row[f"kp{idx}_y"], row[f"kp{idx}_c"] = (
+                    row[f"{idx}_x"], row[f"{idx}_y"], row[f"{idx}_confidence"])
+                idx += 1
+            idx = 0
+            while f"{idx}_value" in row:
+                row[f"angle_{idx}"] = row[f"{idx}_value"]
+                idx += 1
+            rows.append(row)
+    return rows
+
+
+def _pose_from_row(row: dict):
+    keypoints, angles = [], []
+    while f"kp{len(keypoints)}_x" in row:
+        i = len(keypoints)
+        keypoints.append([row[f"kp{i}_x"], row[f"kp{i}_y"], row[f"kp{i}_c"]])
+    while f"angle_{len(angles)}" in row:
+        angles.append(row[f"angle_{len(angles)}"])
+    return {
+        "time": row.get("_time"),
+        "track": row.get("track"),
+        "keypoints": keypoints,
+        "angles": angles,
+        "reba_score": row.get("reba_score"),
+        "rula_score": row.get("rula_score"),
+    }
+
+
+def _query_poses(bucket, camera, operator, start, stop, schema, latest):
+    query_api = client.query_api()
+    if schema in ("wide", "both"):
+        queries = [("pose", '"_field"')]
+    else:
+        # Esquema "points": keypoints, ângulos e scores da mesma emissão partilham _time (e track)
+        queries = [("keypoint", '"index", "_field"'), ("angle", '"angle_index", "_field"'), ("score", '"_field"')]
+
+    merged = {}
+    for measurement, columns in queries:
+        query = _pose_query(bucket, measurement, columns, camera, operator, start, stop, latest)
+        for row in _rows(query_api.query(org=INFLUX_ORG, query=query)):
+            merged.setdefault((row.get("_time"), row.get("track")), {}).update(row)
+    return [_pose_from_row(merged[key]) for key in sorted(merged, key=lambda k: k[0])]
+
+
+def query_pose_range(bucket: str, camera: str, operator: str, start: str = "-1h", stop: str = "now()",
+                     schema: str = INFLUX_POSE_SCHEMA):
+    """
+    Emissões (keypoints, ângulos, scores) no intervalo, por ordem temporal.
+    camera e operator são os valores das tags (ex.: "camera_1", "user_3");
+    com schema "both" lê o esquema "wide".
+    """
+    return _query_poses(bucket, camera, operator, start, stop, schema, latest=False)
+
+
+def query_latest_pose(bucket: str, camera: str, operator: str, start: str = "-5m", schema: str = INFLUX_POSE_SCHEMA):
+    """
+    Última emissão de cada pessoa (track) da câmara, no mesmo formato.
+    """
+    return _query_poses(bucket, camera, operator, start, "now()", schema, latest=True)
@@ -0,0 +1,98 @@
+import time
+import threading
+from ergosafe.influx.influx_conf.influx_config import INFLUX_BUCKET, INFLUX_QUERY_TTL, SCORE_CACHE_MAX_AGE
+
+MEASUREMENTS = ("reba_table", "rula_table")
+
+
+class LatestScoreCache:
+    """
+    Últimas tabelas REBA / RULA por (câmara, operador), publicadas pelo
+    pipeline no momento da emissão. Os endpoints leem daqui; só quando a
+    câmara não tem tabelas recentes neste processo (ex.: depois de um
+    restart) consultam o InfluxDB, e guardam essa resposta durante ttl
+    segundos, incluindo respostas vazias.
+
+    Tabelas publicadas há mais de max_age segundos deixam de contar, como
+    na consulta ao InfluxDB (range -5m).
+    """
+
+    def __init__(self, query=None, ttl=INFLUX_QUERY_TTL, max_age=SCORE_CACHE_MAX_AGE):
+        self.query = query
+        self.ttl = ttl
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.tables = {}  # (measurement, camera, operator) -> (timestamp, tabela)
+        self.queried = {}  # (measurement, camera, operator) -> (expira, tabela)
+        self.query_locks = {}
+        self.stats = {"hits": 0, "query_hits": 0, "queries": 0}
+
+    def publish(self, camera, operator, tables, timestamp=None):
+        """
+        tables: {"reba_table": {label: valor}, "rula_table": {...}}; camera e
+        operator são os valores das tags (ex.: "camera_1", "user_3").
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            for measurement, table in tables.items():
+                key = (measurement, camera, operator)
+                if key in self.tables and self.tables[key][0] > timestamp:
+                    continue  # chegou fora de ordem
+                self.tables[key] = (timestamp, {label: float(value) for label, value in table.items()})
+
+    def peek(self, measurement, camera, operator):
+        """
+        Tabela em memória (publicada ou consultada há pouco) ou None; nunca
+        consulta o InfluxDB.
+        """
+        key = (measurement, camera, operator)
+        now = time.time()
+        with self.lock:
+            published = self.tables.get(key)
+            if published is not None and now - published[0] <= self.max_age:
+                self.stats["hits"] += 1
+                return published[1]
+            queried = self.queried.get(key)
+            if queried is not None and queried[0] > now:
+                self.stats["query_hits"] += 1
+                return queried[1]
+        return None
+
+    def get(self, measurement, camera, operator):
+        table = self.peek(measurement, camera, operator)
+        if table is not None or self.query is None:
+            return table
+
+        key = (measurement, camera, operator)
+        with self.lock:
+            query_lock = self.query_locks.setdefault(key, threading.Lock())
+        # Uma consulta por chave de cada vez: os restantes pedidos esperam pela resposta
+        with query_lock:
+            table = self.peek(measurement, camera, operator)
+            if table is not None:
+                return table
+            table = self.query(measurement, camera, operator)
+            with self.lock:
+                self.stats["queries"] += 1
+                self.queried[key] = (time.time() + self.ttl, table)
+            return table
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, cameras=len({key[1:] for key in self.tables}))
+
+
+def _query_influx(measurement, camera, operator):
+    from ergosafe.influx.influx_conf.query_scores import query_latest_table
+    # query_latest_table recebe o operador sem o prefixo "user_" da tag
+    return query_latest_table(bucket=INFLUX_BUCKET, measurement=measurement, camera=camera,
+                              operator=operator.removeprefix("user_"))
+
+
+# Cache do processo (API): alimentada pelo pipeline de cada câmara
+score_cache = LatestScoreCache(query=_query_influx)
+
+
+def publish_tables(cam_id, operator, reba_table, rula_table, timestamp=None):
+    score_cache.publish(f"camera_{cam_id}", operator, {"reba_table": reba_table, "rula_table": rula_table},
+                        timestamp)
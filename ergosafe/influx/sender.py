@@ -0,0 +1,93 @@
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from ergosafe.influx.influx import send_emission
+from ergosafe.influx.writer import get_writer
+
+logger = logging.getLogger("InfluxSender")
+
+# Emissões pendentes no máximo (uma por câmara / pessoa)
+MAX_PENDING = 256
+
+
+class EmissionSender:
+    """
+    Uma thread por processo que converte as emissões das câmaras em pontos
+    e as entrega ao escritor em lote. Cada câmara (e pessoa, em modo
+    multi-pessoa) tem no máximo uma emissão pendente: uma emissão nova
+    substitui a anterior ainda não enviada, pelo que threads e memória não
+    crescem quando o InfluxDB está lento.
+    """
+
+    def __init__(self, send=send_emission, max_pending=MAX_PENDING):
+        self.send = send
+        self.max_pending = max_pending
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()  # chave -> kwargs de send, pela ordem de chegada
+        self.closed = False
+        self.stats = {"submitted": 0, "sent": 0, "replaced": 0, "dropped": 0, "failed": 0}
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, key, **emission):
+        """
+        Agenda a emissão da chave (ex.: (câmara, track_id)); não bloqueia.
+        """
+        with self.condition:
+            self.stats["submitted"] += 1
+            if key in self.pending:
+                # Mantém o lugar na fila, com os dados mais recentes
+                self.stats["replaced"] += 1
+            elif len(self.pending) >= self.max_pending:
+                self.stats["dropped"] += 1
+                return False
+            self.pending[key] = emission
+            self.condition.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                if not self.pending:
+                    return
+                key, emission = self.pending.popitem(last=False)
+            try:
+                self.send(**emission)
+            except Exception as e:
+                logger.error(f"Erro ao enviar emissão {key}: {e}")
+                with self.condition:
+                    self.stats["failed"] += 1
+                continue
+            with self.condition:
+                self.stats["sent"] += 1
+
+    def close(self, timeout=5.0):
+        # Envia o que está pendente e termina a thread
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+    def get_stats(self):
+        with self.condition:
+            return dict(self.stats, pending=len(self.pending))
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender():
+    """
+    Sender partilhado por todas as câmaras do processo (criado no primeiro uso).
+    """
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            get_writer()  # atexit: o sender termina (e esvazia) antes do escritor
+            _sender = EmissionSender()
+            atexit.register(_sender.close)
+        return _sender
@@ -0,0 +1,163 @@
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger("InfluxSpool")
+
+OPEN_SUFFIX = ".open"
+CLOSED_SUFFIX = ".lp"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LineSpool:
+    """
+    Spool em disco de line protocol para quando o InfluxDB está lento ou em
+    baixo: as linhas são acrescentadas a um segmento aberto
+    (<pid>-<time_ns>-<n>.open), que passa a .lp (fechado) ao chegar a
+    segment_bytes.
+    Acima de max_bytes no diretório os segmentos fechados mais antigos são
+    apagados.
+
+    O diretório pode ser partilhado por vários processos (ex.: workers de
+    inferência): cada um escreve os seus segmentos e o replay reclama um
+    segmento fechado renomeando-o, pelo que só um processo o envia. Deve
+    existir um só LineSpool por processo para cada diretório.
+    """
+
+    def __init__(self, directory, segment_bytes, max_bytes):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.file = None
+        self.path = None
+        self.counter = 0
+        self.stats = {"spooled": 0, "replayed": 0, "discarded_bytes": 0}
+        self._recover()
+
+    def _recover(self):
+        # Segmentos abertos ou em replay por processos que já terminaram voltam ao spool.
+        # Com o pid deste processo só podem vir de uma execução anterior (pid
+        # reutilizado, ex.: pid 1 num container): ainda não abrimos nenhum segmento
+        for path in list(self.directory.iterdir()):
+            stem, _, suffix = path.name.partition(".")
+            if suffix == OPEN_SUFFIX[1:]:
+                owner = stem.split("-", 1)[0]
+            elif suffix.startswith("replaying-"):
+                owner = suffix.split("-", 1)[1]
+            else:
+                continue
+            if owner.isdigit() and (int(owner) == self.pid or not _pid_alive(int(owner))):
+                path.rename(path.with_name(stem + CLOSED_SUFFIX))
+
+    def _segment_name(self, suffix):
+        self.counter += 1
+        return self.directory / f"{self.pid}-{time.time_ns()}-{self.counter}{suffix}"
+
+    # === Escrita ===
+    def append(self, lines):
+        if not lines:
+            return
+        data = ("\n".join(lines) + "\n").encode()
+        with self.lock:
+            if self.file is None:
+                self.path = self._segment_name(OPEN_SUFFIX)
+                self.file = open(self.path, "ab")
+            self.file.write(data)
+            self.file.flush()
+            self.stats["spooled"] += len(lines)
+            if self.file.tell() >= self.segment_bytes:
+                self._rotate()
+            self._enforce_limit()
+
+    def _rotate(self):
+        # Fecha o segmento aberto: fica disponível para replay
+        if self.file is None:
+            return
+        self.file.close()
+        self.path.rename(self.path.with_suffix(CLOSED_SUFFIX))
+        self.file = self.path = None
+
+    def rotate(self):
+        with self.lock:
+            self._rotate()
+
+    def _enforce_limit(self):
+        segments = self._closed_segments()
+        total = sum(size for _, size in segments)
+        if self.file is not None:
+            total += self.file.tell()
+        for path, size in segments:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue  # reclamado por outro processo
+            total -= size
+            self.stats["discarded_bytes"] += size
+            logger.warning(f"Spool acima de {self.max_bytes} bytes: segmento {path.name} descartado")
+
+    # === Replay ===
+    def _closed_segments(self):
+        segments = []
+        for path in self.directory.glob(f"*{CLOSED_SUFFIX}"):
+            try:
+                segments.append((path, path.stat().st_size))
+            except FileNotFoundError:
+                continue
+        # Mais antigos primeiro (nome <pid>-<time_ns>-<n>)
+        return sorted(segments, key=lambda item: int(item[0].name.split("-")[1]))
+
+    def pending_bytes(self):
+        total = sum(size for _, size in self._closed_segments())
+        with self.lock:
+            if self.file is not None:
+                total += self.file.tell()
+        return total
+
+    def replay(self, send, batch_lines):
+        """
+        Envia os segmentos pendentes (o aberto também é fechado) com
+        send(lines), em lotes de batch_lines. Um segmento só é apagado depois
+        de enviado por inteiro; se send falhar, o segmento volta para o spool
+        e a exceção é propagada. Devolve o nº de linhas enviadas.
+        """
+        self.rotate()
+        sent = 0
+        for path, _ in self._closed_segments():
+            claimed = path.with_name(f"{path.stem}.replaying-{self.pid}")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue  # reclamado por outro processo
+            try:
+                with open(claimed, "rb") as fh:
+                    lines = fh.read().decode().splitlines()
+                for start in range(0, len(lines), batch_lines):
+                    send(lines[start:start + batch_lines])
+            except Exception:
+                # Volta ao spool completo: reenviar é seguro (mesma série e timestamp sobrescreve o ponto)
+                claimed.rename(path)
+                raise
+            claimed.unlink()
+            sent += len(lines)
+            with self.lock:
+                self.stats["replayed"] += len(lines)
+        return sent
+
+    def close(self):
+        self.rotate()
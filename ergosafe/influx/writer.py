@@ -0,0 +1,215 @@
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from ergosafe.influx.influx_conf.influx_config import (
+    INFLUX_BATCH_SIZE,
+    INFLUX_BUCKET,
+    INFLUX_FLUSH_INTERVAL,
+    INFLUX_MAX_QUEUED,
+    INFLUX_QUEUE_POLICY,
+    INFLUX_SPOOL_DIR,
+    INFLUX_SPOOL_MAX_BYTES,
+    INFLUX_SPOOL_REPLAY_BATCH,
+    INFLUX_SPOOL_RETRY_INTERVAL,
+    INFLUX_SPOOL_SEGMENT_BYTES,
+)
+from ergosafe.influx.spool import LineSpool
+
+logger = logging.getLogger("InfluxWriter")
+
+# Espera máxima do produtor com a política "block" antes de descartar
+BLOCK_TIMEOUT = 1.0
+
+
+class InfluxBatchWriter:
+    """
+    Escritor único por processo: os pontos (line protocol) de todas as
+    câmaras vão para uma fila limitada e uma thread envia-os em lotes, uma
+    escrita HTTP por lote, quando há batch_size linhas ou ao fim de
+    flush_interval segundos.
+
+    Com a fila cheia, policy "drop" descarta a emissão nova e "block"
+    espera até BLOCK_TIMEOUT por espaço (e descarta se não houver).
+
+    Com spool (LineSpool), o que não pode ser enviado não se perde: lotes
+    que falham e emissões que não cabem na fila vão para disco, e enquanto
+    o InfluxDB não responde os lotes seguem diretamente para o spool, sem
+    tentar a rede. Uma thread de replay tenta a cada retry_interval enviar
+    o spool em lotes grandes e, quando consegue, retoma o envio normal.
+    """
+
+    def __init__(self, write_api, bucket=INFLUX_BUCKET, batch_size=INFLUX_BATCH_SIZE,
+                 flush_interval=INFLUX_FLUSH_INTERVAL, max_queued=INFLUX_MAX_QUEUED, policy=INFLUX_QUEUE_POLICY,
+                 spool=None, retry_interval=INFLUX_SPOOL_RETRY_INTERVAL, replay_batch=INFLUX_SPOOL_REPLAY_BATCH):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Política de fila desconhecida: {policy}")
+        self.write_api = write_api
+        self.bucket = bucket
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.policy = policy
+        self.condition = threading.Condition()
+        self.lines = deque()
+        self.in_flight = 0
+        self.flush_requested = False
+        self.closed = False
+        self.stats = {"queued": 0, "flushed": 0, "dropped": 0, "failed": 0, "batches": 0, "spooled": 0,
+                      "replayed": 0}
+        self.spool = spool
+        self.retry_interval = retry_interval
+        self.replay_batch = replay_batch
+        # True depois de uma escrita falhar, até o replay voltar a conseguir enviar
+        self.backend_down = False
+        self.stopped = threading.Event()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        if spool is not None:
+            self.replay_thread = threading.Thread(target=self._replay_loop, daemon=True)
+            self.replay_thread.start()
+
+    def write(self, lines):
+        """
+        Junta as linhas (uma emissão) à fila. Devolve False se foram descartadas.
+        """
+        lines = list(lines)
+        with self.condition:
+            if not self._has_room(len(lines)) and self.policy == "block":
+                self.condition.wait_for(lambda: self._has_room(len(lines)) or self.closed, BLOCK_TIMEOUT)
+            if not self.closed and self._has_room(len(lines)):
+                self.lines.extend(lines)
+                self.stats["queued"] += len(lines)
+                if len(self.lines) >= self.batch_size:
+                    self.condition.notify_all()
+                return True
+            if self.spool is None:
+                self.stats["dropped"] += len(lines)
+                return False
+        # Fila cheia (backend lento): a emissão vai para o disco em vez de ser descartada
+        self._to_spool(lines)
+        return True
+
+    def _has_room(self, n):
+        # Uma emissão maior do que a fila inteira entra se a fila estiver vazia
+        return not self.lines or len(self.lines) + n <= self.max_queued
+
+    def _run(self):
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self.lines) < self.batch_size and not (self.closed or self.flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if self.closed and not self.lines:
+                    return
+                batch = [self.lines.popleft() for _ in range(min(self.batch_size, len(self.lines)))]
+                self.in_flight = len(batch)
+                if not self.lines:
+                    self.flush_requested = False
+                self.condition.notify_all()  # espaço livre para produtores em "block"
+            if batch:
+                self._send(batch)
+            with self.condition:
+                self.in_flight = 0
+                self.condition.notify_all()
+
+    def _send(self, batch):
+        if self.spool is not None and self.backend_down:
+            self._to_spool(batch)
+            return
+        try:
+            # Lista de linhas -> um único pedido HTTP
+            self.write_api.write(bucket=self.bucket, record=batch)
+        except Exception as e:
+            logger.error(f"Erro ao escrever {len(batch)} pontos no InfluxDB: {e}")
+            if self.spool is not None:
+                self.backend_down = True
+                self._to_spool(batch)
+                return
+            with self.condition:
+                self.stats["failed"] += len(batch)
+            return
+        with self.condition:
+            self.stats["flushed"] += len(batch)
+            self.stats["batches"] += 1
+
+    def _to_spool(self, batch):
+        try:
+            self.spool.append(batch)
+        except OSError as e:
+            logger.error(f"Erro ao escrever {len(batch)} pontos no spool: {e}")
+            with self.condition:
+                self.stats["failed"] += len(batch)
+            return
+        with self.condition:
+            self.stats["spooled"] += len(batch)
+
+    def _replay_loop(self):
+        while not self.stopped.wait(self.retry_interval):
+            if not self.spool.pending_bytes():
+                self.backend_down = False
+                continue
+            try:
+                sent = self.spool.replay(lambda lines: self.write_api.write(bucket=self.bucket, record=lines),
+                                         self.replay_batch)
+            except Exception as e:
+                if not self.backend_down:
+                    logger.warning(f"InfluxDB indisponível, a acumular no spool: {e}")
+                self.backend_down = True
+                continue
+            if self.backend_down:
+                logger.info(f"InfluxDB disponível: {sent} pontos reenviados do spool")
+            self.backend_down = False
+            with self.condition:
+                self.stats["replayed"] += sent
+
+    def flush(self, timeout=None):
+        """
+        Envia já o que está na fila e espera até estar tudo escrito.
+        """
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self.lines and not self.in_flight, timeout)
+
+    def close(self, timeout=5.0):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+        self.stopped.set()
+        if self.spool is not None:
+            self.replay_thread.join(timeout)
+            self.spool.close()  # o segmento aberto fica disponível para o próximo arranque
+
+    def get_stats(self):
+        with self.condition:
+            stats = dict(self.stats, pending=len(self.lines) + self.in_flight)
+        if self.spool is not None:
+            stats.update(spool_bytes=self.spool.pending_bytes(), backend_down=self.backend_down)
+        return stats
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """
+    Escritor partilhado por todas as câmaras do processo (criado no primeiro uso).
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            from ergosafe.influx.influx_conf.influx_client import write_api
+            spool = None
+            if INFLUX_SPOOL_DIR:
+                spool = LineSpool(INFLUX_SPOOL_DIR, INFLUX_SPOOL_SEGMENT_BYTES, INFLUX_SPOOL_MAX_BYTES)
+            _writer = InfluxBatchWriter(write_api, spool=spool)
+            atexit.register(_writer.close)
+        return _writer
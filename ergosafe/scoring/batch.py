@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def batch_size(data, fields):
+    """
+    Número de poses num lote (array estruturado ou dicionário de colunas).
+    """
+    if isinstance(data, np.ndarray):
+        return len(data)
+    for name in fields:
+        if name in data:
+            return len(np.atleast_1d(data[name]))
+    return 0
+
+
+def get_column(data, name, default, size, dtype=np.float64):
+    """
+    Devolve a coluna `name` com `size` elementos.
+
+    data pode ser um array estruturado (campos com o mesmo nome das chaves
+    usadas pelas funções escalares) ou um dicionário de arrays/escalares.
+    Campos em falta usam `default`, tal como o `.get()` das versões escalares.
+    """
+    if isinstance(data, np.ndarray) and data.dtype.names is not None:
+        value = data[name] if name in data.dtype.names else default
+    else:
+        value = data.get(name, default)
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (size,))
+
+
+def get_flags(data):
+    """
+    Ajustes de um lote: num array estruturado são campos do próprio array,
+    num dicionário ficam em "ajustes" (mesmo formato do input escalar).
+    """
+    if isinstance(data, np.ndarray):
+        return data
+    return data.get("ajustes", {})
+
+
+def inputs_to_batch(inputs, dtype, defaults):
+    """
+    Converte uma lista de dicionários no formato escalar (ângulos, carga_peso
+    e "ajustes") num array estruturado com o `dtype` indicado.
+    """
+    batch = np.zeros(len(inputs), dtype=dtype)
+    for name in dtype.names:
+        batch[name] = defaults.get(name, 0)
+    for i, data in enumerate(inputs):
+        ajustes = data.get("ajustes", {})
+        for name in dtype.names:
+            if name in data:
+                batch[name][i] = data[name]
+            elif name in ajustes:
+                batch[name][i] = ajustes[name]
+    return batch
@@ -1,3 +1,7 @@
+import numpy as np
+from ergosafe.scoring.batch import batch_size, get_column, get_flags, inputs_to_batch
+
+
 def reba_upper_arm_score(angle, shoulder_raised=False, abducted=False, leaning=False):
     if angle < 20:
         score = 1
@@ -66,76 +70,195 @@ def reba_leg_score(knee_bent=False, unstable=False):
         return 3
 
 
+# trunk (1-5), leg (1-4)
+TABLE_A = [
+    [1, 2, 3, 4],
+    [2, 2, 3, 4],
+    [3, 3, 4, 5],
+    [4, 4, 5, 6],
+    [5, 5, 6, 7],
+]
+
+# Neck vai de 1 a 3
+POSTURE_TABLE_A = [
+    [1, 2, 3],
+    [2, 3, 4],
+    [3, 4, 5],
+    [4, 5, 6],
+    [5, 6, 7],
+    [6, 7, 8],
+    [7, 8, 9],
+]
+
+TABLE_B = [
+    [1, 2, 2],
+    [2, 2, 3],
+    [2, 3, 3],
+    [3, 3, 4],
+    [3, 4, 4],
+    [4, 4, 5],
+]
+
+POSTURE_TABLE_B = [
+    [1, 2, 3],
+    [2, 3, 4],
+    [3, 4, 5],
+    [4, 5, 6],
+    [5, 6, 7],
+    [6, 7, 8],
+]
+
+TABLE_C = [
+    [1, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7],
+    [2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7],
+    [3, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 7],
+    [3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 7, 8],
+    [4, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 8],
+    [4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 8, 9],
+    [5, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 9],
+    [5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 9, 9],
+    [6, 6, 6, 7, 7, 8, 8, 9, 9, 9, 9, 9],
+    [6, 6, 7, 7, 8, 8, 9, 9, 9, 9, 9, 9],
+    [7, 7, 7, 8, 8, 9, 9, 9, 9, 9, 9, 9],
+    [7, 7, 8, 8, 9, 9, 9, 9, 9, 9, 9, 9],
+]
+
+
 def lookup_table_a(trunk_score, leg_score, neck_score):
-    # trunk (1-5), leg (1-4)
-    table_a = [
-        [1, 2, 3, 4],
-        [2, 2, 3, 4],
-        [3, 3, 4, 5],
-        [4, 4, 5, 6],
-        [5, 5, 6, 7],
-    ]
     trunk_index = min(trunk_score, 5) - 1
     leg_index = min(leg_score, 4) - 1
-    inter_score = table_a[trunk_index][leg_index]
-
-    # Neck vai de 1 a 3
-    posture_table = [
-        [1, 2, 3],
-        [2, 3, 4],
-        [3, 4, 5],
-        [4, 5, 6],
-        [5, 6, 7],
-        [6, 7, 8],
-        [7, 8, 9],
-    ]
+    inter_score = TABLE_A[trunk_index][leg_index]
+
     neck_index = min(neck_score, 3) - 1
-    return posture_table[inter_score - 1][neck_index]
+    return POSTURE_TABLE_A[inter_score - 1][neck_index]
 
 
 def lookup_table_b(upper_arm, lower_arm, wrist):
-    table_b = [
-        [1, 2, 2],
-        [2, 2, 3],
-        [2, 3, 3],
-        [3, 3, 4],
-        [3, 4, 4],
-        [4, 4, 5],
-    ]
     row = min(upper_arm, 6) - 1
     col1 = min(lower_arm, 3) - 1
-    score1 = table_b[row][col1]
+    score1 = TABLE_B[row][col1]
 
     wrist_index = min(wrist, 3) - 1
-    posture_table = [
-        [1, 2, 3],
-        [2, 3, 4],
-        [3, 4, 5],
-        [4, 5, 6],
-        [5, 6, 7],
-        [6, 7, 8],
-    ]
-    return posture_table[score1 - 1][wrist_index]
+    return POSTURE_TABLE_B[score1 - 1][wrist_index]
 
 
 def lookup_table_c(score_a, score_b):
-    table_c = [
-        [1, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7],
-        [2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7],
-        [3, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 7],
-        [3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 7, 8],
-        [4, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 8],
-        [4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 8, 9],
-        [5, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 9],
-        [5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 9, 9],
-        [6, 6, 6, 7, 7, 8, 8, 9, 9, 9, 9, 9],
-        [6, 6, 7, 7, 8, 8, 9, 9, 9, 9, 9, 9],
-        [7, 7, 7, 8, 8, 9, 9, 9, 9, 9, 9, 9],
-        [7, 7, 8, 8, 9, 9, 9, 9, 9, 9, 9, 9],
-    ]
     row = min(score_a, 12) - 1
     col = min(score_b, 12) - 1
-    return table_c[row][col]
+    return TABLE_C[row][col]
+
+
+# === Tabelas compiladas ===
+# As tabelas acima ficam como referência. No arranque são compiladas em
+# arrays densos indexados diretamente pelo score (1-based, índice 0 = inválido),
+# com o min(...) de cada lookup já incluído: cada eixo cobre todos os scores
+# que as funções reba_*_score conseguem produzir.
+
+MAX_TRUNK, MAX_LEG, MAX_NECK = 6, 4, 4
+MAX_UPPER_ARM, MAX_LOWER_ARM, MAX_WRIST = 6, 3, 3
+MAX_FORCE = 3
+MAX_SCORE_A, MAX_SCORE_B = 12, 12
+
+
+def _score_index(max_score, limit):
+    # índice 0 aponta para a primeira linha e é anulado depois da compilação
+    return np.clip(np.arange(max_score + 1), 1, limit) - 1
+
+
+def _compile_table_a():
+    trunk = _score_index(MAX_TRUNK, 5)[:, None, None]
+    leg = _score_index(MAX_LEG, 4)[None, :, None]
+    neck = _score_index(MAX_NECK, 3)[None, None, :]
+    inter_score = np.asarray(TABLE_A)[trunk, leg]
+    dense = np.asarray(POSTURE_TABLE_A)[inter_score - 1, neck]
+    dense[0, :, :] = dense[:, 0, :] = dense[:, :, 0] = 0
+    return np.ascontiguousarray(dense, dtype=np.int8)
+
+
+def _compile_table_b():
+    upper = _score_index(MAX_UPPER_ARM, 6)[:, None, None]
+    lower = _score_index(MAX_LOWER_ARM, 3)[None, :, None]
+    wrist = _score_index(MAX_WRIST, 3)[None, None, :]
+    score1 = np.asarray(TABLE_B)[upper, lower]
+    dense = np.asarray(POSTURE_TABLE_B)[score1 - 1, wrist]
+    dense[0, :, :] = dense[:, 0, :] = dense[:, :, 0] = 0
+    return np.ascontiguousarray(dense, dtype=np.int8)
+
+
+def _compile_table_c():
+    row = _score_index(MAX_SCORE_A, 12)[:, None]
+    col = _score_index(MAX_SCORE_B, 12)[None, :]
+    dense = np.asarray(TABLE_C)[row, col]
+    dense[0, :] = dense[:, 0] = 0
+    return np.ascontiguousarray(dense, dtype=np.int8)
+
+
+def _compile_final(table_a, table_b, table_c):
+    # REBA_FINAL[trunk, leg, neck, force, upper_arm, lower_arm, wrist]
+    score_a = table_a[:, :, :, None] + np.arange(MAX_FORCE + 1)
+    score_b = table_b
+    final = table_c[score_a[:, :, :, :, None, None, None], score_b[None, None, None, None]]
+    invalid = (table_a == 0)[:, :, :, None, None, None, None] | (table_b == 0)[None, None, None, None]
+    return np.ascontiguousarray(np.where(invalid, 0, final), dtype=np.int8)
+
+
+REBA_TABLE_A = _compile_table_a()
+REBA_TABLE_B = _compile_table_b()
+REBA_TABLE_C = _compile_table_c()
+REBA_FINAL = _compile_final(REBA_TABLE_A, REBA_TABLE_B, REBA_TABLE_C)
+
+
+def lookup_reba_final(trunk, leg, neck, force, upper_arm, lower_arm, wrist):
+    """
+    Score REBA final numa única leitura do tensor REBA_FINAL.
+    Aceita escalares ou arrays de inteiros (mesma forma).
+    """
+    return REBA_FINAL[trunk, leg, neck, force, upper_arm, lower_arm, wrist]
+
+
+def verify_compiled_tables():
+    """
+    Compara exaustivamente as tabelas compiladas com as funções lookup_table_*
+    (tabelas em listas). Lança RuntimeError à primeira diferença.
+    """
+    def check(name, got, expected, idx):
+        if got != expected:
+            raise RuntimeError(f"Tabela REBA {name} compilada difere em {idx}: {got} != {expected}")
+
+    for t in range(1, MAX_TRUNK + 1):
+        for l in range(1, MAX_LEG + 1):
+            for n in range(1, MAX_NECK + 1):
+                check("A", REBA_TABLE_A[t, l, n], lookup_table_a(t, l, n), (t, l, n))
+    for u in range(1, MAX_UPPER_ARM + 1):
+        for lo in range(1, MAX_LOWER_ARM + 1):
+            for w in range(1, MAX_WRIST + 1):
+                check("B", REBA_TABLE_B[u, lo, w], lookup_table_b(u, lo, w), (u, lo, w))
+    for a in range(1, MAX_SCORE_A + 1):
+        for b in range(1, MAX_SCORE_B + 1):
+            check("C", REBA_TABLE_C[a, b], lookup_table_c(a, b), (a, b))
+
+    # Tensor final: compara com a composição das funções de referência
+    score_a = np.zeros(REBA_FINAL.shape[:4], dtype=np.int64)
+    for t, l, n, f in np.ndindex(*score_a.shape):
+        if t and l and n:
+            score_a[t, l, n, f] = lookup_table_a(t, l, n) + f
+    score_b = np.zeros(REBA_FINAL.shape[4:], dtype=np.int64)
+    for u, lo, w in np.ndindex(*score_b.shape):
+        if u and lo and w:
+            score_b[u, lo, w] = lookup_table_b(u, lo, w)
+    reference = np.zeros(REBA_FINAL.shape, dtype=np.int64)
+    for a in np.unique(score_a[score_a > 0]):
+        for b in np.unique(score_b[score_b > 0]):
+            mask = (score_a == a)[:, :, :, :, None, None, None] & (score_b == b)[None, None, None, None]
+            reference[mask] = lookup_table_c(int(a), int(b))
+    mismatch = np.argwhere(REBA_FINAL != reference)
+    if len(mismatch):
+        idx = tuple(int(i) for i in mismatch[0])
+        check("final", REBA_FINAL[idx], reference[idx], idx)
+    return True
+
+
+verify_compiled_tables()
 
 
 def compute_reba_score(input_data):
@@ -166,8 +289,8 @@ def compute_reba_score(input_data):
                              side_bending=ajustes.get("trunk_side", False))
     leg = reba_leg_score(knee_bent=ajustes.get("knee_bent", False), unstable=ajustes.get("unstable", False))
 
-    score_a = lookup_table_a(trunk, leg, neck)
-    score_b = lookup_table_b(upper, lower, wrist)
+    score_a = int(REBA_TABLE_A[trunk, leg, neck])
+    score_b = int(REBA_TABLE_B[upper, lower, wrist])
 
     force_score = 0
     if peso > 0 and peso <= 5:
@@ -180,7 +303,7 @@ def compute_reba_score(input_data):
         force_score = 3
 
     score_a += force_score
-    reba_final = lookup_table_c(score_a, score_b)
+    reba_final = int(REBA_TABLE_C[score_a, score_b])
 
     table_score = {
         "upper_arm": upper,
@@ -193,4 +316,89 @@ def compute_reba_score(input_data):
         "score_b": score_b,
     }
     
-    return reba_final, table_score 
+    return reba_final, table_score
+
+
+# === Cálculo em lote ===
+
+REBA_ANGLE_FIELDS = ("upper_arm_angle", "lower_arm_angle", "wrist_angle", "neck_angle", "trunk_angle")
+REBA_FLAG_FIELDS = (
+    "shoulder_raised", "abducted", "leaning", "wrist_twisted",
+    "neck_twisted", "neck_side", "trunk_twisted", "trunk_side",
+    "knee_bent", "unstable",
+)
+
+REBA_BATCH_DTYPE = np.dtype(
+    [(name, np.float64) for name in REBA_ANGLE_FIELDS]
+    + [("carga_peso", np.float64)]
+    + [(name, np.bool_) for name in REBA_FLAG_FIELDS]
+)
+
+
+def reba_inputs_to_batch(inputs):
+    """
+    Converte uma lista de input_data (formato de compute_reba_score) num
+    array estruturado REBA_BATCH_DTYPE.
+    """
+    return inputs_to_batch(inputs, REBA_BATCH_DTYPE, {})
+
+
+def compute_reba_scores_batch(data):
+    """
+    Versão vetorizada de compute_reba_score para N poses.
+
+    data: array estruturado REBA_BATCH_DTYPE ou dicionário de colunas com as
+    mesmas chaves do input escalar (ângulos, carga_peso e "ajustes").
+    Devolve (reba_final, table_score) com arrays de inteiros de tamanho N.
+    """
+    n = batch_size(data, REBA_ANGLE_FIELDS)
+    ajustes = get_flags(data)
+
+    def angle(name):
+        return get_column(data, name, 0, n)
+
+    def flag(name):
+        return get_column(ajustes, name, False, n, dtype=bool).astype(np.int64)
+
+    # Mesmas condições (e ordem) das funções escalares, incluindo NaN
+    a = angle("upper_arm_angle")
+    upper = np.select([a < 20, a < 45, a < 90], [1, 2, 3], 4)
+    upper = upper + flag("shoulder_raised") + flag("abducted") - flag("leaning")
+    upper = np.maximum(1, upper)
+
+    a = angle("lower_arm_angle")
+    lower = np.where((a >= 60) & (a <= 100), 1, 2)
+
+    a = angle("wrist_angle")
+    wrist = np.where(a <= 15, 1, 2) + flag("wrist_twisted")
+
+    a = angle("neck_angle")
+    neck = np.where((a >= 0) & (a <= 20), 1, 2) + flag("neck_twisted") + flag("neck_side")
+
+    a = angle("trunk_angle")
+    trunk = np.select([a <= 0, a <= 20, a <= 60], [1, 2, 3], 4)
+    trunk = trunk + flag("trunk_twisted") + flag("trunk_side")
+
+    leg = np.where(flag("knee_bent") | flag("unstable"), 2, 1)
+
+    score_a = REBA_TABLE_A[trunk, leg, neck].astype(np.int64)
+    score_b = REBA_TABLE_B[upper, lower, wrist].astype(np.int64)
+
+    peso = get_column(data, "carga_peso", 0, n)
+    force_score = np.select([(peso > 0) & (peso <= 5), peso <= 10, peso <= 20], [0, 1, 2], 3)
+
+    reba_final = lookup_reba_final(trunk, leg, neck, force_score, upper, lower, wrist).astype(np.int64)
+    score_a = score_a + force_score
+
+    table_score = {
+        "upper_arm": upper,
+        "lower_arm": lower,
+        "wrist": wrist,
+        "neck": neck,
+        "trunk": trunk,
+        "leg": leg,
+        "score_a": score_a,
+        "score_b": score_b,
+    }
+
+    return reba_final, table_score
@@ -1,3 +1,7 @@
+import numpy as np
+from ergosafe.scoring.batch import batch_size, get_column, get_flags, inputs_to_batch
+
+
 def rula_upper_arm_score(angle, shoulder_raised=False, abducted=False, supported=False):
     if angle > 120:
         score = 6
@@ -73,50 +77,168 @@ def rula_leg_score(feet_supported=True):
     return 1 if feet_supported else 2
 
 
+# Matriz da Tabela A do formulário
+TABLE_A = [
+    [1, 2, 2, 3],
+    [2, 2, 3, 3],
+    [2, 3, 3, 4],
+    [3, 3, 4, 4],
+    [3, 4, 4, 5],
+    [4, 4, 5, 5],
+]
+
+TABLE_B = [
+    [1, 2, 3],
+    [2, 3, 3],
+    [3, 3, 4],
+    [3, 4, 4],
+    [4, 4, 5],
+    [5, 5, 6],
+]
+
+TABLE_C = [
+    [1, 2, 3, 3, 4, 4, 5],
+    [2, 3, 3, 4, 4, 5, 5],
+    [3, 3, 4, 4, 5, 5, 6],
+    [3, 4, 4, 5, 5, 6, 6],
+    [4, 4, 5, 5, 6, 6, 7],
+    [4, 5, 5, 6, 6, 7, 7],
+    [5, 5, 6, 6, 7, 7, 7],
+]
+
+
 def lookup_table_a(upper, lower, wrist):
-    # Matriz da Tabela A do formulário
-    table = [
-        [1, 2, 2, 3],
-        [2, 2, 3, 3],
-        [2, 3, 3, 4],
-        [3, 3, 4, 4],
-        [3, 4, 4, 5],
-        [4, 4, 5, 5],
-    ]
     row = min(upper, 6) - 1
     col = min(lower, 3) - 1
     wrist_index = min(wrist, 4) - 1
-    return table[row][col] + wrist_index
+    return TABLE_A[row][col] + wrist_index
 
 
 def lookup_table_b(neck, trunk, leg):
-    table = [
-        [1, 2, 3],
-        [2, 3, 3],
-        [3, 3, 4],
-        [3, 4, 4],
-        [4, 4, 5],
-        [5, 5, 6],
-    ]
     row = min(neck, 6) - 1
     col = min(trunk, 6) - 1
     leg_index = min(leg, 3) - 1
-    return table[row][leg_index]
+    return TABLE_B[row][leg_index]
 
 
 def lookup_table_c(score_a, score_b):
-    table_c = [
-        [1, 2, 3, 3, 4, 4, 5],
-        [2, 3, 3, 4, 4, 5, 5],
-        [3, 3, 4, 4, 5, 5, 6],
-        [3, 4, 4, 5, 5, 6, 6],
-        [4, 4, 5, 5, 6, 6, 7],
-        [4, 5, 5, 6, 6, 7, 7],
-        [5, 5, 6, 6, 7, 7, 7],
-    ]
     row = min(score_a, 7) - 1
     col = min(score_b, 7) - 1
-    return table_c[row][col]
+    return TABLE_C[row][col]
+
+
+# === Tabelas compiladas ===
+# As tabelas acima ficam como referência. No arranque são compiladas em
+# arrays densos indexados diretamente pelo score (1-based, índice 0 = inválido),
+# com o min(...) de cada lookup já incluído: cada eixo cobre todos os scores
+# que as funções rula_*_score conseguem produzir.
+
+MAX_UPPER_ARM, MAX_FOREARM, MAX_WRIST = 8, 3, 4
+MAX_NECK, MAX_LEG = 6, 3
+MAX_MUSCLE, MAX_LOAD = 1, 3
+MAX_SCORE_A, MAX_SCORE_B = 12, 7
+
+
+def _score_index(max_score, limit):
+    # índice 0 aponta para a primeira linha e é anulado depois da compilação
+    return np.clip(np.arange(max_score + 1), 1, limit) - 1
+
+
+def _compile_table_a():
+    upper = _score_index(MAX_UPPER_ARM, 6)[:, None, None]
+    lower = _score_index(MAX_FOREARM, 3)[None, :, None]
+    wrist = _score_index(MAX_WRIST, 4)[None, None, :]
+    dense = np.asarray(TABLE_A)[upper, lower] + wrist
+    dense[0, :, :] = dense[:, 0, :] = dense[:, :, 0] = 0
+    return np.ascontiguousarray(dense, dtype=np.int8)
+
+
+def _compile_table_b():
+    # Indexada por [neck, leg]: lookup_table_b não usa o tronco
+    neck = _score_index(MAX_NECK, 6)[:, None]
+    leg = _score_index(MAX_LEG, 3)[None, :]
+    dense = np.asarray(TABLE_B)[neck, leg]
+    dense[0, :] = dense[:, 0] = 0
+    return np.ascontiguousarray(dense, dtype=np.int8)
+
+
+def _compile_table_c():
+    row = _score_index(MAX_SCORE_A, 7)[:, None]
+    col = _score_index(MAX_SCORE_B, 7)[None, :]
+    dense = np.asarray(TABLE_C)[row, col]
+    dense[0, :] = dense[:, 0] = 0
+    return np.ascontiguousarray(dense, dtype=np.int8)
+
+
+def _compile_final(table_a, table_b, table_c):
+    # RULA_FINAL[upper_arm, forearm, wrist, neck, leg, muscle, load]
+    extra = np.arange(MAX_MUSCLE + 1)[:, None] + np.arange(MAX_LOAD + 1)[None, :]
+    score_a = table_a[:, :, :, None, None, None, None] + extra
+    final = table_c[score_a, table_b[None, None, None, :, :, None, None]]
+    invalid = (table_a == 0)[:, :, :, None, None, None, None] | (table_b == 0)[None, None, None, :, :, None, None]
+    return np.ascontiguousarray(np.where(invalid, 0, final), dtype=np.int8)
+
+
+RULA_TABLE_A = _compile_table_a()
+RULA_TABLE_B = _compile_table_b()
+RULA_TABLE_C = _compile_table_c()
+RULA_FINAL = _compile_final(RULA_TABLE_A, RULA_TABLE_B, RULA_TABLE_C)
+
+
+def lookup_rula_final(upper_arm, forearm, wrist, neck, leg, muscle_score, load_score):
+    """
+    Score RULA final numa única leitura do tensor RULA_FINAL.
+    Aceita escalares ou arrays de inteiros (mesma forma).
+    """
+    return RULA_FINAL[upper_arm, forearm, wrist, neck, leg, muscle_score, load_score]
+
+
+def verify_compiled_tables():
+    """
+    Compara exaustivamente as tabelas compiladas com as funções lookup_table_*
+    (tabelas em listas). Lança RuntimeError à primeira diferença.
+    """
+    def check(name, got, expected, idx):
+        if got != expected:
+            raise RuntimeError(f"Tabela RULA {name} compilada difere em {idx}: {got} != {expected}")
+
+    for u in range(1, MAX_UPPER_ARM + 1):
+        for lo in range(1, MAX_FOREARM + 1):
+            for w in range(1, MAX_WRIST + 1):
+                check("A", RULA_TABLE_A[u, lo, w], lookup_table_a(u, lo, w), (u, lo, w))
+    for n in range(1, MAX_NECK + 1):
+        for l in range(1, MAX_LEG + 1):
+            # o tronco é ignorado pela tabela B; testa os extremos
+            for t in (1, 6):
+                check("B", RULA_TABLE_B[n, l], lookup_table_b(n, t, l), (n, t, l))
+    for a in range(1, MAX_SCORE_A + 1):
+        for b in range(1, MAX_SCORE_B + 1):
+            check("C", RULA_TABLE_C[a, b], lookup_table_c(a, b), (a, b))
+
+    # Tensor final: compara com a composição das funções de referência
+    score_a = np.zeros(RULA_FINAL.shape[:3], dtype=np.int64)
+    for u, lo, w in np.ndindex(*score_a.shape):
+        if u and lo and w:
+            score_a[u, lo, w] = lookup_table_a(u, lo, w)
+    score_b = np.zeros(RULA_FINAL.shape[3:5], dtype=np.int64)
+    for n, l in np.ndindex(*score_b.shape):
+        if n and l:
+            score_b[n, l] = lookup_table_b(n, 1, l)
+    extra = np.arange(MAX_MUSCLE + 1)[:, None] + np.arange(MAX_LOAD + 1)[None, :]
+    row = score_a[:, :, :, None, None, None, None] + extra
+    reference = np.zeros(RULA_FINAL.shape, dtype=np.int64)
+    for a in np.unique(row[row > extra]):
+        for b in np.unique(score_b[score_b > 0]):
+            mask = (row == a) & (score_a > 0)[:, :, :, None, None, None, None] & (score_b == b)[None, None, None, :, :, None, None]
+            reference[mask] = lookup_table_c(int(a), int(b))
+    mismatch = np.argwhere(RULA_FINAL != reference)
+    if len(mismatch):
+        idx = tuple(int(i) for i in mismatch[0])
+        check("final", RULA_FINAL[idx], reference[idx], idx)
+    return True
+
+
+verify_compiled_tables()
 
 
 def compute_rula_score(data):
@@ -152,8 +274,8 @@ def compute_rula_score(data):
 
     leg = rula_leg_score(feet_supported=ajustes.get("feet_supported", True))
 
-    score_a = lookup_table_a(upper, lower, wrist)
-    score_b = lookup_table_b(neck, trunk, leg)
+    score_a = int(RULA_TABLE_A[upper, lower, wrist])
+    score_b = int(RULA_TABLE_B[neck, leg])
 
     muscle_score = 1 if ajustes.get("static_posture", False) or ajustes.get("repetitive", False) else 0
     load_score = 0
@@ -165,7 +287,7 @@ def compute_rula_score(data):
     elif carga > 22:
         load_score = 3
 
-    final_score = lookup_table_c(score_a + muscle_score + load_score, score_b)
+    final_score = int(RULA_TABLE_C[score_a + muscle_score + load_score, score_b])
     table_score = {
         "upper_arm": upper,
         "forearm": lower,
@@ -179,4 +301,94 @@ def compute_rula_score(data):
         "load_score": load_score
     }   
 
-    return final_score, table_score 
\ No newline at end of file
+    return final_score, table_score
+
+
+# === Cálculo em lote ===
+
+RULA_ANGLE_FIELDS = ("upper_arm_angle", "forearm_angle", "wrist_angle", "neck_angle", "trunk_angle")
+RULA_FLAG_FIELDS = (
+    "shoulder_raised", "abducted", "arm_supported", "midline", "wrist_bent",
+    "neck_twisted", "neck_side", "trunk_twisted", "trunk_side",
+    "feet_supported", "static_posture", "repetitive",
+)
+
+RULA_BATCH_DTYPE = np.dtype(
+    [(name, np.float64) for name in RULA_ANGLE_FIELDS]
+    + [("carga_peso", np.float64), ("wrist_twist", np.int64)]
+    + [(name, np.bool_) for name in RULA_FLAG_FIELDS]
+)
+
+
+def rula_inputs_to_batch(inputs):
+    """
+    Converte uma lista de dicionários (formato de compute_rula_score) num
+    array estruturado RULA_BATCH_DTYPE.
+    """
+    return inputs_to_batch(inputs, RULA_BATCH_DTYPE, {"feet_supported": True})
+
+
+def compute_rula_scores_batch(data):
+    """
+    Versão vetorizada de compute_rula_score para N poses.
+
+    data: array estruturado RULA_BATCH_DTYPE ou dicionário de colunas com as
+    mesmas chaves do input escalar (ângulos, carga_peso e "ajustes").
+    Devolve (final_score, table_score) com arrays de inteiros de tamanho N.
+    """
+    n = batch_size(data, RULA_ANGLE_FIELDS)
+    ajustes = get_flags(data)
+
+    def angle(name):
+        return get_column(data, name, 0, n)
+
+    def flag(name, default=False):
+        return get_column(ajustes, name, default, n, dtype=bool).astype(np.int64)
+
+    # Mesmas condições (e ordem) das funções escalares, incluindo NaN
+    a = angle("upper_arm_angle")
+    upper = np.select([a > 120, a > 100, a > 90, a > 60, a > 20], [6, 5, 4, 3, 2], 1)
+    upper = upper + flag("shoulder_raised") + flag("abducted") - flag("arm_supported")
+    upper = np.maximum(1, upper)
+
+    a = angle("forearm_angle")
+    lower = np.where((a >= 60) & (a <= 100), 1, 2) + flag("midline")
+
+    a = angle("wrist_angle")
+    twist = get_column(ajustes, "wrist_twist", 0, n)
+    wrist = np.where(a <= 15, 1, 2) + flag("wrist_bent")
+    wrist = wrist + np.select([twist == 1, twist == 2], [1, 2], 0)
+    wrist = np.minimum(wrist, 4)
+
+    a = angle("neck_angle")
+    neck = np.select([a > 20, a > 10], [3, 2], 1) + flag("neck_twisted") + flag("neck_side")
+
+    a = angle("trunk_angle")
+    trunk = np.select([a > 60, a > 20, a > 10], [4, 3, 2], 1)
+    trunk = trunk + flag("trunk_twisted") + flag("trunk_side")
+
+    leg = np.where(flag("feet_supported", True), 1, 2)
+
+    score_a = RULA_TABLE_A[upper, lower, wrist].astype(np.int64)
+    # Tal como lookup_table_b, o tronco não entra na tabela B
+    score_b = RULA_TABLE_B[neck, leg].astype(np.int64)
+
+    muscle_score = flag("static_posture") | flag("repetitive")
+    carga = get_column(data, "carga_peso", 0, n)
+    load_score = np.select([(carga > 4) & (carga <= 10), (carga > 10) & (carga <= 22), carga > 22], [1, 2, 3], 0)
+
+    final_score = lookup_rula_final(upper, lower, wrist, neck, leg, muscle_score, load_score).astype(np.int64)
+    table_score = {
+        "upper_arm": upper,
+        "forearm": lower,
+        "wrist": wrist,
+        "neck": neck,
+        "trunk": trunk,
+        "leg": leg,
+        "score_a": score_a,
+        "score_b": score_b,
+        "muscle_score": muscle_score,
+        "load_score": load_score,
+    }
+
+    return final_score, table_score
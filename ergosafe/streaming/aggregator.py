@@ -0,0 +1,212 @@
+import time
+
+# REBA final vai de 1 a 12 e RULA de 1 a 7: um histograma pequeno chega
+MAX_SCORE = 15
+
+
+class ScoreHistogram:
+    """
+    Contagens por score inteiro. add/remove em O(1); mediana, percentis e
+    moda percorrem no máximo MAX_SCORE + 1 posições.
+    """
+
+    def __init__(self, max_score=MAX_SCORE):
+        self.counts = [0] * (max_score + 1)
+        self.total = 0
+
+    def add(self, score, n=1):
+        self.counts[score] += n
+        self.total += n
+
+    def remove(self, score, n=1):
+        self.counts[score] -= n
+        self.total -= n
+
+    def subtract(self, other):
+        for score, n in enumerate(other.counts):
+            if n:
+                self.counts[score] -= n
+        self.total -= other.total
+
+    def clear(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+
+    def kth(self, k):
+        # k-ésimo menor score (0-based)
+        acc = 0
+        for score, n in enumerate(self.counts):
+            acc += n
+            if acc > k:
+                return score
+        raise IndexError(k)
+
+    def percentile(self, q):
+        # Interpolação linear, igual a np.percentile sobre a lista de scores
+        if not self.total:
+            return None
+        pos = (self.total - 1) * q / 100
+        low_index = int(pos)
+        frac = pos - low_index
+        low = self.kth(low_index)
+        if frac == 0:
+            return float(low)
+        high = self.kth(low_index + 1)
+        return low + (high - low) * frac
+
+    def median(self):
+        return self.percentile(50)
+
+    def mode(self):
+        if not self.total:
+            return None
+        return max(range(len(self.counts)), key=self.counts.__getitem__)
+
+
+class ScoreAggregator:
+    """
+    Agrega vários scores por frame (ex.: "reba" e "rula") numa janela e emite
+    um resumo quando a janela fecha.
+
+    - window_frames: janela por número de frames (por defeito 20)
+    - window_seconds: janela por tempo (substitui window_frames)
+    - sliding: janela deslizante; emite a cada `emit_every` frames depois de a
+      janela estar cheia. Em janelas por tempo a expiração é feita em
+      `time_buckets` blocos de window_seconds / time_buckets.
+    - statistic: "median", "mode" ou um percentil numérico (ex.: 90)
+    - emit_on_change: só emite quando algum score agregado muda
+
+    Memória constante: histogramas por score (+ anel de scores ou de blocos
+    de tempo em janelas deslizantes) e apenas a última tabela de cada score.
+    """
+
+    def __init__(self, names=("reba", "rula"), window_frames=20, window_seconds=None,
+                 sliding=False, emit_every=1, statistic="median", emit_on_change=False,
+                 max_score=MAX_SCORE, time_buckets=10):
+        self.names = tuple(names)
+        self.window_frames = window_frames
+        self.window_seconds = window_seconds
+        self.sliding = sliding
+        self.emit_every = emit_every
+        self.statistic = statistic
+        self.emit_on_change = emit_on_change
+        self.max_score = max_score
+
+        self.histograms = {name: ScoreHistogram(max_score) for name in self.names}
+        self.latest_tables = {}
+        self.last_emitted = None
+        self.frames = 0
+        self.window_start = None
+
+        if sliding and window_seconds is None:
+            self.ring = {name: [None] * window_frames for name in self.names}
+            self.ring_pos = 0
+        if sliding and window_seconds is not None:
+            self.time_buckets = time_buckets
+            self.bucket_len = window_seconds / time_buckets
+            self.buckets = [
+                {name: ScoreHistogram(max_score) for name in self.names} for _ in range(time_buckets)
+            ]
+            self.bucket_ids = [None] * time_buckets
+            self.current_bucket = None
+
+    def summary(self, name):
+        histogram = self.histograms[name]
+        if self.statistic == "median":
+            return histogram.median()
+        if self.statistic == "mode":
+            return histogram.mode()
+        return histogram.percentile(float(self.statistic))
+
+    def update(self, scores, tables=None, now=None):
+        """
+        scores: dicionário nome -> score inteiro deste frame
+        tables: dicionário nome -> tabela (só a última é guardada)
+        Devolve None ou {"scores": {nome: valor}, "tables": {...}, "count": n}.
+        """
+        if tables:
+            self.latest_tables.update(tables)
+        if self.window_seconds is not None and now is None:
+            now = time.monotonic()
+
+        if not self.sliding:
+            window_closed = self._add_tumbling(scores, now)
+        elif self.window_seconds is None:
+            window_closed = self._add_sliding_frames(scores)
+        else:
+            window_closed = self._add_sliding_time(scores, now)
+
+        if not window_closed:
+            return None
+
+        count = self.histograms[self.names[0]].total
+        values = {name: self.summary(name) for name in self.names}
+        if not self.sliding:
+            for histogram in self.histograms.values():
+                histogram.clear()
+
+        if self.emit_on_change and values == self.last_emitted:
+            return None
+        self.last_emitted = values
+        return {"scores": values, "tables": dict(self.latest_tables), "count": count}
+
+    def _add_tumbling(self, scores, now):
+        for name in self.names:
+            self.histograms[name].add(scores[name])
+        self.frames += 1
+
+        if self.window_seconds is None:
+            if self.frames < self.window_frames:
+                return False
+        else:
+            if self.window_start is None:
+                self.window_start = now
+            if now - self.window_start < self.window_seconds:
+                return False
+            self.window_start = now
+        self.frames = 0
+        return True
+
+    def _add_sliding_frames(self, scores):
+        pos = self.ring_pos
+        for name in self.names:
+            ring = self.ring[name]
+            if ring[pos] is not None:
+                self.histograms[name].remove(ring[pos])
+            ring[pos] = scores[name]
+            self.histograms[name].add(scores[name])
+        self.ring_pos = (pos + 1) % self.window_frames
+
+        self.frames += 1
+        if self.frames < self.window_frames:
+            return False
+        return (self.frames - self.window_frames) % self.emit_every == 0
+
+    def _add_sliding_time(self, scores, now):
+        bucket_id = int(now // self.bucket_len)
+        if bucket_id != self.current_bucket:
+            self._expire_buckets(bucket_id)
+            self.current_bucket = bucket_id
+            if self.window_start is None:
+                self.window_start = now
+
+        slot = self.buckets[bucket_id % self.time_buckets]
+        for name in self.names:
+            slot[name].add(scores[name])
+            self.histograms[name].add(scores[name])
+
+        self.frames += 1
+        if now - self.window_start < self.window_seconds:
+            return False
+        return self.frames % self.emit_every == 0
+
+    def _expire_buckets(self, bucket_id):
+        oldest = bucket_id - self.time_buckets + 1
+        for i, stored_id in enumerate(self.bucket_ids):
+            expired = stored_id is not None and stored_id < oldest
+            if expired or (i == bucket_id % self.time_buckets and stored_id != bucket_id):
+                for name in self.names:
+                    self.histograms[name].subtract(self.buckets[i][name])
+                    self.buckets[i][name].clear()
+                self.bucket_ids[i] = None
+        self.bucket_ids[bucket_id % self.time_buckets] = bucket_id
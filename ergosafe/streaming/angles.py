@@ -0,0 +1,198 @@
+import numpy as np
+
+# Índices COCO (YOLO pose)
+NOSE = 0
+L_SHOULDER, R_SHOULDER = 5, 6
+L_ELBOW, R_ELBOW = 7, 8
+L_WRIST, R_WRIST = 9, 10
+L_HIP, R_HIP = 11, 12
+L_KNEE, R_KNEE = 13, 14
+L_ANKLE, R_ANKLE = 15, 16
+
+# YOLO (17) -> slots MediaPipe (33) usados por YoloPoseSkeleton.compute_angles
+YOLO_TO_MEDIAPIPE = {
+    0: 0,   # nose
+    5: 11,  # left_shoulder
+    6: 12,  # right_shoulder
+    7: 13,  # left_elbow
+    8: 14,  # right_elbow
+    9: 15,  # left_wrist
+    10: 16, # right_wrist
+    11: 23, # left_hip
+    12: 24, # right_hip
+    13: 25, # left_knee
+    14: 26, # right_knee
+    15: 27, # left_ankle
+    16: 28, # right_ankle
+}
+
+NUM_ANGLES = 15
+SHOULDER_DIST = 0.3
+
+# Keypoints de que cada ângulo depende (para mascarar por elemento)
+ANGLE_JOINTS = [
+    (L_SHOULDER, L_ELBOW, L_WRIST),                       # 0 cotovelo esquerdo
+    (R_SHOULDER, R_ELBOW, R_WRIST),                       # 1 cotovelo direito
+    (),                                                   # 2 pulso (sem landmark da mão)
+    (),                                                   # 3
+    (L_ELBOW, L_SHOULDER, L_HIP),                         # 4 braço esquerdo
+    (R_ELBOW, R_SHOULDER, R_HIP),                         # 5 braço direito
+    (L_SHOULDER, L_HIP, L_KNEE),                          # 6 anca esquerda
+    (R_SHOULDER, R_HIP, R_KNEE),                          # 7 anca direita
+    (L_HIP, L_KNEE, L_ANKLE),                             # 8 joelho esquerdo
+    (R_HIP, R_KNEE, R_ANKLE),                             # 9 joelho direito
+    (NOSE, L_SHOULDER, R_SHOULDER, L_HIP, R_HIP),         # 10 tronco
+    (NOSE, L_SHOULDER, R_SHOULDER, L_HIP, R_HIP),         # 11 pescoço
+    (L_SHOULDER, R_SHOULDER, L_HIP, R_HIP, L_KNEE, R_KNEE),  # 12 inclinação
+    (),                                                   # 13
+    (L_SHOULDER, R_SHOULDER),                             # 14 torção do tronco
+]
+
+ANGLE_DEPENDENCIES = np.zeros((NUM_ANGLES, 17), dtype=np.uint8)
+for _angle, _joints in enumerate(ANGLE_JOINTS):
+    ANGLE_DEPENDENCIES[_angle, list(_joints)] = 1
+
+
+# Pontos derivados, acrescentados depois dos 17 keypoints
+MID_SHOULDER, MID_HIP, NECK_BASE, MID_KNEE = 17, 18, 19, 20
+
+# Ângulos por declive (eq() da versão escalar): (ângulo, p1, p2, p3, inv, sinal, offset)
+# resultado = sinal * eq(p1, p2, p3, inv) + offset
+SLOPE_ANGLES = np.array([
+    (0, L_SHOULDER, L_ELBOW, L_WRIST, 0, -1, 180),
+    (1, R_SHOULDER, R_ELBOW, R_WRIST, 0, 1, 0),
+    (4, L_ELBOW, L_SHOULDER, L_HIP, 0, 1, -15),
+    (5, R_ELBOW, R_SHOULDER, R_HIP, 1, 1, -15),
+    (6, L_SHOULDER, L_HIP, L_KNEE, 1, 1, 0),
+    (7, R_SHOULDER, R_HIP, R_KNEE, 0, 1, 0),
+    (8, L_HIP, L_KNEE, L_ANKLE, 0, 1, 0),
+    (9, R_HIP, R_KNEE, R_ANKLE, 0, -1, 180),
+    (12, MID_SHOULDER, MID_HIP, MID_KNEE, 0, 1, -15),
+])
+_SLOPE_INDEX = SLOPE_ANGLES[:, 0]
+_SLOPE_POINTS = SLOPE_ANGLES[:, 1:4]
+_SLOPE_INV = SLOPE_ANGLES[:, 4].astype(bool)
+_SLOPE_SIGN = SLOPE_ANGLES[:, 5].astype(np.float64)
+_SLOPE_OFFSET = SLOPE_ANGLES[:, 6].astype(np.float64)
+
+
+def angles_from_points(p):
+    """
+    p: (N, 17, 3) coordenadas x, y, z (normalizadas) em indexação COCO.
+    Devolve (N, 15) com os mesmos ângulos de YoloPoseSkeleton.compute_angles.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    lead = p.shape[:-2]
+    p = p.reshape(-1, 17, 3)
+    n = len(p)
+
+    points = np.empty((n, 21, 3), dtype=np.float64)
+    points[:, :17] = p
+    points[:, MID_SHOULDER] = (p[:, L_SHOULDER] + p[:, R_SHOULDER]) / 2
+    points[:, MID_HIP] = (p[:, L_HIP] + p[:, R_HIP]) / 2
+    points[:, NECK_BASE] = (points[:, MID_SHOULDER] + points[:, MID_HIP]) / 2
+    points[:, MID_KNEE] = (p[:, L_KNEE] + p[:, R_KNEE]) / 2
+
+    angles = np.zeros((n, NUM_ANGLES), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # eq(): todos os ângulos por declive de uma vez, (n, 9, 3 pontos, xyz)
+        t = points[:, _SLOPE_POINTS]
+        d = t[:, :, 1:, :2] - t[:, :, :-1, :2]
+        slopes = d[..., 1] / (d[..., 0] + 1e-6)
+        s1, s2 = slopes[..., 0], slopes[..., 1]
+        deg = np.degrees(np.abs(np.arctan(s1) - np.arctan(s2)))
+        flip = np.where(_SLOPE_INV, s1 < s2, s1 > s2)
+        deg = np.where(flip, 180 - deg, deg)
+        angles[:, _SLOPE_INDEX] = _SLOPE_SIGN * deg + _SLOPE_OFFSET
+        angles[:, 12] = np.abs(angles[:, 12])
+
+        # eq3d(): pescoço / tronco; 0 quando um dos segmentos é nulo
+        v1 = points[:, MID_SHOULDER] - points[:, NOSE]
+        v2 = points[:, NECK_BASE] - points[:, MID_SHOULDER]
+        norm = np.sqrt(np.einsum("ij,ij->i", v1, v1) * np.einsum("ij,ij->i", v2, v2))
+        cos = np.clip(np.einsum("ij,ij->i", v1, v2) / norm, -1.0, 1.0)
+        neck = np.where(norm == 0, 0.0, np.degrees(np.arccos(cos)))
+        angles[:, 10] = np.abs(neck - 80)
+        angles[:, 11] = neck
+
+        shoulders = p[:, L_SHOULDER] - p[:, R_SHOULDER]
+        twisted_trunk = np.sqrt(np.einsum("ij,ij->i", shoulders, shoulders))
+        angles[:, 14] = np.where(twisted_trunk / SHOULDER_DIST > 1.5, 60, twisted_trunk)
+
+    return angles.reshape(lead + (NUM_ANGLES,))
+
+
+def compute_angles_batch(keypoints, frame_shape, min_conf=None, fill=0.0):
+    """
+    Kernel vetorizado para todas as pessoas (e frames) de uma vez.
+
+    keypoints: (..., 17, 3) com x, y em píxeis e confiança, tal como
+        results[0].keypoints.data (ex.: (N, 17, 3) ou (F, N, 17, 3)).
+    frame_shape: shape da imagem (altura, largura, ...), para normalizar.
+    min_conf: se indicado, keypoints abaixo desta confiança invalidam só os
+        ângulos que dependem deles.
+    fill: valor dos ângulos inválidos (0, como o fallback antigo).
+
+    Devolve (angles, valid), ambos com shape (..., 15).
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    height, width = frame_shape[0], frame_shape[1]
+
+    # x/largura, y/altura e z = 0 (a 3ª coluna é a confiança)
+    angles = angles_from_points(keypoints * np.array([1.0 / width, 1.0 / height, 0.0]))
+
+    joint_bad = ~np.isfinite(keypoints[..., :2]).all(axis=-1)
+    if min_conf is not None:
+        joint_bad |= ~(keypoints[..., 2] >= min_conf)
+    valid = (joint_bad.astype(np.uint8) @ ANGLE_DEPENDENCIES.T) == 0
+    valid &= np.isfinite(angles)
+
+    return np.where(valid, angles, fill), valid
+
+
+def angle_between(p1, p2, p3):
+    """
+    Ângulo em p2 (graus) entre p1-p2 e p3-p2, vetorizado sobre as dimensões
+    iniciais. Segmentos nulos dão NaN, como na versão escalar.
+    """
+    v1 = p1 - p2
+    v2 = p3 - p2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_v1 = v1 / np.linalg.norm(v1, axis=-1, keepdims=True)
+        unit_v2 = v2 / np.linalg.norm(v2, axis=-1, keepdims=True)
+        dot_product = np.sum(unit_v1 * unit_v2, axis=-1)
+    return np.degrees(np.arccos(np.clip(dot_product, -1.0, 1.0)))
+
+
+def landmarks_to_points(landmarks):
+    """
+    Landmarks no formato MediaPipe (..., 33, 3) -> pontos COCO (..., 17, 3).
+    """
+    landmarks = np.asarray(landmarks)
+    points = np.zeros(landmarks.shape[:-2] + (17, 3), dtype=np.float64)
+    for yolo_idx, mp_idx in YOLO_TO_MEDIAPIPE.items():
+        points[..., yolo_idx, :] = landmarks[..., mp_idx, :]
+    return points
+
+
+def angles_to_score_columns(angles):
+    """
+    Versão em lote de YoloPoseSkeleton.convert_angles_to_dict: (N, 15) ->
+    colunas para compute_reba_scores_batch / compute_rula_scores_batch.
+    """
+    angles = np.asarray(angles).reshape(-1, NUM_ANGLES)
+    n = len(angles)
+    upper_arm = np.maximum(angles[:, 4], angles[:, 5])
+    lower_arm = np.maximum(angles[:, 0], angles[:, 1])
+    return {
+        "upper_arm_angle": upper_arm,
+        "lower_arm_angle": lower_arm,
+        "wrist_angle": np.maximum(angles[:, 2], angles[:, 3]),
+        "neck_angle": angles[:, 11],
+        "trunk_angle": angles[:, 10],
+        "carga_peso": np.zeros(n),
+        "ajustes": {
+            "trunk_twisted": angles[:, 14] > 30,
+            "feet_supported": np.ones(n, dtype=bool),
+        },
+    }
@@ -1,11 +1,11 @@
 import cv2
 import time
-import queue
 import threading
 from influxdb_client.client.write_api import SYNCHRONOUS
 import numpy as np
 from .ergonomicassessments import ErgonomicAssessment
 from .yolo_pose_detector import YoloPoseDetector
+from .latest_frame import LatestFrame
 
 class AssessmentCore:
     def __init__(self, windowObject, influxDBObject, influxDBBucket):
@@ -13,17 +13,21 @@ class AssessmentCore:
         self.influxDBBucket = influxDBBucket
         self.windowObject = windowObject
         self.isRunning = False
-        self.windowAssessmentQueue = queue.Queue(maxsize=1)
+        self.windowAssessmentResult = LatestFrame()
+        self.windowAssessmentSeq = 0
         self.pose_detector = YoloPoseDetector()
         self.ergoAssessment = ErgonomicAssessment()
 
     def Run(self):
+        self.windowAssessmentResult = LatestFrame()
+        self.windowAssessmentSeq = 0
         self.t = threading.Thread(target=self.PerformAssessment)
         self.isRunning = True
         self.t.start()
 
     def Stop(self):
         self.isRunning = False
+        self.windowAssessmentResult.close()
         if hasattr(self, "videocapture_CameraObject"):
             self.videocapture_CameraObject.release()
         if hasattr(self, "t"):
@@ -50,10 +54,12 @@ class AssessmentCore:
             return 0
 
     def GetAssessmentResultFromQueue(self):
-        try:
-            return True, self.windowAssessmentQueue.get()
-        except:
+        # Bloqueia até haver um resultado mais recente do que o último lido (False depois de Stop)
+        seq, result, _ = self.windowAssessmentResult.wait(self.windowAssessmentSeq)
+        if result is None:
             return False, None
+        self.windowAssessmentSeq = seq
+        return True, result
 
     def PerformAssessment(self):
         self.videocapture_CameraObject = cv2.VideoCapture(int(self.windowObject.cameraIndex), cv2.CAP_V4L2)
@@ -124,9 +130,4 @@ class AssessmentCore:
                 else:
                     result = [cameraFrame, -9999, []]
 
-                if not self.windowAssessmentQueue.empty():
-                    try:
-                        self.windowAssessmentQueue.get_nowait()
-                    except queue.Empty:
-                        pass
-                self.windowAssessmentQueue.put(result)
+                self.windowAssessmentResult.put(result)
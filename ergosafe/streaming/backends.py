@@ -0,0 +1,286 @@
+import logging
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+
+from ergosafe.streaming.pose_config import POSE_BACKEND, POSE_INT8_MODEL_PATH, POSE_MODEL_PATH, POSE_PRECISION
+
+logger = logging.getLogger("PoseBackend")
+
+# Valores por defeito do predict do ultralytics
+DEFAULT_IMGSZ = 640
+DEFAULT_CONF = 0.25
+DEFAULT_IOU = 0.7
+DEFAULT_MAX_DET = 300
+LETTERBOX_COLOR = 114
+
+
+class PoseBackend(ABC):
+    """
+    Interface comum: predict(frames, imgsz=None) recebe uma lista de frames BGR
+    e devolve, por frame, um array (n, 17, 3) com x, y (píxeis do frame
+    original) e confiança de cada keypoint — o mesmo que
+    results[i].keypoints.data. imgsz altera a resolução de entrada quando o
+    modelo o permite.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def predict(self, frames, imgsz=None):
+        ...
+
+
+class TorchBackend(PoseBackend):
+    """
+    Modelo PyTorch através do ultralytics (caminho original).
+    """
+
+    name = "torch"
+
+    def __init__(self, model_path="yolov8n-pose.pt", device=None):
+        import torch
+        from ultralytics import YOLO
+
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = YOLO(model_path)
+
+    def predict(self, frames, imgsz=None):
+        options = {"imgsz": imgsz} if imgsz else {}
+        results = self.model.predict(frames, device=self.device, verbose=False, **options)
+        keypoints = []
+        for result in results:
+            if getattr(result, "keypoints", None) is None or result.keypoints.conf is None:
+                keypoints.append(np.zeros((0, 17, 3), dtype=np.float32))
+            else:
+                keypoints.append(result.keypoints.data.cpu().numpy())
+        return keypoints
+
+
+# === Pré/pós-processamento em NumPy para modelos exportados ===
+
+def letterbox(frame, imgsz=DEFAULT_IMGSZ):
+    """
+    Redimensiona mantendo a proporção e preenche até imgsz x imgsz.
+    Devolve (imagem, ganho, (pad_x, pad_y)).
+    """
+    height, width = frame.shape[:2]
+    gain = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * gain)), int(round(height * gain))
+    pad_x, pad_y = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR) if (new_w, new_h) != (width, height) else frame
+    canvas = np.full((imgsz, imgsz, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return canvas, gain, (left, top)
+
+
+def to_blob(images):
+    # BGR HWC uint8 -> RGB NCHW float32 [0, 1]
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+def nms(boxes, scores, iou_threshold):
+    """
+    NMS guloso em NumPy; boxes (N, 4) x1, y1, x2, y2. Devolve os índices mantidos.
+    """
+    order = np.argsort(-scores)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        x1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def decode_pose_output(output, gain, pad, frame_shape, conf=DEFAULT_CONF, iou=DEFAULT_IOU,
+                       max_det=DEFAULT_MAX_DET):
+    """
+    Saída YOLOv8-pose de um frame, (56, A): cx, cy, w, h, score, 17 x (x, y, conf)
+    já com sigmoid. Devolve keypoints (n, 17, 3) em coordenadas do frame original.
+    """
+    predictions = output.T
+    predictions = predictions[predictions[:, 4] > conf]
+    if not len(predictions):
+        return np.zeros((0, 17, 3), dtype=np.float32)
+
+    cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    keep = nms(boxes, predictions[:, 4], iou)[:max_det]
+
+    keypoints = predictions[keep, 5:].reshape(-1, 17, 3).astype(np.float32)
+    keypoints[..., 0] = np.clip((keypoints[..., 0] - pad[0]) / gain, 0, frame_shape[1])
+    keypoints[..., 1] = np.clip((keypoints[..., 1] - pad[1]) / gain, 0, frame_shape[0])
+    return keypoints
+
+
+class ExportedPoseBackend(PoseBackend):
+    """
+    Base para modelos exportados (ONNX / OpenVINO): letterbox, normalização e
+    descodificação dos keypoints em NumPy; as subclasses só implementam _infer.
+    """
+
+    def __init__(self, imgsz=DEFAULT_IMGSZ, conf=DEFAULT_CONF, iou=DEFAULT_IOU, max_det=DEFAULT_MAX_DET):
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+        self.dynamic_batch = False
+        self.dynamic_size = False
+
+    @abstractmethod
+    def _infer(self, blob):
+        """
+        Blob NCHW float32 -> saída do modelo (N, 56, A).
+        """
+
+    def predict(self, frames, imgsz=None):
+        if isinstance(frames, np.ndarray) and frames.ndim == 3:
+            frames = [frames]
+        # Modelos exportados com tamanho fixo ignoram imgsz
+        imgsz = imgsz if imgsz and self.dynamic_size else self.imgsz
+        prepared = [letterbox(frame, imgsz) for frame in frames]
+
+        if self.dynamic_batch:
+            outputs = self._infer(to_blob([image for image, _, _ in prepared]))
+        else:
+            outputs = np.concatenate([self._infer(to_blob([image])) for image, _, _ in prepared])
+
+        return [
+            decode_pose_output(output, gain, pad, frame.shape, self.conf, self.iou, self.max_det)
+            for output, (_, gain, pad), frame in zip(outputs, prepared, frames)
+        ]
+
+
+def _cuda_index(device):
+    """
+    Índice da GPU para um device no formato do torch ("cuda", "cuda:1", "0",
+    0) ou None se for CPU / outro.
+    """
+    if device is None:
+        return None
+    device = str(device).lower()
+    if device == "cuda":
+        return 0
+    if device.startswith("cuda:"):
+        device = device[5:]
+    return int(device) if device.isdigit() else None
+
+
+class OnnxBackend(ExportedPoseBackend):
+    """
+    Modelo exportado para ONNX a correr no ONNX Runtime (CPU por defeito).
+    device (formato do torch) escolhe os providers quando providers é None:
+    uma GPU CUDA usa CUDAExecutionProvider, com a CPU como alternativa.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path="yolov8n-pose.onnx", providers=None, threads=None, device=None, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("Backend ONNX requer o pacote 'onnxruntime'") from e
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        if providers is None:
+            providers = ["CPUExecutionProvider"]
+            gpu = _cuda_index(device)
+            if gpu is not None:
+                providers.insert(0, ("CUDAExecutionProvider", {"device_id": gpu}))
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.dynamic_size = not isinstance(model_input.shape[2], int)
+        if not self.dynamic_size:
+            self.imgsz = model_input.shape[2]
+
+    def _infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoBackend(ExportedPoseBackend):
+    """
+    Modelo exportado para OpenVINO IR (.xml) ou ONNX, compilado para CPU.
+    """
+
+    name = "openvino"
+
+    def __init__(self, model_path="yolov8n-pose_openvino_model/yolov8n-pose.xml", device="CPU", threads=None,
+                 **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import openvino as ov
+        except ImportError as e:
+            raise ImportError("Backend OpenVINO requer o pacote 'openvino'") from e
+
+        core = ov.Core()
+        config = {"INFERENCE_NUM_THREADS": threads} if threads else {}
+        model = core.read_model(model_path)
+        model_input = model.inputs[0]
+        self.dynamic_batch = model_input.get_partial_shape()[0].is_dynamic
+        self.dynamic_size = model_input.get_partial_shape()[2].is_dynamic
+        if not self.dynamic_size:
+            self.imgsz = model_input.get_partial_shape()[2].get_length()
+        # device no formato do torch ("cpu", "cuda:0") passa para os nomes do OpenVINO
+        if device is None or str(device).lower() == "cpu":
+            device = "CPU"
+        elif _cuda_index(device) is not None:
+            device = "GPU"
+        self.compiled = core.compile_model(model, device, config)
+        self.output = self.compiled.output(0)
+
+    def _infer(self, blob):
+        return self.compiled(blob)[self.output]
+
+
+BACKENDS = {
+    "torch": TorchBackend,
+    "onnx": OnnxBackend,
+    "openvino": OpenVinoBackend,
+}
+
+
+def create_backend(backend="torch", model_path=None, device=None, **kwargs):
+    """
+    Cria um backend pelo nome ("torch", "onnx" ou "openvino"). Uma instância
+    de PoseBackend é devolvida tal como está.
+    """
+    if isinstance(backend, PoseBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de pose desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+
+    if model_path is not None:
+        kwargs["model_path"] = model_path
+    if backend == "torch" or device is not None:
+        kwargs["device"] = device
+    logger.info(f"Backend de pose: {backend} ({kwargs.get('model_path', 'modelo por defeito')})")
+    return BACKENDS[backend](**kwargs)
+
+
+def pose_model_settings(precision=None):
+    """
+    (backend, model_path) para a precisão configurada: "fp32" usa
+    POSE_BACKEND / POSE_MODEL_PATH, "int8" o modelo ONNX quantizado.
+    """
+    precision = precision or POSE_PRECISION
+    if precision == "fp32":
+        return POSE_BACKEND, POSE_MODEL_PATH
+    if precision == "int8":
+        return "onnx", POSE_INT8_MODEL_PATH
+    raise ValueError(f"Precisão do modelo de pose desconhecida: {precision} (opções: fp32, int8)")
@@ -0,0 +1,138 @@
+import time
+import asyncio
+import threading
+
+# Qualidade JPEG por omissão do stream e das snapshots (95 = valor por omissão do OpenCV)
+JPEG_QUALITY = 95
+# Largura mínima pedida por um cliente (evita variantes inúteis na cache)
+MIN_WIDTH = 64
+# Tempo máximo de espera por um frame novo antes de verificar se a câmara parou
+FRAME_TIMEOUT = 1.0
+
+
+def stream_variant(quality=None, width=None):
+    """
+    Variante (qualidade, largura) pedida por um cliente, normalizada;
+    largura None = resolução original.
+    """
+    quality = JPEG_QUALITY if quality is None else min(max(int(quality), 1), 100)
+    width = max(int(width), MIN_WIDTH) if width else None
+    return quality, width
+
+
+class JpegBroadcast:
+    """
+    Ponte entre o FrameHub de uma câmara (threads) e os clientes HTTP async.
+
+    Uma thread codifica cada frame anotado, e só enquanto há clientes, nas
+    variantes (qualidade, largura) pedidas; cada variante é codificada uma
+    vez (EncodedFrameCache) e partilhada. Os clientes aguardam no event loop
+    pelo JPEG seguinte, sem ocupar threads do threadpool. Um cliente lento
+    não atrasa os outros: quando volta a pedir recebe o JPEG mais recente.
+    """
+
+    def __init__(self, camera_id, hub, loop, cache):
+        self.camera_id = camera_id
+        self.hub = hub
+        self.loop = loop
+        self.cache = cache
+        self.clients = 0
+        # Clientes por variante (alterado no event loop); a thread lê _active_variants
+        self.variants = {}
+        self._active_variants = ()
+        self.closed = False
+        # Distingue seqs de aquisições diferentes da mesma câmara (ETag)
+        self.tag = f"{time.time_ns():x}"
+        # Estado lido pelos clientes (só alterado no event loop)
+        self.seq = 0
+        self.jpegs = {}
+        self._next = loop.create_future()
+        self._active = threading.Event()
+
+        self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.thread.start()
+
+    def snapshot(self, variant=(JPEG_QUALITY, None)):
+        """
+        (seq, JPEG) do último frame publicado, ou None se ainda não há frames.
+        """
+        seq, value = self.hub.latest()
+        if value is None:
+            return None
+        jpeg = self.cache.get(self.camera_id, seq, value["frame"], *variant)
+        return (seq, jpeg) if jpeg is not None else None
+
+    def _encode_loop(self):
+        seq = 0
+        while not self.hub.closed:
+            if not self._active.wait(FRAME_TIMEOUT):
+                continue  # sem clientes: não codifica
+            seq, value = self.hub.wait(seq, timeout=FRAME_TIMEOUT)
+            if value is None:
+                continue
+            jpegs = {variant: self.cache.get(self.camera_id, seq, value["frame"], *variant)
+                     for variant in self._active_variants}
+            if not self._call_in_loop(self._publish, seq, jpegs):
+                return
+        self._call_in_loop(self._close)
+
+    def _call_in_loop(self, callback, *args):
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+            return True
+        except RuntimeError:
+            return False  # event loop já fechado (shutdown)
+
+    def _publish(self, seq, jpegs):
+        self.seq, self.jpegs = seq, jpegs
+        waiters, self._next = self._next, self.loop.create_future()
+        waiters.set_result(None)
+
+    def _close(self):
+        self.closed = True
+        if not self._next.done():
+            self._next.set_result(None)
+
+    async def wait(self, after=0, variant=(JPEG_QUALITY, None), timeout=FRAME_TIMEOUT):
+        """
+        Aguarda por um frame com seq > after. Devolve (seq, JPEG da variante),
+        ou (after, None) em timeout ou depois de a câmara parar. O JPEG é None
+        se a variante ainda não estava ativa quando o frame foi codificado.
+        """
+        if self.seq <= after and not self.closed:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._next), timeout)
+            except asyncio.TimeoutError:
+                return after, None
+        if self.seq <= after:
+            return after, None
+        return self.seq, self.jpegs.get(variant)
+
+    async def frames(self, variant=(JPEG_QUALITY, None)):
+        """
+        Gerador async com cada JPEG novo na variante pedida até a câmara parar.
+        """
+        self._add_client(variant)
+        try:
+            seq = 0
+            while not self.closed:
+                seq, jpeg = await self.wait(seq, variant)
+                if jpeg is not None:
+                    yield jpeg
+        finally:
+            self._remove_client(variant)
+
+    def _add_client(self, variant):
+        self.clients += 1
+        self.variants[variant] = self.variants.get(variant, 0) + 1
+        self._active_variants = tuple(self.variants)
+        self._active.set()
+
+    def _remove_client(self, variant):
+        self.clients -= 1
+        self.variants[variant] -= 1
+        if not self.variants[variant]:
+            del self.variants[variant]
+        self._active_variants = tuple(self.variants)
+        if not self.clients:
+            self._active.clear()
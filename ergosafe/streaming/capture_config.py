@@ -0,0 +1,6 @@
+# Opções do pipeline GStreamer (ver ergosafe.streaming.gstreamer.build_pipeline)
+# width/height None mantêm a resolução da câmara
+CAPTURE_OPTIONS = {"width": None, "height": None, "rotation": 90, "fps": 20, "format": "BGR"}
+
+# Substituições por câmara: {camera_id: {"rotation": 0, "width": 720, "height": 1280, ...}}
+CAPTURE_OPTIONS_BY_CAMERA = {}
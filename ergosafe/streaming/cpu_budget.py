@@ -0,0 +1,121 @@
+import os
+import logging
+import cv2
+
+logger = logging.getLogger("CpuBudget")
+
+# Cores reservados para o processo da API (HTTP, captura, codificação JPEG)
+RESERVED_CORES = 1
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _set_process_affinity(cores):
+    # Em Linux, sched_setaffinity(0) só afeta a thread atual: aplica a cada thread
+    # já existente (captura, câmaras, scheduler do predict); as novas herdam-na
+    try:
+        tids = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        tids = [0]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except ProcessLookupError:
+            continue  # thread terminou entretanto
+
+
+def apply_thread_budget(cores=None, torch_threads=None, cv2_threads=None):
+    """
+    Aplica ao processo atual: afinidade de CPU (em todas as threads do
+    processo), threads intra-op do torch e threads do OpenCV. Valores None
+    ficam como estão.
+    """
+    if cores and hasattr(os, "sched_setaffinity"):
+        _set_process_affinity(cores)
+    if torch_threads:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass  # backends ONNX / OpenVINO: threads definidas ao criar a sessão
+    if cv2_threads:
+        cv2.setNumThreads(cv2_threads)
+
+
+def _split(cores, weights):
+    """
+    Divide cores em blocos contíguos proporcionais aos pesos (mínimo 1 core
+    por bloco); com mais blocos do que cores, os blocos partilham cores.
+    """
+    if len(weights) > len(cores):
+        return [[cores[i % len(cores)]] for i in range(len(weights))]
+
+    total = sum(weights)
+    counts = [max(1, len(cores) * w // total) for w in weights]
+    # Cores que sobram vão para os blocos com mais câmaras por core
+    while sum(counts) < len(cores):
+        i = max(range(len(weights)), key=lambda k: weights[k] / counts[k])
+        counts[i] += 1
+    while sum(counts) > len(cores):
+        # Nunca abaixo de 1 core por bloco
+        i = max((k for k in range(len(weights)) if counts[k] > 1),
+                key=lambda k: counts[k] - weights[k] / total * len(cores))
+        counts[i] -= 1
+
+    blocks, start = [], 0
+    for count in counts:
+        blocks.append(cores[start:start + count])
+        start += count
+    return blocks
+
+
+def plan_layout(mode, cameras, cores=None, reserved=RESERVED_CORES):
+    """
+    Distribuição de CPU para as câmaras ativas.
+
+    mode "threads": cameras é a lista de câmaras (tudo no processo da API).
+    mode "processes": cameras é a lista de câmaras por worker.
+
+    Devolve uma lista de entradas {process, cores, torch_threads, cv2_threads,
+    cameras}; a primeira é sempre o processo da API.
+    """
+    cores = cores or available_cores()
+    api_cores = cores[:reserved] if len(cores) > reserved else cores
+    inference_cores = cores[reserved:] if len(cores) > reserved else cores
+
+    if mode != "processes":
+        # Um só predict em lote (PoseModelServer) usa os cores de inferência; o
+        # trabalho OpenCV por câmara (rotação, resize, JPEG) corre em paralelo
+        n_cameras = max(len(cameras), 1)
+        return [{
+            "process": "api",
+            "cores": cores,
+            "torch_threads": len(inference_cores),
+            "cv2_threads": max(1, len(cores) // n_cameras),
+            "cameras": list(cameras),
+        }]
+
+    layout = [{
+        "process": "api",
+        "cores": api_cores,
+        "torch_threads": 1,
+        "cv2_threads": len(api_cores),
+        "cameras": [],
+    }]
+    active = [i for i, worker_cameras in enumerate(cameras) if worker_cameras]
+    blocks = dict(zip(active, _split(inference_cores, [len(cameras[i]) for i in active]))) if active else {}
+    for i, worker_cameras in enumerate(cameras):
+        worker_cores = blocks.get(i, inference_cores)
+        layout.append({
+            "process": f"worker_{i}",
+            "cores": worker_cores,
+            # Workers inativos ficam com 1 thread até receberem câmaras
+            "torch_threads": len(worker_cores) if worker_cameras else 1,
+            "cv2_threads": 1,
+            "cameras": list(worker_cameras),
+        })
+    return layout
@@ -3,20 +3,19 @@ import time
 import logging
 import numpy as np
 from ergosafe.db.crud import get_camera_by_id
+from ergosafe.streaming.gstreamer import build_pipeline
 
 logger = logging.getLogger("CameraDriver")
 
 class CameraDriver:
-    def __init__(self, cam_name, rtsp_url, frame_size=(720, 720), fps=20):
+    def __init__(self, cam_name, rtsp_url, frame_size=(720, 720), fps=20, rotation=90):
         self.cam_name = cam_name
         self.rtsp_url = rtsp_url
         self.frame_size = frame_size
         self.fps = fps
-        self.pipeline = (
-            f"rtspsrc location={self.rtsp_url} latency=0 ! "
-            "rtph264depay ! h264parse ! avdec_h264 ! videoconvert ! "
-            "video/x-raw,format=BGR ! appsink drop=1 max-buffers=1 sync=false"
-        )
+        # Rotação, escala e ritmo feitos pelo GStreamer: read_frame recebe o frame final
+        self.pipeline = build_pipeline(self.rtsp_url, width=frame_size[0], height=frame_size[1],
+                                       rotation=rotation, fps=fps)
         self.cap = cv2.VideoCapture(self.pipeline, cv2.CAP_GSTREAMER)
         if not self.cap.isOpened():
             logger.error(f"[{self.cam_name}] Erro ao abrir RTSP")
@@ -31,20 +30,22 @@ class CameraDriver:
             logger.warning(f"[{self.cam_name}] Frame não lido")
             return None
 
-        frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-        resized = cv2.resize(frame, self.frame_size)
-        return resized
+        if frame.shape[1::-1] != tuple(self.frame_size):
+            frame = cv2.resize(frame, self.frame_size)
+        return frame
 
-    def stream_loop(self, output_queue):
+    def stream_loop(self, output):
+        # output: LatestFrame com o JPEG mais recente (consumidores usam output.wait)
         logger.info(f"[{self.cam_name}] Captura iniciada")
-        interval = 1.0 / self.fps
+        # O videorate do pipeline limita o ritmo a self.fps: read() bloqueia até ao próximo frame
         while True:
             frame = self.read_frame()
-            if frame is not None:
-                success, jpg = cv2.imencode('.jpg', frame)
-                if success and not output_queue.full():
-                    output_queue.put(jpg.tobytes())
-            time.sleep(interval)
+            if frame is None:
+                time.sleep(0.1)
+                continue
+            success, jpg = cv2.imencode('.jpg', frame)
+            if success:
+                output.put(jpg.tobytes())
 
     def release(self):
         if self.cap:
@@ -59,12 +60,8 @@ class CameraDriver:
             return {"error": "Câmara não encontrada"}
 
         def stream_generator():
-            # Usa GStreamer para baixo atraso
-            pipeline = (
-                f"rtspsrc location={camera.url} latency=0 ! "
-                "rtph264depay ! h264parse ! avdec_h264 ! videoconvert ! "
-                "video/x-raw,format=BGR ! appsink drop=1 max-buffers=1 sync=false"
-            )
+            # Usa GStreamer para baixo atraso (frame já rodado pelo videoflip)
+            pipeline = build_pipeline(camera.url, rotation=90)
             cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
             if not cap.isOpened():
                 yield b""
@@ -75,8 +72,7 @@ class CameraDriver:
                 if not ret:
                     time.sleep(0.1)
                     continue
-                
-                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+
                 _, jpeg = cv2.imencode('.jpg', frame)
                 frame_bytes = jpeg.tobytes()
 
@@ -0,0 +1,62 @@
+import os
+
+# Rotação no sentido horário -> método do videoflip
+VIDEOFLIP_METHODS = {
+    90: "clockwise",
+    180: "rotate-180",
+    270: "counterclockwise",
+}
+
+DEPAYLOADERS = {
+    "h264": "rtph264depay ! h264parse ! avdec_h264",
+    "h265": "rtph265depay ! h265parse ! avdec_h265",
+}
+
+
+def source_element(source, codec="h264", latency=0):
+    """
+    Elementos GStreamer até ao vídeo descodificado:
+    - "rtsp://..."             -> rtspsrc + depay/parse/decoder do codec
+    - "videotestsrc[://padrão]" -> videotestsrc (testes sem câmara)
+    - "file://caminho" ou caminho de ficheiro existente -> filesrc + decodebin
+    """
+    if source.startswith(("rtsp://", "rtsps://")):
+        return f"rtspsrc location={source} latency={latency} ! {DEPAYLOADERS[codec]}"
+    if source.startswith("videotestsrc"):
+        pattern = source.split("://", 1)[1] if "://" in source else "smpte"
+        return f"videotestsrc is-live=true pattern={pattern}"
+    if source.startswith("file://") or os.path.exists(source):
+        path = source[len("file://"):] if source.startswith("file://") else source
+        return f"filesrc location={path} ! decodebin"
+    raise ValueError(f"Fonte GStreamer não suportada: {source}")
+
+
+def build_pipeline(source, width=None, height=None, rotation=0, fps=None, format="BGR", crop=None,
+                   codec="h264", latency=0):
+    """
+    Pipeline para cv2.VideoCapture(..., cv2.CAP_GSTREAMER) que entrega frames
+    já no tamanho, orientação, ritmo e formato pedidos:
+
+    fonte ! videorate ! videocrop ! videoscale ! videoflip ! videoconvert ! appsink
+
+    width/height: tamanho final (depois da rotação); rotation: 0/90/180/270
+    no sentido horário; fps: ritmo máximo (frames a mais são descartados
+    antes de converter); crop: (left, right, top, bottom) em píxeis da fonte.
+    """
+    if rotation not in (0, None) and rotation not in VIDEOFLIP_METHODS:
+        raise ValueError(f"Rotação não suportada: {rotation} (0, 90, 180, 270)")
+
+    elements = [source_element(source, codec, latency)]
+    if fps:
+        elements += ["videorate drop-only=true", f"video/x-raw,framerate={int(fps)}/1"]
+    if crop:
+        left, right, top, bottom = crop
+        elements.append(f"videocrop left={left} right={right} top={top} bottom={bottom}")
+    if width and height:
+        # Escala antes de rodar (menos píxeis a rodar): 90/270 trocam largura e altura
+        scaled = (height, width) if rotation in (90, 270) else (width, height)
+        elements += ["videoscale", f"video/x-raw,width={scaled[0]},height={scaled[1]}"]
+    if rotation:
+        elements.append(f"videoflip method={VIDEOFLIP_METHODS[rotation]}")
+    elements += ["videoconvert", f"video/x-raw,format={format}", "appsink drop=1 max-buffers=1 sync=false"]
+    return " ! ".join(elements)
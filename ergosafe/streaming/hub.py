@@ -0,0 +1,56 @@
+import time
+import threading
+from collections import deque
+
+
+class FrameHub:
+    """
+    Broadcast do último valor publicado: o worker de uma câmara publica cada
+    resultado uma vez e qualquer número de leitores (wait / latest) lê o mais
+    recente. Leitores lentos saltam valores intermédios em vez de atrasar o
+    worker.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.seq = 0
+        self.value = None
+        self.closed = False
+        self.publish_times = deque(maxlen=50)
+
+    def publish(self, value):
+        with self.condition:
+            self.publish_times.append(time.monotonic())
+            self.seq += 1
+            self.value = value
+            self.condition.notify_all()
+
+    def fps(self):
+        # Ritmo de publicação recente (últimas 50 publicações, 0 se parado há > 2 s)
+        with self.condition:
+            times = list(self.publish_times)
+        if len(times) < 2 or time.monotonic() - times[-1] > 2.0:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def latest(self):
+        # (seq, valor) sem bloquear; seq 0 se ainda não houve publicação
+        with self.condition:
+            return self.seq, self.value
+
+    def wait(self, after=0, timeout=None):
+        """
+        Espera por um valor com seq > after. Devolve (seq, valor), ou
+        (after, None) em timeout ou se o hub foi fechado.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.seq > after or self.closed, timeout):
+                return after, None
+            if self.seq <= after:
+                return after, None
+            return self.seq, self.value
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
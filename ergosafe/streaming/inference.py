@@ -1,148 +1,292 @@
-from ultralytics import YOLO
+import time
 import numpy as np
 import cv2
-import torch
-import math
-from ergosafe.influx.influx import (
-    send_pose_data,
-    send_reba_table,
-    send_rula_table,
+from ergosafe.influx.score_cache import publish_tables
+from ergosafe.influx.sender import get_sender
+from ergosafe.scoring.reba_score import compute_reba_score, compute_reba_scores_batch
+from ergosafe.scoring.rula_score import compute_rula_score, compute_rula_scores_batch
+from ergosafe.streaming.aggregator import ScoreAggregator
+from ergosafe.streaming.backends import create_backend, pose_model_settings
+from ergosafe.streaming.angles import (
+    angles_from_points,
+    angles_to_score_columns,
+    compute_angles_batch,
+    landmarks_to_points,
 )
-from ergosafe.scoring.reba_score import compute_reba_score
-from ergosafe.scoring.rula_score import compute_rula_score
+from ergosafe.streaming.keyframes import KeypointPropagator
+from ergosafe.streaming.motion import MotionGate
+from ergosafe.streaming.people import candidates, is_scored, most_central
+from ergosafe.streaming.roi import PersonROI
+from ergosafe.streaming.tracker import PoseTracker
 from datetime import datetime
-import threading
+
+
+def draw_skeleton(annotated, keypoints, track_id=None):
+    """
+    Desenha keypoints (17 x (x, y, c)) e traços de uma pessoa no frame.
+    """
+    for x, y, c in keypoints:
+        if c > 0.7:
+            cv2.circle(annotated, (int(x), int(y)), 4, (0, 255, 0), -1)
+
+    # Definir pares de ligação (YOLOPose skeleton)
+    edges = [
+        (5, 7), (7, 9), (6, 8), (8, 10),  # braços
+        (11, 13), (13, 15), (12, 14), (14, 16),  # pernas
+        (5, 6), (5, 11), (6, 12),  # tronco
+    ]
+
+    for p1, p2 in edges:
+        if keypoints[p1][2] > 0.7 and keypoints[p2][2] > 0.7:
+            x1, y1 = int(keypoints[p1][0]), int(keypoints[p1][1])
+            x2, y2 = int(keypoints[p2][0]), int(keypoints[p2][1])
+            cv2.line(annotated, (x1, y1), (x2, y2), (255, 0, 0), 2)
+
+    if track_id is not None:
+        cv2.putText(annotated, f"#{track_id}", (int(keypoints[0][0]), int(keypoints[0][1]) - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
 
 class YoloPoseSkeleton:
-    def __init__(self, model_path="yolov8n-pose.pt", device=None, cam_id=1, operator="default"):
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = YOLO(model_path)
+    def __init__(self, model_path="yolov8n-pose.pt", device=None, cam_id=1, operator="default", aggregation=None,
+                 min_joint_conf=None, multi_person=False, tracking=None, pose_server=None, backend="torch",
+                 backend_options=None, precision=None, roi=None, keyframes=None, motion_gate=None, annotate=True):
+        # pose_server: PoseModelServer partilhado (um modelo por processo, predict em lote
+        # entre câmaras); sem servidor cada instância carrega o seu modelo
+        self.pose_server = pose_server
+        # backend: "torch" (ultralytics), "onnx" ou "openvino"; model_path deve ser o
+        # ficheiro exportado correspondente (ver scripts/export_pose_model.py)
+        # precision: "fp32" / "int8" substitui backend e model_path (ver pose_config)
+        if precision is not None:
+            backend, model_path = pose_model_settings(precision)
+        if pose_server is None:
+            self.backend = create_backend(backend, model_path, device, **(backend_options or {}))
+        else:
+            self.backend = pose_server.backend
         self.cam_id = cam_id
         self.operator = operator
-        self.batch_cnt = 0
-        self.reba_scores = []
-        self.reba_tables = []
-        self.rula_scores = []
-        self.rula_tables = []
-        
-    def _send_data_async(self, keypoints, angles, reba_table, rula_table, reba_score, rula_score):
-        def send():
-            send_reba_table(self.cam_id, reba_table, operator=self.operator)
-            send_rula_table(self.cam_id, rula_table, operator=self.operator)
-            send_pose_data(f"{self.cam_id}", keypoints, angles, reba_score, rula_score, operator=self.operator)
-        threading.Thread(target=send, daemon=True).start()
+        # aggregation: kwargs do ScoreAggregator (por defeito mediana a cada 20 frames)
+        self.aggregation = aggregation or {}
+        self.aggregator = ScoreAggregator(("reba", "rula"), **self.aggregation)
+        # min_joint_conf: keypoints abaixo desta confiança anulam só os ângulos que os usam
+        self.min_joint_conf = min_joint_conf
+
+        # Modo multi-pessoa: todas as pessoas com confiança suficiente são avaliadas,
+        # cada uma com o seu agregador, identificadas por um id de track
+        self.multi_person = multi_person
+        self.tracker = PoseTracker(**(tracking or {})) if multi_person else None
+        self.track_aggregators = {}
+
+        # roi: kwargs do PersonROI (ou True para os valores por defeito); inferência num
+        # recorte à volta da pessoa a resolução reduzida. Só no modo de uma pessoa.
+        self.roi = PersonROI(**(roi if isinstance(roi, dict) else {})) if roi and not multi_person else None
+
+        # keyframes: kwargs do KeypointPropagator (ou True); o modelo só corre a cada
+        # keyframe_every frames e os keypoints são propagados por fluxo ótico entre eles
+        self.keyframes = KeypointPropagator(**(keyframes if isinstance(keyframes, dict) else {})) \
+            if keyframes else None
 
+        # motion_gate: kwargs do MotionGate (ou True); sem movimento o último resultado
+        # é reutilizado (ângulos, desenho e scores) e a inferência não corre
+        self.motion_gate = MotionGate(**(motion_gate if isinstance(motion_gate, dict) else {})) \
+            if motion_gate else None
+        self.last_result = None
+
+        # annotate=False: o frame é devolvido sem desenho (ex.: workers noutro processo,
+        # que só enviam last_people e o desenho é feito por quem mostra o stream)
+        self.annotate = annotate
+        # Pessoas avaliadas no último frame: keypoints (17, 3), track_id, reba, rula
+        self.last_people = []
+        # Scores agregados no último frame processado (repetidos nos frames sem movimento)
+        self.last_scored = []
+        # Últimas tabelas emitidas (para a cache dos endpoints /reba e /rula)
+        self.last_tables = None
+
+    def _send_data_async(self, keypoints, angles, reba_table, rula_table, reba_score, rula_score, track_id=None):
+        # Tabelas servidas pelos endpoints sem consultar o InfluxDB
+        self.last_tables = {"reba_table": reba_table, "rula_table": rula_table, "timestamp": time.time()}
+        publish_tables(self.cam_id, self.operator, reba_table, rula_table, self.last_tables["timestamp"])
+        # Sender único do processo: uma emissão ainda por enviar desta câmara / pessoa é substituída
+        # angles (15, 1) -> 15 valores escalares
+        get_sender().submit(
+            (self.cam_id, self.operator, track_id),
+            camera_id=f"{self.cam_id}", keypoints=keypoints, angles=np.ravel(angles),
+            reba_table=reba_table, rula_table=rula_table, reba_score=reba_score, rula_score=rula_score,
+            operator=self.operator, track_id=track_id,
+        )
+
+
+    def _predict(self, frame, imgsz=None):
+        # Keypoints (n, 17, 3) do frame, ou None se o pedido foi substituído
+        if self.pose_server is None:
+            return self.backend.predict([frame], imgsz=imgsz)[0]
+        # Chave por pipeline: dois viewers da mesma câmara não se substituem
+        return self.pose_server.predict((self.cam_id, id(self)), frame, imgsz=imgsz)
+
+    def _candidates(self, keypoints_all):
+        # Filtrar pessoas com confiança média >= 0.7
+        return candidates(keypoints_all)
+
+    def _detect_in_roi(self, frame):
+        """
+        Pessoa seguida no recorte (coordenadas do frame) ou None quando é
+        preciso o frame completo.
+        """
+        region = self.roi.next_region(frame.shape)
+        if region is None:
+            return None
+        keypoints_all = self._predict(self.roi.crop(frame, region), imgsz=self.roi.imgsz)
+        keypoints_cand = self._candidates(keypoints_all)
+        if not len(keypoints_cand):
+            self.roi.reset()  # perdida no recorte: deteção no frame completo
+            return None
+        keypoints_cand = self.roi.to_frame(keypoints_cand, region)
+        return keypoints_cand[self.roi.select(keypoints_cand, region)]
 
     def detect_and_compute_angles(self, frame):
-        results = self.model.predict(frame, device=self.device, verbose=False)
-        if not results or not hasattr(results[0], 'keypoints') or results[0].keypoints is None:
-            return [], frame  # Nenhum esqueleto detetado
-
-        if results[0].keypoints.conf is None:
-            return [], frame  # Confiança ausente (possível erro no modelo ou frame inválido)
-
-        keypoints_all = results[0].keypoints.data.cpu().numpy()  # shape: (n, 17, 3)
-        conf_tensor = results[0].keypoints.conf.cpu().numpy()    # (n, 17)
-
-        # # Filtrar e selecionar pessoa mais centrada com confiança >= 0.7
-        candidatos = []
-        for idx, kp in enumerate(keypoints_all):
-            conf = conf_tensor[idx].mean()
-            if conf >= 0.7:
-                x_center = kp[:, 0].mean()
-                y_center = kp[:, 1].mean()
-                dist_center = math.hypot(x_center - frame.shape[1] / 2, y_center - frame.shape[0] / 2)
-                candidatos.append((dist_center, idx, conf))
-
-        if not candidatos:
-            return [], frame  # nenhum candidato com confiança suficiente
-
-        candidatos.sort(key=lambda x: x[0])
-        _, best_idx, best_conf = candidatos[0]
-
-
-        kp = keypoints_all[best_idx]
-        keypoints = [(x, y, c) for x, y, c in kp]
-
-        # Inicializar landmarks compatíveis com MediaPipe
-        landmarks = np.zeros((33, 3), dtype=np.float32)
-        index_map = {
-            0: 0,   # nose
-            5: 11,  # left_shoulder
-            6: 12,  # right_shoulder
-            7: 13,  # left_elbow
-            8: 14,  # right_elbow
-            9: 15,  # left_wrist
-            10: 16, # right_wrist
-            11: 23, # left_hip
-            12: 24, # right_hip
-            13: 25, # left_knee
-            14: 26, # right_knee
-            15: 27, # left_ankle
-            16: 28, # right_ankle
-        }
+        if self.motion_gate is not None:
+            if not self.motion_gate.check(frame) and self.last_result is not None:
+                return self._reuse_last_result(frame)
+            self.last_result = self._detect_and_compute_angles(frame)
+            return self.last_result
+        return self._detect_and_compute_angles(frame)
+
+    def _reuse_last_result(self, frame):
+        # A postura mantém-se: os scores voltam a entrar nos agregadores, para que
+        # posturas estáticas longas continuem a ser emitidas
+        scored, self.last_scored = self.last_scored, []
+        for args, kwargs in scored:
+            self._aggregate_and_send(*args, **kwargs)
+
+        # Frame atual com o desenho do último resultado
+        annotated = frame
+        if self.annotate and self.last_people:
+            annotated = frame.copy()
+            for person in self.last_people:
+                draw_skeleton(annotated, person["keypoints"], person["track_id"])
+        return self.last_result[0], annotated
+
+    def _detect_and_compute_angles(self, frame):
+        self.last_people = []
+        self.last_scored = []
+        propagated = self.keyframes.propagate(frame) if self.keyframes is not None else None
 
-        for yolo_idx, mp_idx in index_map.items():
-            x, y, c = keypoints[yolo_idx]
-            landmarks[mp_idx] = [x / frame.shape[1], y / frame.shape[0], 0.0]
+        if self.multi_person:
+            keypoints_cand = propagated
+            if keypoints_cand is None:
+                keypoints_cand = self._candidates(self._predict(frame))  # shape: (n, 17, 3)
+                if self.keyframes is not None:
+                    self.keyframes.keyframe(frame, keypoints_cand)
+            return self._process_tracks(frame, keypoints_cand)
+
+        person = propagated[0] if propagated is not None else None
+        if person is None and self.roi is not None:
+            person = self._detect_in_roi(frame)
+
+        if person is None:
+            keypoints_cand = self._candidates(self._predict(frame))  # shape: (n, 17, 3)
+
+            if not len(keypoints_cand):
+                if self.roi is not None:
+                    self.roi.update(None)
+                if self.keyframes is not None:
+                    self.keyframes.keyframe(frame, keypoints_cand)
+                return [], frame  # nenhum candidato com confiança suficiente
+
+            # Selecionar pessoa mais centrada
+            person = most_central(keypoints_cand, frame.shape)
+
+        if self.roi is not None:
+            self.roi.update(person)
+        if self.keyframes is not None and propagated is None:
+            self.keyframes.keyframe(frame, person[None])
+
+        keypoints = [(x, y, c) for x, y, c in person]
 
         # === Desenhar keypoints e traços ===
-        annotated = frame.copy()
-        for x, y, c in keypoints:
-            if c > 0.7:
-                cv2.circle(annotated, (int(x), int(y)), 4, (0, 255, 0), -1)
-
-        # Definir pares de ligação (YOLOPose skeleton)
-        edges = [
-            (5, 7), (7, 9), (6, 8), (8, 10),  # braços
-            (11, 13), (13, 15), (12, 14), (14, 16),  # pernas
-            (5, 6), (5, 11), (6, 12),  # tronco
-        ]
-
-        for p1, p2 in edges:
-            if keypoints[p1][2] > 0.7 and keypoints[p2][2] > 0.7:
-                x1, y1 = int(keypoints[p1][0]), int(keypoints[p1][1])
-                x2, y2 = int(keypoints[p2][0]), int(keypoints[p2][1])
-                cv2.line(annotated, (x1, y1), (x2, y2), (255, 0, 0), 2)
+        annotated = frame
+        if self.annotate:
+            annotated = frame.copy()
+            self._draw_skeleton(annotated, keypoints)
 
         # === Calcular ângulos ===
 
-        angles = self.compute_angles(landmarks)
+        angles_all, _ = compute_angles_batch(person[None], frame.shape, min_conf=self.min_joint_conf)
+        angles = angles_all[0][:, None]
         # Enviar só o primeiro utilizador com confiança > 0.7
         angle_dict = self.convert_angles_to_dict(angles)
+        person_result = {"keypoints": person, "track_id": None, "reba": None, "rula": None}
+        self.last_people = [person_result]
         
-        if keypoints[0][2] > 0.7:
+        if is_scored(person):
             reba_score, reba_table = compute_reba_score(angle_dict)
             rula_score, rula_table = compute_rula_score(angle_dict)
-
-            self.reba_scores.append(reba_score)
-            self.reba_tables.append(reba_table)
-            self.rula_scores.append(rula_score)
-            self.rula_tables.append(rula_table)
-            self.batch_cnt += 1
-
-            if self.batch_cnt >= 20:
-                # Mediana REBA e última tabela
-                median_reba = float(np.median(self.reba_scores))
-                latest_reba_table = self.reba_tables[-1]
-
-                # Mediana RULA e última tabela
-                median_rula = float(np.median(self.rula_scores))
-                latest_rula_table = self.rula_tables[-1]
-
-                # send_reba_table(self.cam_id, latest_reba_table, operator=self.operator)
-                # send_rula_table(self.cam_id, latest_rula_table, operator=self.operator)
-                # send_pose_data(f"{self.cam_id}", keypoints, angles, median_reba, median_rula, operator=self.operator)
-                self._send_data_async(keypoints, angles, latest_reba_table, latest_rula_table, median_reba, median_rula)
-
-                # Reiniciar buffers
-                self.reba_scores.clear()
-                self.reba_tables.clear()
-                self.rula_scores.clear()
-                self.rula_tables.clear()
-                self.batch_cnt = 0
+            person_result.update(reba=reba_score, rula=rula_score)
+            self._aggregate_and_send(self.aggregator, keypoints, angles, reba_score, reba_table, rula_score, rula_table)
 
         return [angles], annotated
+
+    def _process_tracks(self, frame, keypoints_cand):
+        track_ids, expired = self.tracker.update(keypoints_cand, frame.shape)
+        for track_id in expired:
+            self.track_aggregators.pop(track_id, None)
+
+        if not len(keypoints_cand):
+            return [], frame
+
+        annotated = frame.copy() if self.annotate else frame
+        angles_all, _ = compute_angles_batch(keypoints_cand, frame.shape, min_conf=self.min_joint_conf)
+
+        # Scoring de todas as pessoas de uma vez
+        columns = angles_to_score_columns(angles_all)
+        reba_scores, reba_tables = compute_reba_scores_batch(columns)
+        rula_scores, rula_tables = compute_rula_scores_batch(columns)
+
+        angles_list = []
+        for i, track_id in enumerate(track_ids.tolist()):
+            keypoints = [(x, y, c) for x, y, c in keypoints_cand[i]]
+            angles = angles_all[i][:, None]
+            angles_list.append(angles)
+
+            if self.annotate:
+                draw_skeleton(annotated, keypoints, track_id)
+
+            person_result = {"keypoints": keypoints_cand[i], "track_id": track_id, "reba": None, "rula": None}
+            self.last_people.append(person_result)
+
+            if is_scored(keypoints_cand[i]):
+                person_result.update(reba=int(reba_scores[i]), rula=int(rula_scores[i]))
+                if track_id not in self.track_aggregators:
+                    self.track_aggregators[track_id] = ScoreAggregator(("reba", "rula"), **self.aggregation)
+                self._aggregate_and_send(
+                    self.track_aggregators[track_id], keypoints, angles,
+                    int(reba_scores[i]), {k: int(v[i]) for k, v in reba_tables.items()},
+                    int(rula_scores[i]), {k: int(v[i]) for k, v in rula_tables.items()},
+                    track_id=track_id,
+                )
+
+        return angles_list, annotated
+
+    def _aggregate_and_send(self, aggregator, keypoints, angles, reba_score, reba_table, rula_score, rula_table,
+                            track_id=None):
+        self.last_scored.append(((aggregator, keypoints, angles, reba_score, reba_table, rula_score, rula_table),
+                                 {"track_id": track_id}))
+        summary = aggregator.update(
+            {"reba": reba_score, "rula": rula_score},
+            {"reba": reba_table, "rula": rula_table},
+        )
+
+        if summary:
+            # Mediana (ou estatística configurada) e última tabela de cada método
+            self._send_data_async(
+                keypoints, angles,
+                summary["tables"]["reba"], summary["tables"]["rula"],
+                summary["scores"]["reba"], summary["scores"]["rula"],
+                track_id=track_id,
+            )
+
+    def _draw_skeleton(self, annotated, keypoints):
+        draw_skeleton(annotated, keypoints)
     
     
     def convert_angles_to_dict(self, angles):
@@ -173,53 +317,7 @@ class YoloPoseSkeleton:
     
 
     def compute_angles(self, l):
-        angles = np.zeros((15, 1))
-        shoulder_dist = 0.3
-
-        def eq(p1, p2, p3, inv=False):
-            x1, y1, _ = p1
-            x2, y2, _ = p2
-            x3, y3, _ = p3
-            slope1 = (y2 - y1) / (x2 - x1 + 1e-6)
-            slope2 = (y3 - y2) / (x3 - x2 + 1e-6)
-            angle = abs(math.atan(slope1) - math.atan(slope2))
-            deg = math.degrees(angle)
-            if not inv:
-                if slope1 > slope2: deg = 180 - deg
-            else:
-                if slope1 < slope2: deg = 180 - deg
-            return deg
-
-        def eq3d(p1, p2, p3):
-            v1 = np.array(p2) - np.array(p1)
-            v2 = np.array(p3) - np.array(p2)
-            dot = np.dot(v1, v2)
-            norm = np.linalg.norm(v1) * np.linalg.norm(v2)
-            if norm == 0: return 0
-            angle = math.acos(np.clip(dot / norm, -1.0, 1.0))
-            return math.degrees(angle)
-
-        try:
-            angles[0] = 180 - eq(l[11], l[13], l[15])  # left elbow
-            angles[1] = eq(l[12], l[14], l[16])        # right elbow
-            angles[2] = 0  # no hand landmark
-            angles[3] = 0
-            angles[4] = eq(l[13], l[11], l[23]) - 15
-            angles[5] = eq(l[14], l[12], l[24], inv=True) - 15
-            angles[6] = eq(l[11], l[23], l[25], inv=True)
-            angles[7] = eq(l[12], l[24], l[26])
-            angles[8] = eq(l[23], l[25], l[27])
-            angles[9] = 180 - eq(l[24], l[26], l[28])
-            mid_shoulder = (l[11] + l[12]) / 2
-            mid_hip = (l[23] + l[24]) / 2
-            neck_base = (mid_shoulder + mid_hip) / 2
-            angles[10] = abs(eq3d(l[0], mid_shoulder, neck_base) - 80)
-            angles[11] = eq3d(l[0], mid_shoulder, neck_base)
-            angles[12] = abs(eq(mid_shoulder, mid_hip, (l[25]+l[26])/2) - 15)
-            angles[13] = 0
-            twisted_trunk = math.dist(l[11], l[12])
-            angles[14] = 60 if twisted_trunk / shoulder_dist > 1.5 else twisted_trunk
-        except Exception:
-            angles = np.zeros((15, 1))  # fallback em caso de erro
-
-        return angles
+        # l: landmarks (33, 3) no formato MediaPipe; ver ergosafe.streaming.angles
+        angles = angles_from_points(landmarks_to_points(l))
+        angles[~np.isfinite(angles)] = 0  # fallback por ângulo em caso de erro
+        return angles[:, None]
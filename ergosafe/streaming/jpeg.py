@@ -0,0 +1,136 @@
+import logging
+import threading
+import cv2
+import numpy as np
+
+logger = logging.getLogger("Jpeg")
+
+# "auto": simplejpeg ou PyTurboJPEG se instalados, senão OpenCV; ou "simplejpeg" / "turbojpeg" / "opencv"
+JPEG_ENCODER = "auto"
+# Nº de frames (seq) por câmara mantidos na cache, com todas as variantes
+CACHED_FRAMES = 2
+
+
+def _simplejpeg_encoder():
+    import simplejpeg
+
+    def encode(frame, quality):
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(frame), quality=quality, colorspace="BGR")
+    return encode
+
+
+def _turbojpeg_encoder():
+    from turbojpeg import TurboJPEG
+
+    jpeg = TurboJPEG()
+
+    def encode(frame, quality):
+        return jpeg.encode(np.ascontiguousarray(frame), quality=quality)
+    return encode
+
+
+def _opencv_encoder():
+    def encode(frame, quality):
+        ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return jpeg.tobytes() if ret else None
+    return encode
+
+
+ENCODERS = {
+    "simplejpeg": _simplejpeg_encoder,
+    "turbojpeg": _turbojpeg_encoder,
+    "opencv": _opencv_encoder,
+}
+
+
+def create_encoder(name=JPEG_ENCODER):
+    """
+    Função encode(frame BGR, quality) -> bytes. Com "auto" usa o primeiro
+    codificador disponível; um codificador em falta cai para o OpenCV.
+    """
+    names = ["simplejpeg", "turbojpeg"] if name == "auto" else [name]
+    for candidate in names:
+        if candidate == "opencv":
+            break
+        try:
+            encoder = ENCODERS[candidate]()
+            logger.info(f"Codificador JPEG: {candidate}")
+            return encoder
+        except (ImportError, OSError, RuntimeError) as e:
+            # PyTurboJPEG levanta OSError/RuntimeError sem a libturbojpeg
+            if name != "auto":
+                logger.warning(f"Codificador JPEG {candidate} indisponível ({e}), a usar OpenCV")
+    return _opencv_encoder()
+
+
+def scaled_size(shape, width):
+    # Tamanho (largura, altura) com largura máxima width, mantendo a proporção
+    height, frame_width = shape[:2]
+    if not width or width >= frame_width:
+        return frame_width, height
+    return int(width), max(1, round(height * width / frame_width))
+
+
+class EncodedFrameCache:
+    """
+    JPEGs por (câmara, seq, qualidade, largura): cada variante de cada frame
+    é codificada uma única vez, mesmo com vários pedidos em simultâneo, e
+    partilhada por todos os clientes. Só os CACHED_FRAMES frames mais
+    recentes de cada câmara ficam guardados.
+    """
+
+    def __init__(self, encoder=None, cached_frames=CACHED_FRAMES):
+        self.encode_fn = encoder or create_encoder()
+        self.cached_frames = cached_frames
+        self.lock = threading.Lock()
+        self.frames = {}  # camera_id -> {seq: {(quality, width): jpeg}}
+        self.pending = {}  # chave -> Lock da codificação em curso
+        self.stats = {"encoded": 0, "hits": 0}
+
+    def get(self, camera_id, seq, frame, quality, width=None):
+        key = (camera_id, seq, quality, width)
+        with self.lock:
+            jpeg = self._lookup(key)
+            if jpeg is not None:
+                self.stats["hits"] += 1
+                return jpeg
+            encoding = self.pending.setdefault(key, threading.Lock())
+
+        with encoding:
+            # Outro pedido pode ter codificado a mesma variante entretanto
+            with self.lock:
+                jpeg = self._lookup(key)
+            if jpeg is not None:
+                with self.lock:
+                    self.stats["hits"] += 1
+                return jpeg
+
+            try:
+                size = scaled_size(frame.shape, width)
+                if size != (frame.shape[1], frame.shape[0]):
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                jpeg = self.encode_fn(frame, quality)
+                with self.lock:
+                    self.stats["encoded"] += 1
+                    if jpeg is not None:
+                        self._store(key, jpeg)
+            finally:
+                # Também quando a codificação falha: o lock da chave não fica para trás
+                with self.lock:
+                    self.pending.pop(key, None)
+            return jpeg
+
+    def _lookup(self, key):
+        camera_id, seq, quality, width = key
+        return self.frames.get(camera_id, {}).get(seq, {}).get((quality, width))
+
+    def _store(self, key, jpeg):
+        camera_id, seq, quality, width = key
+        frames = self.frames.setdefault(camera_id, {})
+        frames.setdefault(seq, {})[(quality, width)] = jpeg
+        while len(frames) > self.cached_frames:
+            del frames[min(frames)]
+
+    def drop(self, camera_id):
+        with self.lock:
+            self.frames.pop(camera_id, None)
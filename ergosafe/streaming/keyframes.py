@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+
+class KeypointPropagator:
+    """
+    Inferência só em keyframes: entre keyframes os keypoints da última deteção
+    são deslocados com fluxo ótico esparso Lucas-Kanade (cv2.calcOpticalFlowPyrLK).
+
+    Um keyframe (deteção completa) é pedido a cada keyframe_every frames, a
+    pedido (force_keyframe) ou quando a qualidade do fluxo degrada: menos de
+    min_tracked_ratio dos keypoints seguidos com erro ida-e-volta abaixo de
+    max_fb_error píxeis.
+    """
+
+    def __init__(self, keyframe_every=5, min_conf=0.5, min_tracked_ratio=0.7, max_fb_error=1.5,
+                 win_size=21, max_level=3):
+        self.keyframe_every = keyframe_every
+        self.min_conf = min_conf
+        self.min_tracked_ratio = min_tracked_ratio
+        self.max_fb_error = max_fb_error
+        self.lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+        )
+        self.prev_gray = None
+        self.keypoints = None
+        self.frames_since_keyframe = 0
+        self.forced = False
+        self.stats = {"keyframes": 0, "propagated": 0, "degraded": 0}
+
+    @staticmethod
+    def _gray(frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+    def force_keyframe(self):
+        self.forced = True
+
+    def keyframe(self, frame, keypoints):
+        """
+        Regista o resultado de uma deteção: keypoints (n, 17, 3) a propagar.
+        """
+        self.prev_gray = self._gray(frame)
+        self.keypoints = np.asarray(keypoints, dtype=np.float32).reshape(-1, 17, 3).copy()
+        self.frames_since_keyframe = 0
+        self.forced = False
+        self.stats["keyframes"] += 1
+
+    def propagate(self, frame):
+        """
+        Keypoints (n, 17, 3) propagados para este frame, ou None se é preciso
+        um keyframe (o chamador corre o modelo e chama keyframe()).
+        """
+        if (self.forced or self.keypoints is None or not len(self.keypoints)
+                or self.frames_since_keyframe >= self.keyframe_every - 1):
+            return None
+
+        tracked = self.keypoints[..., 2] >= self.min_conf
+        if not tracked.any():
+            return None
+
+        gray = self._gray(frame)
+        if gray.shape != self.prev_gray.shape:
+            return None  # mudança de resolução: nova deteção
+        points = self.keypoints[..., :2][tracked].reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None, **self.lk_params)
+        back, status_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, moved, None, **self.lk_params)
+
+        fb_error = np.linalg.norm((back - points).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (status_back.ravel() == 1) & (fb_error < self.max_fb_error)
+        if good.mean() < self.min_tracked_ratio:
+            self.stats["degraded"] += 1
+            return None
+
+        # Keypoints mal seguidos mantêm a posição anterior
+        positions = self.keypoints[..., :2][tracked]
+        positions[good] = moved.reshape(-1, 2)[good]
+        self.keypoints[..., :2][tracked] = positions
+
+        self.prev_gray = gray
+        self.frames_since_keyframe += 1
+        self.stats["propagated"] += 1
+        return self.keypoints.copy()
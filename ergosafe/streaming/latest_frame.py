@@ -0,0 +1,127 @@
+import time
+import threading
+from ergosafe.streaming.shared_frames import SharedFrameRing
+
+
+class LatestFrame:
+    """
+    Passagem do frame mais recente entre threads: o produtor substitui o
+    valor (sem fila nem bloqueio) e cada consumidor espera, numa variável de
+    condição, por um seq maior do que o último que leu. Frames intermédios
+    que nenhum consumidor chegou a ler são descartados.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.seq = 0
+        self.frame = None
+        self.timestamp = 0.0
+        self.closed = False
+
+    def put(self, frame, timestamp=None):
+        with self.condition:
+            self.seq += 1
+            self.frame = frame
+            self.timestamp = time.time() if timestamp is None else timestamp
+            self.condition.notify_all()
+            return self.seq
+
+    def latest(self):
+        # (seq, frame, timestamp) sem bloquear; seq 0 se ainda não há frames
+        with self.condition:
+            return self.seq, self.frame, self.timestamp
+
+    def wait(self, after=0, timeout=None):
+        """
+        Espera por um frame com seq > after. Devolve (seq, frame, timestamp),
+        ou (after, None, 0.0) em timeout ou depois de close().
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq > after or self.closed, timeout)
+            if self.seq <= after:
+                return after, None, 0.0
+            return self.seq, self.frame, self.timestamp
+
+    def close(self):
+        # Acorda os consumidores em espera
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class SharedLatestFrame:
+    """
+    Variante entre processos: os frames ficam num SharedFrameRing (views sem
+    cópia, seq no cabeçalho) e o produtor acorda os consumidores com um
+    multiprocessing.Condition.
+
+    Como todas as primitivas de multiprocessing, a condição só passa para
+    outro processo por herança (argumentos de Process); o consumidor recria
+    o objeto com attach(name, condition). Vários rings podem partilhar a
+    mesma condição: cada consumidor só acorda de vez para o seu seq.
+    """
+
+    def __init__(self, ring, condition):
+        self.ring = ring
+        self.condition = condition
+
+    @classmethod
+    def create(cls, shape, condition, slots=4, name=None):
+        return cls(SharedFrameRing.create(shape, slots=slots, name=name), condition)
+
+    @classmethod
+    def attach(cls, name, condition):
+        return cls(SharedFrameRing.attach(name), condition)
+
+    @property
+    def name(self):
+        return self.ring.name
+
+    @property
+    def shape(self):
+        return self.ring.shape
+
+    @property
+    def seq(self):
+        return self.ring.seq
+
+    # === Produtor ===
+    def next_slot(self):
+        # View do próximo slot para escrita direta (ex.: cap.read(slot))
+        return self.ring.next_slot()
+
+    def commit(self, timestamp=None):
+        seq = self.ring.commit(timestamp)
+        with self.condition:
+            self.condition.notify_all()
+        return seq
+
+    def put(self, frame, timestamp=None):
+        # Cópia para o próximo slot (frame com a shape do ring)
+        if frame.shape[:2] != self.shape[:2]:
+            raise ValueError(f"Frame {frame.shape} diferente do ring {self.shape}")
+        self.next_slot()[...] = frame.reshape(self.shape)
+        return self.commit(timestamp)
+
+    # === Consumidores ===
+    def valid(self, seq):
+        return self.ring.valid(seq)
+
+    def latest(self, copy=False):
+        return self.ring.latest(copy)
+
+    def get(self, seq, copy=True):
+        return self.ring.get(seq, copy)
+
+    def wait(self, after=0, timeout=None):
+        """
+        Espera por um frame com seq > after; devolve como SharedFrameRing.latest()
+        ou (after, None, 0.0) em timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.ring.seq > after, timeout):
+                return after, None, 0.0
+        return self.ring.latest()
+
+    def close(self):
+        self.ring.close()
@@ -0,0 +1,54 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Filtro de movimento barato antes da inferência: diferença entre o frame
+    atual e o último frame processado, ambos reduzidos a `width` píxeis de
+    largura em tons de cinzento.
+
+    check(frame) devolve True quando é preciso correr a inferência: houve
+    movimento (mais de min_changed_ratio dos píxeis mudaram mais de
+    threshold níveis) ou o último resultado tem mais de max_reuse_age segundos.
+    """
+
+    def __init__(self, width=160, threshold=12, min_changed_ratio=0.002, max_reuse_age=2.0, stats=None):
+        self.width = width
+        self.threshold = threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.max_reuse_age = max_reuse_age
+        self.reference = None
+        self.reference_time = 0.0
+        # stats pode ser partilhado (ex.: contadores por câmara em stream_manager)
+        self.stats = stats if stats is not None else {}
+        self.stats.setdefault("processed", 0)
+        self.stats.setdefault("skipped", 0)
+
+    def _small(self, frame):
+        height, width = frame.shape[:2]
+        size = (self.width, max(int(round(height * self.width / width)), 1))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def check(self, frame, now=None):
+        now = time.monotonic() if now is None else now
+        small = self._small(frame)
+
+        if (self.reference is None or small.shape != self.reference.shape
+                or now - self.reference_time >= self.max_reuse_age):
+            moved = True
+        else:
+            changed = np.count_nonzero(cv2.absdiff(small, self.reference) > self.threshold)
+            moved = changed >= self.min_changed_ratio * small.size
+
+        if moved:
+            self.reference = small
+            self.reference_time = now
+            self.stats["processed"] += 1
+        else:
+            self.stats["skipped"] += 1
+        return moved
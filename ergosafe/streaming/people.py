@@ -0,0 +1,28 @@
+import numpy as np
+
+# Pessoas com confiança média dos keypoints abaixo disto são ignoradas
+MIN_PERSON_CONF = 0.7
+# Só há scoring REBA / RULA quando o nariz (keypoint 0) tem confiança acima disto
+MIN_NOSE_CONF = 0.7
+
+
+def candidates(keypoints_all, min_conf=MIN_PERSON_CONF):
+    """
+    Pessoas (n, 17, 3) com confiança média >= min_conf.
+    """
+    if keypoints_all is None or not len(keypoints_all):
+        return np.zeros((0, 17, 3), dtype=np.float32)  # Nenhum esqueleto detetado
+    return keypoints_all[keypoints_all[..., 2].mean(axis=1) >= min_conf]
+
+
+def most_central(keypoints_cand, frame_shape):
+    """
+    Pessoa avaliada no modo de uma pessoa: a mais centrada no frame.
+    """
+    centers = keypoints_cand[:, :, :2].mean(axis=1)
+    dist_center = np.hypot(centers[:, 0] - frame_shape[1] / 2, centers[:, 1] - frame_shape[0] / 2)
+    return keypoints_cand[int(np.argmin(dist_center))]
+
+
+def is_scored(person, min_conf=MIN_NOSE_CONF):
+    return person[0][2] > min_conf
@@ -0,0 +1,32 @@
+POSE_MODEL_PATH = "yolov8n-pose.pt"
+POSE_BACKEND = "torch"
+# "fp32" (POSE_BACKEND / POSE_MODEL_PATH) ou "int8" (ONNX quantizado com
+# scripts/quantize_pose_model.py, corre no ONNX Runtime)
+POSE_PRECISION = "fp32"
+POSE_INT8_MODEL_PATH = "yolov8n-pose-int8.onnx"
+
+# Filtro de movimento antes da inferência (kwargs do MotionGate, None desliga):
+# frames sem movimento reutilizam o último resultado até max_reuse_age segundos
+MOTION_GATE = {"width": 160, "threshold": 12, "min_changed_ratio": 0.002, "max_reuse_age": 2.0}
+
+# Multi-pessoa: todas as pessoas com confiança suficiente são avaliadas, cada uma com
+# o seu track id e agregador (kwargs do PoseTracker em POSE_TRACKING, None usa os valores
+# por defeito)
+MULTI_PERSON = False
+POSE_TRACKING = None
+
+# Inferência num recorte à volta da pessoa (kwargs do PersonROI, ex.: {"imgsz": 320,
+# "padding": 0.3, "full_frame_every": 30}; True usa os valores por defeito, None desliga).
+# Só no modo de uma pessoa
+POSE_ROI = None
+
+# Keyframes: o modelo só corre a cada keyframe_every frames e os keypoints são propagados
+# por fluxo ótico entre eles (kwargs do KeypointPropagator, ex.: {"keyframe_every": 5};
+# True usa os valores por defeito, None desliga)
+KEYFRAMES = None
+
+# Processamento: "threads" (uma thread por câmara no processo da API) ou "processes"
+# (InferenceWorkerPool: PROCESSING_WORKERS processos, frames por memória partilhada)
+PROCESSING_MODE = "threads"
+PROCESSING_WORKERS = 2
+FRAME_RING_SLOTS = 8
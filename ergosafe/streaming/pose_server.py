@@ -0,0 +1,148 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+from ergosafe.streaming.backends import create_backend, pose_model_settings
+
+logger = logging.getLogger("PoseServer")
+
+# Orçamento de latência: tempo máximo que o primeiro pedido espera por
+# frames de outras câmaras antes de o lote ser executado
+MAX_WAIT_MS = 15
+MAX_BATCH_SIZE = 16
+# Câmara considerada ativa se submeteu um frame nos últimos N segundos
+ACTIVE_CAMERA_TIMEOUT = 2.0
+
+# Um servidor (e um modelo) por (backend, model_path, device) no processo
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+class PoseModelServer:
+    """
+    Instância única do modelo de pose partilhada por todas as câmaras.
+
+    Cada câmara submete o seu frame mais recente; o scheduler junta os
+    pedidos pendentes num único `predict` em lote, até MAX_BATCH_SIZE frames
+    ou até esgotar `max_wait_ms` (ou logo que todas as câmaras ativas tenham
+    submetido), e devolve a cada câmara o seu resultado. Pedidos com imgsz
+    diferentes (ex.: recortes da pessoa) seguem em lotes separados.
+    """
+
+    def __init__(self, model_path="yolov8n-pose.pt", device=None, max_wait_ms=MAX_WAIT_MS,
+                 max_batch_size=MAX_BATCH_SIZE, backend="torch", backend_options=None):
+        # backend: "torch", "onnx", "openvino" (ver ergosafe.streaming.backends)
+        self.backend = create_backend(backend, model_path, device, **(backend_options or {}))
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self.pending = {}    # cam_id -> (frame, imgsz, Future)
+        self.last_seen = {}  # cam_id -> instante do último pedido
+        self.condition = threading.Condition()
+        self.running = True
+        self.stats = {"batches": 0, "frames": 0, "dropped": 0}
+
+        self.thread = threading.Thread(target=self._scheduler_loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, cam_id, frame, imgsz=None):
+        """
+        Submete o frame mais recente de uma câmara (cam_id pode ser qualquer
+        chave que identifique a pipeline). Um pedido ainda pendente da mesma
+        chave é substituído (o seu Future recebe None).
+        """
+        future = Future()
+        with self.condition:
+            previous = self.pending.pop(cam_id, None)
+            if previous is not None:
+                previous[-1].set_result(None)
+                self.stats["dropped"] += 1
+            self.pending[cam_id] = (frame, imgsz, future)
+            self.last_seen[cam_id] = time.monotonic()
+            self.condition.notify()
+        return future
+
+    def predict(self, cam_id, frame, imgsz=None, timeout=None):
+        """
+        Versão bloqueante de submit: devolve os keypoints (n, 17, 3) do frame
+        ou None se foi substituído.
+        """
+        return self.submit(cam_id, frame, imgsz).result(timeout=timeout)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            for *_, future in self.pending.values():
+                future.set_result(None)
+            self.pending.clear()
+            self.condition.notify()
+        self.thread.join()
+
+    def _active_cameras(self, now):
+        # Remove câmaras/pipelines que deixaram de submeter
+        for cam in [cam for cam, seen in self.last_seen.items() if now - seen >= ACTIVE_CAMERA_TIMEOUT]:
+            del self.last_seen[cam]
+        return set(self.last_seen)
+
+    def _next_batch(self):
+        with self.condition:
+            while self.running and not self.pending:
+                self.condition.wait()
+            if not self.running:
+                return []
+
+            deadline = time.monotonic() + self.max_wait
+            while self.running:
+                now = time.monotonic()
+                if len(self.pending) >= self.max_batch_size:
+                    break
+                if self._active_cameras(now) <= set(self.pending):
+                    break
+                if now >= deadline:
+                    break
+                self.condition.wait(deadline - now)
+
+            cams = list(self.pending)[:self.max_batch_size]
+            return [(cam, *self.pending.pop(cam)) for cam in cams]
+
+    def _scheduler_loop(self):
+        while self.running:
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(request[2], []).append(request)
+
+            for imgsz, group in groups.items():
+                frames = [frame for _, frame, _, _ in group]
+                try:
+                    results = self.backend.predict(frames, imgsz=imgsz)
+                except Exception as e:
+                    logger.error(f"Erro no predict em lote ({len(frames)} frames): {e}")
+                    for *_, future in group:
+                        future.set_exception(e)
+                    continue
+
+                self.stats["batches"] += 1
+                self.stats["frames"] += len(frames)
+                for (*_, future), result in zip(group, results):
+                    future.set_result(result)
+
+
+def get_pose_server(model_path=None, device=None, backend=None, **kwargs):
+    """
+    Devolve o servidor partilhado para (backend, model_path, device), criando-o
+    na primeira chamada. Sem backend/model_path usa a precisão de pose_config.
+    """
+    default_backend, default_path = pose_model_settings()
+    backend = backend or default_backend
+    model_path = model_path or default_path
+    key = (backend, model_path, device)
+    with _servers_lock:
+        if key not in _servers:
+            logger.info(f"A carregar modelo de pose partilhado: {model_path} ({backend})")
+            _servers[key] = PoseModelServer(model_path, device, backend=backend, **kwargs)
+        return _servers[key]
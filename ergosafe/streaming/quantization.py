@@ -0,0 +1,86 @@
+import re
+import logging
+import cv2
+from pathlib import Path
+
+from ergosafe.streaming.backends import DEFAULT_IMGSZ, letterbox, to_blob
+
+logger = logging.getLogger("PoseQuantization")
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def list_frames(frames_dir, limit=None):
+    paths = sorted(p for p in Path(frames_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    return paths[:limit] if limit else paths
+
+
+class FrameCalibrationReader:
+    """
+    Leitor de calibração para onnxruntime.quantization: frames de uma pasta
+    com o mesmo letterbox/normalização usado em inferência.
+    """
+
+    def __init__(self, frames_dir, input_name, imgsz=DEFAULT_IMGSZ, limit=200):
+        self.paths = list_frames(frames_dir, limit)
+        if not self.paths:
+            raise ValueError(f"Sem imagens de calibração em {frames_dir}")
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self.index = 0
+
+    def get_next(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(str(self.paths[self.index]))
+            self.index += 1
+            if frame is not None:
+                image, _, _ = letterbox(frame, self.imgsz)
+                return {self.input_name: to_blob([image])}
+        return None
+
+    def rewind(self):
+        self.index = 0
+
+
+def head_nodes(model):
+    """
+    Nós do último módulo (cabeça Pose: descodificação de caixas/keypoints),
+    mantidos em FP32 por serem os mais sensíveis à quantização.
+    """
+    pattern = re.compile(r"/model\.(\d+)/")
+    indices = [int(m.group(1)) for node in model.graph.node if (m := pattern.search(node.name))]
+    if not indices:
+        return []
+    prefix = f"/model.{max(indices)}/"
+    return [node.name for node in model.graph.node if node.name.startswith(prefix)]
+
+
+def quantize_pose_model(fp32_path, int8_path, frames_dir, imgsz=DEFAULT_IMGSZ, limit=200, per_channel=True,
+                        exclude_head=True):
+    """
+    Quantização estática INT8 (QDQ, pesos e ativações INT8) de um modelo
+    ONNX FP32, calibrada com os frames de frames_dir.
+    """
+    try:
+        import onnx
+        import onnxruntime as ort
+        from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    except ImportError as e:
+        raise ImportError("Quantização INT8 requer os pacotes 'onnx' e 'onnxruntime'") from e
+
+    input_name = ort.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    reader = FrameCalibrationReader(frames_dir, input_name, imgsz, limit)
+    excluded = head_nodes(onnx.load(str(fp32_path))) if exclude_head else []
+    logger.info(f"Calibração com {len(reader.paths)} frames; {len(excluded)} nós da cabeça em FP32")
+
+    quantize_static(
+        str(fp32_path), str(int8_path), reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=excluded,
+    )
+    logger.info(f"Modelo INT8 guardado em {int8_path}")
+    return int8_path
@@ -0,0 +1,82 @@
+import numpy as np
+
+from ergosafe.streaming.tracker import keypoint_boxes
+
+
+class PersonROI:
+    """
+    Região de interesse da pessoa avaliada: depois de uma deteção no frame
+    completo, os frames seguintes são processados num recorte com margem à
+    volta da caixa da pessoa e a uma resolução de entrada menor (imgsz).
+
+    Volta ao frame completo a cada full_frame_every frames, quando a pessoa
+    se perde no recorte ou a sua confiança média fica abaixo de min_conf.
+    """
+
+    def __init__(self, imgsz=320, padding=0.3, full_frame_every=30, min_conf=0.7, min_size=64):
+        self.imgsz = imgsz
+        self.padding = padding
+        self.full_frame_every = full_frame_every
+        self.min_conf = min_conf
+        self.min_size = min_size
+        self.box = None
+        self.frames_since_full = 0
+        self.stats = {"full": 0, "roi": 0, "fallback": 0}
+
+    def next_region(self, frame_shape):
+        """
+        (x1, y1, x2, y2) do recorte para este frame ou None para o frame completo.
+        """
+        if self.box is None or self.frames_since_full >= self.full_frame_every:
+            self.stats["full"] += 1
+            self.frames_since_full = 0
+            return None
+
+        height, width = frame_shape[:2]
+        x1, y1, x2, y2 = self.box
+        pad_x = max((x2 - x1) * self.padding, (self.min_size - (x2 - x1)) / 2)
+        pad_y = max((y2 - y1) * self.padding, (self.min_size - (y2 - y1)) / 2)
+        region = (max(int(x1 - pad_x), 0), max(int(y1 - pad_y), 0),
+                  min(int(np.ceil(x2 + pad_x)), width), min(int(np.ceil(y2 + pad_y)), height))
+        if region[2] - region[0] < 2 or region[3] - region[1] < 2:
+            self.stats["full"] += 1
+            return None
+
+        self.stats["roi"] += 1
+        self.frames_since_full += 1
+        return region
+
+    def crop(self, frame, region):
+        x1, y1, x2, y2 = region
+        return np.ascontiguousarray(frame[y1:y2, x1:x2])
+
+    def to_frame(self, keypoints, region):
+        # Keypoints do recorte -> coordenadas do frame completo
+        keypoints = keypoints.copy()
+        keypoints[..., 0] += region[0]
+        keypoints[..., 1] += region[1]
+        return keypoints
+
+    def select(self, keypoints_cand, region):
+        """
+        No recorte, a pessoa seguida é a mais próxima do centro da caixa anterior.
+        """
+        centers = keypoints_cand[:, :, :2].mean(axis=1)
+        cx, cy = (self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2
+        return int(np.argmin(np.hypot(centers[:, 0] - cx, centers[:, 1] - cy)))
+
+    def update(self, keypoints):
+        """
+        keypoints: (17, 3) da pessoa avaliada (coordenadas do frame) ou None
+        se não foi encontrada; nesse caso o próximo frame é completo.
+        """
+        if keypoints is None or keypoints[:, 2].mean() < self.min_conf:
+            self.reset()
+            return
+        box = keypoint_boxes(keypoints[None])[0]
+        self.box = None if box[2] <= box[0] or box[3] <= box[1] else tuple(float(v) for v in box)
+
+    def reset(self):
+        if self.box is not None:
+            self.stats["fallback"] += 1
+        self.box = None
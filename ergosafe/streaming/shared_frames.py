@@ -0,0 +1,157 @@
+import time
+import logging
+import numpy as np
+from multiprocessing import shared_memory
+
+logger = logging.getLogger("SharedFrames")
+
+# Cabeçalho (int64): versão, nº de slots, altura, largura, canais, último seq escrito
+HEADER_FIELDS = 8
+LAYOUT_VERSION = 1
+_VERSION, _SLOTS, _HEIGHT, _WIDTH, _CHANNELS, _WRITE_SEQ = range(6)
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+class SharedFrameRing:
+    """
+    Ring buffer de frames em multiprocessing.shared_memory: slots de tamanho
+    fixo pré-alocados, um escritor (processo de captura) e vários leitores.
+
+    Cada slot guarda o número de sequência do frame que contém (0 durante a
+    escrita); os leitores obtêm views NumPy sem cópia do frame mais recente
+    e confirmam com valid(seq) que o slot não foi reescrito entretanto.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if self.header[_VERSION] != LAYOUT_VERSION:
+            raise ValueError(f"Memória partilhada {shm.name} não é um SharedFrameRing")
+
+        slots = int(self.header[_SLOTS])
+        self.shape = (int(self.header[_HEIGHT]), int(self.header[_WIDTH]), int(self.header[_CHANNELS]))
+        offset = _align(HEADER_FIELDS * 8)
+        self.slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset = _align(offset + slots * 8)
+        self.slot_time = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset = _align(offset + slots * 8)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        self.slots = slots
+        self._writing = None
+
+    @staticmethod
+    def _size(shape, slots):
+        return (_align(HEADER_FIELDS * 8) + 2 * _align(slots * 8)
+                + slots * int(np.prod(shape)))
+
+    @classmethod
+    def create(cls, shape, slots=4, name=None):
+        """
+        Cria o ring para frames com shape (altura, largura, canais).
+        """
+        shape = tuple(shape) if len(shape) == 3 else tuple(shape) + (1,)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls._size(shape, slots))
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_SLOTS] = slots
+        header[_HEIGHT:_CHANNELS + 1] = shape
+        header[_VERSION] = LAYOUT_VERSION
+        ring = cls(shm, owner=True)
+        ring.slot_seq[:] = 0
+        logger.info(f"Ring de frames {shm.name}: {slots} slots de {shape}")
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # === Escritor ===
+    def next_slot(self):
+        """
+        View do próximo slot para escrita direta (ex.: cv2.rotate(frame, code,
+        dst=view)); o frame só fica visível depois de commit().
+        """
+        seq = int(self.header[_WRITE_SEQ]) + 1
+        slot = seq % self.slots
+        self.slot_seq[slot] = 0  # slot em escrita
+        self._writing = seq
+        return self.frames[slot]
+
+    def commit(self, timestamp=None):
+        seq, self._writing = self._writing, None
+        slot = seq % self.slots
+        self.slot_time[slot] = time.time() if timestamp is None else timestamp
+        self.slot_seq[slot] = seq
+        self.header[_WRITE_SEQ] = seq
+        return seq
+
+    def write(self, frame, timestamp=None):
+        """
+        Copia um frame com a shape do ring para o próximo slot. Devolve o seq.
+        """
+        if frame.shape[:2] != self.shape[:2]:
+            raise ValueError(f"Frame {frame.shape} diferente do ring {self.shape}")
+        np.copyto(self.next_slot(), frame.reshape(self.shape))
+        return self.commit(timestamp)
+
+    # === Leitores ===
+    @property
+    def seq(self):
+        return int(self.header[_WRITE_SEQ])
+
+    def valid(self, seq):
+        # O frame seq ainda está no seu slot (não foi reescrito)
+        return seq > 0 and int(self.slot_seq[seq % self.slots]) == seq
+
+    def latest(self, copy=False):
+        """
+        (seq, frame, timestamp) do frame mais recente; frame é uma view do
+        slot, válida enquanto valid(seq). (0, None, 0.0) se ainda não há frames.
+        """
+        while True:
+            seq = self.seq
+            if seq == 0:
+                return 0, None, 0.0
+            slot = seq % self.slots
+            frame, timestamp = self.frames[slot], float(self.slot_time[slot])
+            if copy:
+                frame = frame.copy()
+            # Com cópia, repete se o escritor deu a volta ao ring durante a cópia
+            if not copy or self.valid(seq):
+                return seq, frame, timestamp
+
+    def get(self, seq, copy=True):
+        """
+        Frame seq se ainda estiver no ring, senão None.
+        """
+        if not self.valid(seq):
+            return None
+        frame = self.frames[seq % self.slots]
+        if copy:
+            frame = frame.copy()
+            if not self.valid(seq):
+                return None
+        return frame
+
+    def close(self):
+        # As views deixam de ser válidas depois de close()
+        self.header = self.slot_seq = self.slot_time = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning(f"Ring {self.shm.name}: views ainda em uso, mapeamento mantido")
+        if self.owner:
+            self.shm.unlink()
@@ -1,22 +1,61 @@
 # src/stream_manager.py
 
+import os
 import time
+import asyncio
 import cv2
 import logging
 import numpy as np
-from threading import Thread
-from queue import Queue
+from threading import Lock, Thread
 from ergosafe.db.crud import get_camera_by_id
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from ergosafe.streaming.inference import YoloPoseSkeleton
+from ergosafe.influx.score_cache import publish_tables
+from ergosafe.streaming.broadcast import JpegBroadcast, stream_variant
+from ergosafe.streaming.capture_config import CAPTURE_OPTIONS, CAPTURE_OPTIONS_BY_CAMERA
+from ergosafe.streaming.cpu_budget import apply_thread_budget, available_cores, plan_layout
+from ergosafe.streaming.gstreamer import build_pipeline
+from ergosafe.streaming.hub import FrameHub
+from ergosafe.streaming.inference import YoloPoseSkeleton, draw_skeleton
+from ergosafe.streaming.jpeg import EncodedFrameCache
+from ergosafe.streaming.latest_frame import LatestFrame, SharedLatestFrame
+from ergosafe.streaming.pose_server import get_pose_server
+from ergosafe.streaming.pose_config import (
+    FRAME_RING_SLOTS,
+    KEYFRAMES,
+    MOTION_GATE,
+    MULTI_PERSON,
+    POSE_TRACKING,
+    POSE_ROI,
+    PROCESSING_MODE,
+    PROCESSING_WORKERS,
+)
+from ergosafe.streaming.shared_frames import SharedFrameRing
+from ergosafe.streaming.worker_pool import InferenceWorkerPool
 
 
 logger = logging.getLogger("StreamManager")
 
-# Guarda threads de aquisição
+# Guarda threads de aquisição e de processamento (pose + scoring, uma por câmara)
 acquisition_threads = {}
-queues = {}
+processing_threads = {}
+latest_frames = {}
 running_flags = {}
+# Último resultado de cada câmara (frame anotado + ângulos) para os viewers
+hubs = {}
+# JPEG partilhado pelos viewers HTTP de cada câmara (criado no primeiro pedido)
+broadcasts = {}
+# JPEGs por (câmara, seq, qualidade, largura), partilhados por streams e snapshots
+jpeg_cache = EncodedFrameCache()
+# Modo "processes": ring de frames partilhado por câmara (SharedLatestFrame) e pool de workers
+rings = {}
+_worker_pool = None
+_worker_pool_lock = Lock()
+# Distribuição de CPU atual (cpu_budget.plan_layout), refeita em /start e /stop
+cpu_layout = []
+_cpu_lock = Lock()
+# Contadores do filtro de movimento por câmara (processados / saltados)
+motion_stats = {}
 
 
 def start_acquisition(camera_id: int):
@@ -29,82 +68,251 @@ def start_acquisition(camera_id: int):
         logger.info(f"Câmara {camera_id} já está a ser adquirida.")
         return
 
-    frame_queue = Queue(maxsize=2)
-    queues[camera_id] = frame_queue
+    # === Obter operador associado à câmara ===
+    operator = f"user_{camera.user_id}" if camera.user_id else "default"
+
+    # Último frame capturado: o processamento espera pelo seguinte em vez de fazer polling
+    latest_frame = LatestFrame()
+    latest_frames[camera_id] = latest_frame
     running_flags[camera_id] = True
+    hub = FrameHub()
+    hubs[camera_id] = hub
 
     def capture_loop():
         logger.info(f"[cam_{camera_id}] Início da aquisição")
-        pipeline = (
-            f"rtspsrc location={camera.url} latency=0 ! "
-            "rtph264depay ! h264parse ! avdec_h264 ! videoconvert ! "
-            "video/x-raw,format=BGR ! appsink drop=1 max-buffers=1 sync=false"
-            )
+        # Tamanho, rotação e ritmo aplicados no próprio pipeline (videoscale/videoflip/videorate)
+        options = dict(CAPTURE_OPTIONS, **CAPTURE_OPTIONS_BY_CAMERA.get(camera_id, {}))
+        pipeline = build_pipeline(camera.url, **options)
         cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
         if not cap.isOpened():
             logger.error(f"[cam_{camera_id}] Erro ao abrir o stream - URL: {camera.url}")
             return
 
         while running_flags[camera_id]:
-            ret, frame = cap.read()
+            if camera_id in rings:
+                ret = _read_into_ring(cap, rings[camera_id])
+            else:
+                ret, frame = cap.read()
             if not ret:
                 time.sleep(0.1)
                 continue
-            if not frame_queue.full():
-                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-                frame_queue.put(frame)
-            time.sleep(0.05)  # ~20 FPS
+            if PROCESSING_MODE == "processes":
+                if camera_id not in rings:
+                    _create_ring(camera_id, frame, operator)
+            else:
+                latest_frame.put(frame)
 
         cap.release()
+        latest_frame.close()
         logger.info(f"[cam_{camera_id}] Aquisição terminada")
 
+    def processing_loop():
+        # Pose + scoring uma vez por frame, com ou sem viewers; o modelo é partilhado
+        # por todas as câmaras do processo
+        motion_gate = dict(MOTION_GATE, stats=motion_stats.setdefault(camera_id, {})) if MOTION_GATE else None
+        pose_detector = YoloPoseSkeleton(cam_id=camera_id, operator=operator, pose_server=get_pose_server(),
+                                         motion_gate=motion_gate, roi=POSE_ROI, keyframes=KEYFRAMES,
+                                         multi_person=MULTI_PERSON, tracking=POSE_TRACKING)
+
+        seq = 0
+        while running_flags[camera_id]:
+            seq, frame, timestamp = latest_frame.wait(seq, timeout=0.5)
+            if frame is None:
+                continue
+            try:
+                angles_list, annotated = pose_detector.detect_and_compute_angles(frame)
+            except Exception as e:
+                logger.error(f"[cam_{camera_id}] Erro no processamento: {e}")
+                continue
+            hub.publish({"frame": annotated, "angles": angles_list, "people": pose_detector.last_people,
+                         "timestamp": timestamp})
+
+        hub.close()
+        logger.info(f"[cam_{camera_id}] Processamento terminado")
+
     thread = Thread(target=capture_loop, daemon=True)
     thread.start()
     acquisition_threads[camera_id] = thread
 
+    # Modo "processes": o processamento corre no pool de workers (ver _create_ring)
+    if PROCESSING_MODE != "processes":
+        worker = Thread(target=processing_loop, daemon=True)
+        worker.start()
+        processing_threads[camera_id] = worker
+        rebalance_cpu()
+
 
 def stop_camera_stream(camera_id: int):
     running_flags[camera_id] = False
     if camera_id in acquisition_threads:
         acquisition_threads[camera_id].join()
+        if camera_id in processing_threads:
+            processing_threads.pop(camera_id).join()
+        if camera_id in rings:
+            get_worker_pool().remove_camera(camera_id)
+            rings.pop(camera_id).close()
+        hubs[camera_id].close()
         del acquisition_threads[camera_id]
-        del queues[camera_id]
+        del latest_frames[camera_id]
+        del hubs[camera_id]
+        broadcasts.pop(camera_id, None)
+        jpeg_cache.drop(camera_id)  # os seqs recomeçam na próxima aquisição
         del running_flags[camera_id]
+        rebalance_cpu()
 
-def get_stream(camera_id: int):
-    if camera_id not in queues:
-        start_acquisition(camera_id)
-        time.sleep(1)
 
-    # === Obter operador associado à câmara ===
-    camera = get_camera_by_id(camera_id)
-    operator = f"user_{camera.user_id}" if camera and camera.user_id else "default"
+def rebalance_cpu():
+    """
+    Recalcula afinidade e threads (torch / OpenCV) para as câmaras ativas.
+    """
+    global cpu_layout
+    # Serializado: as capturas podem registar câmaras em paralelo
+    with _cpu_lock:
+        if PROCESSING_MODE == "processes":
+            layout = plan_layout("processes", get_worker_pool().cameras_per_worker())
+            get_worker_pool().apply_layout(layout)
+        else:
+            layout = plan_layout("threads", list(processing_threads))
+        api = layout[0]
+        apply_thread_budget(api["cores"], api["torch_threads"], api["cv2_threads"])
+        cpu_layout = layout
+    logger.info(f"Distribuição de CPU: {[(e['process'], len(e['cores']), e['torch_threads']) for e in layout]}")
 
-    def generate():
-        pose_detector = YoloPoseSkeleton(cam_id=camera_id, operator=operator)
 
-        while True:
-            if camera_id not in queues:
-                break
+def get_cpu_report():
+    """
+    Distribuição de CPU escolhida e FPS medido por câmara.
+    """
+    pids = get_worker_pool().worker_pids() if _worker_pool is not None else []
+    processes = []
+    for entry in cpu_layout:
+        pid = None
+        if entry["process"] == "api":
+            pid = os.getpid()
+        elif int(entry["process"].split("_")[1]) < len(pids):
+            pid = pids[int(entry["process"].split("_")[1])]
+        processes.append(dict(entry, pid=pid))
+    return {
+        "mode": PROCESSING_MODE,
+        "cores": available_cores(),
+        "processes": processes,
+        "fps": {camera_id: round(hub.fps(), 2) for camera_id, hub in hubs.items()},
+    }
 
-            if not queues[camera_id].empty():
-                frame = queues[camera_id].get()
-                angles_list, annotated = pose_detector.detect_and_compute_angles(frame)
 
-                # for idx, angles in enumerate(angles_list):
-                #     for i, angle in enumerate(angles):
-                #         cv2.putText(annotated, f"A{i+1}: {angle[0]:.1f}", (10, 20 + 20*i + idx*300),
-                #                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
+def get_worker_pool():
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = InferenceWorkerPool(PROCESSING_WORKERS, _publish_worker_result, motion_gate=MOTION_GATE,
+                                               roi=POSE_ROI, keyframes=KEYFRAMES, multi_person=MULTI_PERSON,
+                                               tracking=POSE_TRACKING)
+        return _worker_pool
 
-                ret, jpeg = cv2.imencode(".jpg", annotated)
 
-                if ret:
-                    yield (b"--frame\r\n"
-                           b"Content-Type: image/jpeg\r\n\r\n" + jpeg.tobytes() + b"\r\n")
-            else:
-                time.sleep(0.01)
+def _create_ring(camera_id, frame, operator):
+    # Ring com a shape dos frames entregues pelo pipeline; cada commit acorda o
+    # worker a que a câmara foi atribuída
+    pool = get_worker_pool()
+    ring = SharedFrameRing.create(frame.shape, slots=FRAME_RING_SLOTS)
+    index = pool.add_camera(camera_id, ring.name, operator)
+    frames = SharedLatestFrame(ring, pool.frame_conditions[index])
+    frames.put(frame)
+    rings[camera_id] = frames
+    rebalance_cpu()
+
+
+def _read_into_ring(cap, ring):
+    # Descodifica diretamente no slot do ring partilhado com os workers (sem cópia)
+    slot = ring.next_slot()
+    ret, frame = cap.read(slot)
+    if not ret:
+        return False
+    if frame is not slot:
+        # A fonte mudou de resolução: o OpenCV alocou outro buffer
+        cv2.resize(frame, ring.shape[1::-1], dst=slot)
+    ring.commit()
+    return True
+
+
+def _publish_worker_result(result):
+    # Chamado pelo pool no processo da API: desenha os esqueletos no frame do ring
+    camera_id = result["camera_id"]
+    ring, hub = rings.get(camera_id), hubs.get(camera_id)
+    if ring is None or hub is None:
+        return
+
+    annotated = ring.get(result["seq"])
+    if annotated is None:
+        annotated = ring.latest(copy=True)[1]
+    for person in result["people"]:
+        draw_skeleton(annotated, person["keypoints"], person["track_id"])
+
+    motion_stats.setdefault(camera_id, {}).update(result["motion"])
+    tables = result.get("tables")
+    if tables:
+        # Tabelas calculadas no worker servidas pelos endpoints deste processo
+        publish_tables(camera_id, result["operator"], tables["reba_table"], tables["rula_table"], tables["timestamp"])
+    hub.publish({"frame": annotated, "angles": result["angles"], "people": result["people"],
+                 "timestamp": result["timestamp"]})
+
+def get_broadcast(camera_id: int):
+    """
+    JpegBroadcast da câmara (criado no event loop em curso), ou None se a
+    câmara não está ativa.
+    """
+    hub = hubs.get(camera_id)
+    if hub is None:
+        return None
+    broadcast = broadcasts.get(camera_id)
+    if broadcast is None or broadcast.hub is not hub:
+        broadcast = JpegBroadcast(camera_id, hub, asyncio.get_running_loop(), jpeg_cache)
+        broadcasts[camera_id] = broadcast
+    return broadcast
+
+
+async def get_stream(camera_id: int, quality: int = None, width: int = None):
+    """
+    Stream MJPEG da câmara; quality (1-100) e width (largura máxima) reduzem
+    o CPU de codificação e a largura de banda por cliente.
+    """
+    if camera_id not in hubs:
+        await run_in_threadpool(start_acquisition, camera_id)
+    broadcast = get_broadcast(camera_id)
+    if broadcast is None:
+        return None
+
+    async def generate():
+        # Todos os viewers recebem o mesmo JPEG; um viewer lento salta para o mais recente
+        async for jpeg in broadcast.frames(stream_variant(quality, width)):
+            yield (b"--frame\r\n"
+                   b"Content-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n")
 
     return StreamingResponse(generate(), media_type="multipart/x-mixed-replace; boundary=frame")
 
 
+async def get_snapshot(camera_id: int, quality: int = None, width: int = None):
+    """
+    (versão, JPEG) do último frame anotado da câmara, ou None se não está ativa
+    ou ainda não tem frames. A versão muda a cada frame publicado.
+    """
+    broadcast = get_broadcast(camera_id)
+    if broadcast is None:
+        return None
+    variant = stream_variant(quality, width)
+    snapshot = await run_in_threadpool(broadcast.snapshot, variant)
+    if snapshot is None:
+        return None
+    seq, jpeg = snapshot
+    return f"{broadcast.tag}-{seq}-q{variant[0]}-w{variant[1] or 0}", jpeg
+
 
+def get_motion_stats():
+    """
+    Frames processados / saltados pelo filtro de movimento, por câmara.
+    """
+    stats = {}
+    for camera_id, counters in motion_stats.items():
+        total = counters.get("processed", 0) + counters.get("skipped", 0)
+        stats[camera_id] = dict(counters, skipped_ratio=counters.get("skipped", 0) / total if total else 0.0)
+    return stats
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+def keypoint_boxes(keypoints):
+    """
+    Caixas (N, 4) x1, y1, x2, y2 a partir de keypoints (N, 17, 3).
+    Keypoints não detetados (confiança 0) são ignorados.
+    """
+    seen = keypoints[..., 2] > 0
+    big = np.float32(1e9)  # caixas sem keypoints ficam vazias (área 0)
+    x, y = keypoints[..., 0], keypoints[..., 1]
+    boxes = np.stack([np.where(seen, x, big).min(axis=1),
+                      np.where(seen, y, big).min(axis=1),
+                      np.where(seen, x, -big).max(axis=1),
+                      np.where(seen, y, -big).max(axis=1)], axis=1)
+    return boxes
+
+
+def box_iou(a, b):
+    """
+    IoU entre todas as caixas de a (M, 4) e b (N, 4) -> (M, N).
+    """
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = np.clip(a[:, 2] - a[:, 0], 0, None) * np.clip(a[:, 3] - a[:, 1], 0, None)
+    area_b = np.clip(b[:, 2] - b[:, 0], 0, None) * np.clip(b[:, 3] - b[:, 1], 0, None)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+
+class PoseTracker:
+    """
+    Associação de deteções entre frames por IoU das caixas dos keypoints e
+    distância média dos keypoints (normalizada pela diagonal da imagem).
+    Associação gulosa pelo menor custo, suficiente para poucas pessoas por
+    câmara e sem segundo passo do modelo.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=0.1, max_missed=10):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.next_id = 1
+        self.track_ids = np.zeros(0, dtype=np.int64)
+        self.track_keypoints = np.zeros((0, 17, 3), dtype=np.float32)
+        self.missed = np.zeros(0, dtype=np.int64)
+
+    def update(self, keypoints, frame_shape):
+        """
+        keypoints: (N, 17, 3) das deteções deste frame.
+        Devolve (ids, expirados): id de track por deteção e ids de tracks
+        removidas por estarem ausentes há mais de max_missed frames.
+        """
+        keypoints = np.asarray(keypoints, dtype=np.float32).reshape(-1, 17, 3)
+        n_det, n_trk = len(keypoints), len(self.track_ids)
+        ids = np.zeros(n_det, dtype=np.int64)
+        matched_tracks = np.zeros(n_trk, dtype=bool)
+
+        if n_det and n_trk:
+            diagonal = float(np.hypot(frame_shape[0], frame_shape[1]))
+            iou = box_iou(keypoint_boxes(self.track_keypoints), keypoint_boxes(keypoints))
+            both = (self.track_keypoints[:, None, :, 2] > 0) & (keypoints[None, :, :, 2] > 0)
+            dist = np.linalg.norm(self.track_keypoints[:, None, :, :2] - keypoints[None, :, :, :2], axis=-1)
+            dist = (dist * both).sum(axis=-1) / np.maximum(both.sum(axis=-1), 1) / diagonal
+            gate = (iou >= self.iou_threshold) | (dist <= self.max_distance)
+            cost = np.where(gate, (1 - iou) + dist, np.inf)
+
+            matched_dets = np.zeros(n_det, dtype=bool)
+            for flat in np.argsort(cost, axis=None):
+                t, d = divmod(int(flat), n_det)
+                if not np.isfinite(cost[t, d]):
+                    break
+                if matched_tracks[t] or matched_dets[d]:
+                    continue
+                matched_tracks[t] = matched_dets[d] = True
+                ids[d] = self.track_ids[t]
+                self.track_keypoints[t] = keypoints[d]
+
+        self.missed = np.where(matched_tracks, 0, self.missed + 1)
+
+        new = ids == 0
+        if new.any():
+            count = int(new.sum())
+            ids[new] = np.arange(self.next_id, self.next_id + count)
+            self.next_id += count
+            self.track_ids = np.concatenate([self.track_ids, ids[new]])
+            self.track_keypoints = np.concatenate([self.track_keypoints, keypoints[new]])
+            self.missed = np.concatenate([self.missed, np.zeros(count, dtype=np.int64)])
+
+        alive = self.missed <= self.max_missed
+        expired = self.track_ids[~alive].tolist()
+        self.track_ids = self.track_ids[alive]
+        self.track_keypoints = self.track_keypoints[alive]
+        self.missed = self.missed[alive]
+        return ids, expired
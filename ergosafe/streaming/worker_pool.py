@@ -0,0 +1,180 @@
+import logging
+import threading
+import multiprocessing as mp
+from queue import Empty
+
+logger = logging.getLogger("WorkerPool")
+
+# Tempo máximo de espera por um frame novo antes de verificar se a câmara foi removida
+FRAME_TIMEOUT = 0.5
+
+
+def _camera_loop(camera_id, ring_name, operator, results, stop, motion_gate, roi, keyframes, multi_person, tracking,
+                 frame_condition):
+    # Importados no processo worker (spawn): o processo da API não carrega o modelo
+    from ergosafe.streaming.inference import YoloPoseSkeleton
+    from ergosafe.streaming.pose_server import get_pose_server
+    from ergosafe.streaming.latest_frame import SharedLatestFrame
+
+    # Acordado pela captura a cada frame novo (condição partilhada pelas câmaras do worker)
+    ring = SharedLatestFrame.attach(ring_name, frame_condition)
+    motion_stats = {}
+    detector = YoloPoseSkeleton(cam_id=camera_id, operator=operator, pose_server=get_pose_server(),
+                                motion_gate=dict(motion_gate, stats=motion_stats) if motion_gate else None,
+                                roi=roi, keyframes=keyframes, multi_person=multi_person, tracking=tracking,
+                                annotate=False)
+    seq = 0
+    while not stop.is_set():
+        seq, frame, timestamp = ring.wait(seq, timeout=FRAME_TIMEOUT)
+        if frame is None:
+            continue
+        try:
+            # frame é uma view do slot partilhado (sem cópia)
+            angles_list, _ = detector.detect_and_compute_angles(frame)
+        except Exception as e:
+            logger.error(f"[cam_{camera_id}] Erro no processamento: {e}")
+            continue
+        if not ring.valid(seq):
+            continue  # slot reescrito durante a inferência: resultado descartado
+
+        # Resultado compacto: keypoints, ângulos, scores e últimas tabelas emitidas (sem imagem)
+        results.put({
+            "camera_id": camera_id,
+            "seq": seq,
+            "timestamp": timestamp,
+            "angles": angles_list,
+            "people": detector.last_people,
+            "operator": operator,
+            "tables": detector.last_tables,
+            "motion": dict(motion_stats),
+        })
+    ring.close()
+
+
+def _worker_main(index, commands, results, motion_gate, roi, keyframes, multi_person, tracking, frame_condition):
+    from ergosafe.streaming.cpu_budget import apply_thread_budget
+
+    logging.basicConfig(level=logging.INFO)
+    cameras = {}  # camera_id -> (thread, stop)
+    while True:
+        command, *args = commands.get()
+        if command == "budget":
+            cores, torch_threads, cv2_threads = args
+            apply_thread_budget(cores, torch_threads, cv2_threads)
+            logger.info(f"[worker_{index}] cores {cores}, torch {torch_threads} threads, cv2 {cv2_threads}")
+        elif command == "add":
+            camera_id, ring_name, operator = args
+            stop = threading.Event()
+            thread = threading.Thread(target=_camera_loop, daemon=True,
+                                      args=(camera_id, ring_name, operator, results, stop, motion_gate, roi,
+                                            keyframes, multi_person, tracking, frame_condition))
+            thread.start()
+            cameras[camera_id] = (thread, stop)
+            logger.info(f"[worker_{index}] Câmara {camera_id} adicionada")
+        elif command == "remove":
+            thread, stop = cameras.pop(args[0], (None, None))
+            if thread is not None:
+                stop.set()
+                thread.join()
+                logger.info(f"[worker_{index}] Câmara {args[0]} removida")
+        elif command == "stop":
+            for thread, stop in cameras.values():
+                stop.set()
+            for thread, _ in cameras.values():
+                thread.join()
+            break
+
+
+class InferenceWorkerPool:
+    """
+    Pose + scoring em processos separados (fora do GIL do processo da API).
+
+    Cada câmara fica atribuída a um worker (o que tiver menos câmaras); o
+    worker lê os frames do SharedLatestFrame da câmara e devolve resultados
+    compactos (keypoints, ângulos, scores) a on_result, chamado numa thread
+    do processo da API. Dentro de cada worker as câmaras partilham o modelo
+    (PoseModelServer) com predict em lote.
+    """
+
+    def __init__(self, num_workers, on_result, motion_gate=None, roi=None, keyframes=None, multi_person=False,
+                 tracking=None):
+        ctx = mp.get_context("spawn")
+        self.on_result = on_result
+        self.results = ctx.Queue()
+        self.commands = [ctx.Queue() for _ in range(num_workers)]
+        # Uma condição por worker, herdada no spawn: a captura de cada câmara
+        # notifica a condição do worker a que a câmara foi atribuída
+        self.frame_conditions = [ctx.Condition() for _ in range(num_workers)]
+        self.processes = [
+            ctx.Process(target=_worker_main, daemon=True,
+                        args=(i, self.commands[i], self.results, motion_gate, roi, keyframes, multi_person, tracking,
+                              self.frame_conditions[i]))
+            for i in range(num_workers)
+        ]
+        for process in self.processes:
+            process.start()
+        self.assignments = {}  # camera_id -> índice do worker
+        self.lock = threading.Lock()
+        self.running = True
+        self.stats = {"results": 0}
+
+        self.thread = threading.Thread(target=self._results_loop, daemon=True)
+        self.thread.start()
+        logger.info(f"Pool de inferência com {num_workers} processos")
+
+    def worker_pids(self):
+        return [process.pid for process in self.processes]
+
+    def cameras_per_worker(self):
+        with self.lock:
+            layout = [[] for _ in self.processes]
+            for camera_id, index in self.assignments.items():
+                layout[index].append(camera_id)
+            return layout
+
+    def add_camera(self, camera_id, ring_name, operator="default"):
+        with self.lock:
+            if camera_id in self.assignments:
+                return self.assignments[camera_id]
+            loads = [0] * len(self.processes)
+            for index in self.assignments.values():
+                loads[index] += 1
+            index = loads.index(min(loads))
+            self.assignments[camera_id] = index
+        self.commands[index].put(("add", camera_id, ring_name, operator))
+        return index
+
+    def remove_camera(self, camera_id):
+        with self.lock:
+            index = self.assignments.pop(camera_id, None)
+        if index is not None:
+            self.commands[index].put(("remove", camera_id))
+
+    def apply_layout(self, layout):
+        """
+        Envia a cada worker a sua entrada de cpu_budget.plan_layout.
+        """
+        for entry in layout:
+            if entry["process"].startswith("worker_"):
+                index = int(entry["process"].split("_")[1])
+                self.commands[index].put(("budget", entry["cores"], entry["torch_threads"], entry["cv2_threads"]))
+
+    def _results_loop(self):
+        while self.running:
+            try:
+                result = self.results.get(timeout=FRAME_TIMEOUT)
+            except Empty:
+                continue
+            self.stats["results"] += 1
+            try:
+                self.on_result(result)
+            except Exception as e:
+                logger.error(f"Erro ao publicar resultado da câmara {result.get('camera_id')}: {e}")
+
+    def stop(self):
+        for commands in self.commands:
+            commands.put(("stop",))
+        for process in self.processes:
+            process.join(timeout=5)
+        self.running = False
+        self.thread.join()
@@ -0,0 +1,242 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import numpy as np
+from pathlib import Path
+
+# === Diretórios ===
+BASE_DIR = Path(__file__).resolve().parent
+GOLDEN_PATH = BASE_DIR / "scoring_golden.json"
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from ergosafe.scoring.reba_score import (
+    REBA_ANGLE_FIELDS,
+    REBA_FLAG_FIELDS,
+    compute_reba_score,
+    compute_reba_scores_batch,
+    reba_inputs_to_batch,
+)
+from ergosafe.scoring.rula_score import (
+    RULA_ANGLE_FIELDS,
+    RULA_FLAG_FIELDS,
+    compute_rula_score,
+    compute_rula_scores_batch,
+    rula_inputs_to_batch,
+)
+
+from ergosafe.streaming.angles import angles_to_score_columns, compute_angles_batch
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("BenchScoring")
+
+# Ângulos nos limites de cada escalão REBA/RULA (e vizinhos)
+BOUNDARY_ANGLES = [-10, -0.5, 0, 0.5, 10, 10.5, 15, 15.5, 20, 20.5, 44.9, 45, 60, 60.5,
+                   89.9, 90, 90.5, 100, 100.5, 120, 120.5, 150]
+LOADS = [0, 3, 4.5, 5, 7, 10, 15, 20, 22, 25]
+
+
+# === Dados sintéticos ===
+def synthetic_landmarks(n, rng):
+    """
+    Landmarks (n, 33, 3) no formato que detect_and_compute_angles constrói:
+    coordenadas normalizadas nos índices MediaPipe usados pelo YOLO, z = 0.
+    """
+    mp_indices = [0, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+    landmarks = np.zeros((n, 33, 3), dtype=np.float32)
+    # esqueleto de base em pé + ruído por pose
+    base = {
+        0: (0.50, 0.10), 11: (0.42, 0.25), 12: (0.58, 0.25), 13: (0.38, 0.40),
+        14: (0.62, 0.40), 15: (0.36, 0.55), 16: (0.64, 0.55), 23: (0.45, 0.55),
+        24: (0.55, 0.55), 25: (0.45, 0.75), 26: (0.55, 0.75), 27: (0.45, 0.95),
+        28: (0.55, 0.95),
+    }
+    for idx in mp_indices:
+        landmarks[:, idx, :2] = base[idx] + rng.normal(0, 0.06, size=(n, 2))
+    return landmarks
+
+
+def synthetic_keypoints(n, rng, frame_shape=(720, 1280)):
+    """
+    Keypoints (n, 17, 3) em píxeis + confiança, como results[0].keypoints.data.
+    """
+    height, width = frame_shape
+    keypoints = np.empty((n, 17, 3), dtype=np.float32)
+    keypoints[..., 0] = rng.uniform(0, width, size=(n, 17))
+    keypoints[..., 1] = rng.uniform(0, height, size=(n, 17))
+    keypoints[..., 2] = rng.uniform(0.3, 1.0, size=(n, 17))
+    return keypoints
+
+
+def synthetic_angle_dicts(n, rng):
+    """
+    Inputs no formato de convert_angles_to_dict, com ângulos e ajustes
+    aleatórios (cobre os ramos que a pipeline em produção não exercita).
+    """
+    inputs = []
+    for _ in range(n):
+        data = {name: float(rng.uniform(-30, 180)) for name in REBA_ANGLE_FIELDS + RULA_ANGLE_FIELDS}
+        data["carga_peso"] = float(rng.choice(LOADS))
+        ajustes = {name: bool(rng.random() < 0.2) for name in set(REBA_FLAG_FIELDS + RULA_FLAG_FIELDS)}
+        ajustes["feet_supported"] = bool(rng.random() < 0.8)
+        ajustes["wrist_twist"] = int(rng.integers(0, 3))
+        data["ajustes"] = ajustes
+        inputs.append(data)
+    return inputs
+
+
+# === Medição ===
+def time_per_call(fn, items):
+    samples = np.empty(len(items), dtype=np.int64)
+    for i, item in enumerate(items):
+        t0 = time.perf_counter_ns()
+        fn(item)
+        samples[i] = time.perf_counter_ns() - t0
+    return samples
+
+
+def report(name, samples_ns):
+    total_s = samples_ns.sum() / 1e9
+    p50, p90, p99 = np.percentile(samples_ns, [50, 90, 99]) / 1e3
+    logger.info(f"{name:<38} {len(samples_ns) / total_s:>12,.0f} poses/s   "
+                f"p50 {p50:8.2f} µs   p90 {p90:8.2f} µs   p99 {p99:8.2f} µs")
+
+
+def report_batch(name, fn, batch, repeat=5):
+    best = min(_timed(fn, batch) for _ in range(repeat))
+    logger.info(f"{name:<38} {len(batch) / best:>12,.0f} poses/s   "
+                f"lote {len(batch)} em {best * 1e3:.2f} ms")
+
+
+def _timed(fn, batch):
+    t0 = time.perf_counter()
+    fn(batch)
+    return time.perf_counter() - t0
+
+
+def score_keypoints_batch(keypoints):
+    angles, _ = compute_angles_batch(keypoints, (720, 1280))
+    columns = angles_to_score_columns(angles)
+    compute_reba_scores_batch(columns)
+    compute_rula_scores_batch(columns)
+
+
+def load_pose_skeleton():
+    # Só compute_angles / convert_angles_to_dict: não carrega o modelo YOLO
+    from ergosafe.streaming.inference import YoloPoseSkeleton
+    return YoloPoseSkeleton.__new__(YoloPoseSkeleton)
+
+
+def run_benchmark(n, seed):
+    rng = np.random.default_rng(seed)
+    inputs = synthetic_angle_dicts(n, rng)
+    logger.info(f"=== Scoring ({n} poses sintéticas, seed={seed}) ===")
+    report("compute_reba_score", time_per_call(compute_reba_score, inputs))
+    report("compute_rula_score", time_per_call(compute_rula_score, inputs))
+    report_batch("compute_reba_scores_batch", compute_reba_scores_batch, reba_inputs_to_batch(inputs))
+    report_batch("compute_rula_scores_batch", compute_rula_scores_batch, rula_inputs_to_batch(inputs))
+
+    keypoints = synthetic_keypoints(n, rng)
+    report_batch("compute_angles_batch", lambda kp: compute_angles_batch(kp, (720, 1280)), keypoints)
+    report_batch("compute_angles_batch + scoring em lote", score_keypoints_batch, keypoints)
+
+    skeleton = load_pose_skeleton()
+    landmarks = synthetic_landmarks(n, rng)
+    report("YoloPoseSkeleton.compute_angles", time_per_call(skeleton.compute_angles, landmarks))
+    angles = [skeleton.compute_angles(l) for l in landmarks]
+    report("YoloPoseSkeleton.convert_angles_to_dict", time_per_call(skeleton.convert_angles_to_dict, angles))
+
+
+# === Corpus golden ===
+def golden_inputs():
+    """
+    Corpus determinístico: todos os limites de escalão por ângulo, combinações
+    de ajustes um a um, cargas e um conjunto aleatório com seed fixa.
+    """
+    neutral = {"upper_arm_angle": 10, "lower_arm_angle": 80, "forearm_angle": 80,
+               "wrist_angle": 5, "neck_angle": 10, "trunk_angle": 5}
+    inputs = []
+    for name in neutral:
+        for angle in BOUNDARY_ANGLES:
+            inputs.append(dict(neutral, **{name: angle}, ajustes={}))
+    for flag in sorted(set(REBA_FLAG_FIELDS + RULA_FLAG_FIELDS)):
+        inputs.append(dict(neutral, ajustes={flag: flag != "feet_supported"}))
+    for twist in (1, 2):
+        inputs.append(dict(neutral, ajustes={"wrist_twist": twist}))
+    for load in LOADS:
+        inputs.append(dict(neutral, carga_peso=load, ajustes={}))
+
+    rng = np.random.default_rng(2024)
+    for data in synthetic_angle_dicts(120, rng):
+        inputs.append({k: v for k, v in data.items() if k in neutral or k in ("carga_peso", "ajustes")})
+    return inputs
+
+
+def score_case(data):
+    reba_score, reba_table = compute_reba_score(data)
+    rula_score, rula_table = compute_rula_score(data)
+    return {"reba_score": reba_score, "reba_table": reba_table,
+            "rula_score": rula_score, "rula_table": rula_table}
+
+
+def write_golden(path):
+    cases = [{"input": data, "expected": score_case(data)} for data in golden_inputs()]
+    # um caso por linha para diffs legíveis
+    with open(path, "w") as fh:
+        fh.write("[\n" + ",\n".join(json.dumps(case) for case in cases) + "\n]\n")
+    logger.info(f"{len(cases)} casos escritos em {path}")
+
+
+def check_golden(path):
+    with open(path, "r") as fh:
+        cases = json.load(fh)
+
+    failures = 0
+    inputs = [case["input"] for case in cases]
+    reba_final, reba_tables = compute_reba_scores_batch(reba_inputs_to_batch(inputs))
+    rula_final, rula_tables = compute_rula_scores_batch(rula_inputs_to_batch(inputs))
+    for i, case in enumerate(cases):
+        expected = case["expected"]
+        batch = {
+            "reba_score": int(reba_final[i]),
+            "reba_table": {k: int(v[i]) for k, v in reba_tables.items()},
+            "rula_score": int(rula_final[i]),
+            "rula_table": {k: int(v[i]) for k, v in rula_tables.items()},
+        }
+        for label, got in (("escalar", score_case(case["input"])), ("lote", batch)):
+            if got != expected:
+                failures += 1
+                logger.error(f"Caso {i} ({label}) difere: input={case['input']} "
+                             f"esperado={expected} obtido={got}")
+
+    if failures:
+        logger.error(f"Golden: {failures} falhas em {len(cases)} casos")
+        return False
+    logger.info(f"Golden: {len(cases)} casos OK (escalar e lote)")
+    return True
+
+
+# === Main ===
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark e corpus golden do scoring REBA/RULA")
+    parser.add_argument("--poses", type=int, default=20000, help="número de poses sintéticas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--golden", type=Path, default=GOLDEN_PATH)
+    parser.add_argument("--check-only", action="store_true", help="só valida o corpus golden")
+    parser.add_argument("--write-golden", action="store_true",
+                        help="regenera o corpus golden com a implementação atual")
+    args = parser.parse_args()
+
+    if args.write_golden:
+        write_golden(args.golden)
+        return
+
+    if not check_golden(args.golden):
+        sys.exit(1)
+    if not args.check_only:
+        run_benchmark(args.poses, args.seed)
+
+
+if __name__ == "__main__":
+    main()
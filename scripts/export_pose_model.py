@@ -0,0 +1,130 @@
+import sys
+import time
+import logging
+import argparse
+import cv2
+import numpy as np
+from pathlib import Path
+
+# === Diretórios ===
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from ergosafe.streaming.backends import create_backend
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("ExportPoseModel")
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def export_models(model_path, imgsz, formats):
+    """
+    Exporta o modelo .pt com o ultralytics; devolve {backend: caminho exportado}.
+    """
+    from ultralytics import YOLO
+
+    exported = {}
+    for backend, fmt in (("onnx", "onnx"), ("openvino", "openvino")):
+        if backend not in formats:
+            continue
+        path = Path(YOLO(model_path).export(format=fmt, imgsz=imgsz))
+        if path.is_dir():
+            path = next(path.glob("*.xml"))
+        logger.info(f"Exportado {backend}: {path}")
+        exported[backend] = str(path)
+    return exported
+
+
+def load_frames(source, count, frame_shape=(720, 1280, 3)):
+    """
+    Frames de uma pasta de imagens ou de um vídeo; sem source, frames
+    sintéticos (só servem para latência, não para comparar keypoints).
+    """
+    if source is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, size=frame_shape, dtype=np.uint8) for _ in range(count)]
+
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(p for p in source.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:count]
+        return [cv2.imread(str(p)) for p in paths]
+
+    cap = cv2.VideoCapture(str(source))
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def benchmark(backend, frames, warmup):
+    for frame in frames[:warmup]:
+        backend.predict([frame])
+    latencies, keypoints = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        keypoints.append(backend.predict([frame])[0])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return np.array(latencies), keypoints
+
+
+def keypoint_error(reference, candidate):
+    """
+    Erro médio (píxeis) entre a pessoa principal de cada frame nos dois backends.
+    """
+    errors = []
+    for ref, cand in zip(reference, candidate):
+        if not len(ref) or not len(cand):
+            continue
+        best_ref = ref[np.argmax(ref[..., 2].mean(axis=1))]
+        best_cand = cand[np.argmax(cand[..., 2].mean(axis=1))]
+        errors.append(np.linalg.norm(best_ref[:, :2] - best_cand[:, :2], axis=-1).mean())
+    return float(np.mean(errors)) if errors else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o modelo de pose e compara a latência por backend")
+    parser.add_argument("--model", default="yolov8n-pose.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--backends", default="torch,onnx,openvino", help="lista separada por vírgulas")
+    parser.add_argument("--source", help="pasta de imagens ou vídeo (por defeito frames sintéticos)")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, help="threads do ONNX Runtime / OpenVINO")
+    parser.add_argument("--no-export", action="store_true", help="usa ficheiros já exportados ao lado do .pt")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if args.no_export:
+        stem = Path(args.model).with_suffix("")
+        exported = {"onnx": f"{stem}.onnx", "openvino": f"{stem}_openvino_model/{stem.name}.xml"}
+    else:
+        exported = export_models(args.model, args.imgsz, backends)
+
+    frames = load_frames(args.source, args.frames)
+    logger.info(f"{len(frames)} frames, warmup {args.warmup}")
+
+    reference = None
+    logger.info(f"{'backend':<10} {'média ms':>9} {'p50 ms':>8} {'p90 ms':>8} {'fps':>7} {'erro kp px':>11}")
+    for name in backends:
+        options = {"imgsz": args.imgsz, "threads": args.threads} if name != "torch" else {}
+        try:
+            backend = create_backend(name, exported.get(name, args.model), **options)
+        except ImportError as e:
+            logger.warning(f"{name}: indisponível ({e})")
+            continue
+
+        latencies, keypoints = benchmark(backend, frames, args.warmup)
+        if reference is None:
+            reference = keypoints
+        error = keypoint_error(reference, keypoints)
+        logger.info(f"{name:<10} {latencies.mean():>9.2f} {np.percentile(latencies, 50):>8.2f} "
+                    f"{np.percentile(latencies, 90):>8.2f} {1000 / latencies.mean():>7.1f} {error:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import sys
+import time
+import logging
+import argparse
+import cv2
+import numpy as np
+from pathlib import Path
+
+# === Diretórios ===
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from ergosafe.scoring.reba_score import compute_reba_scores_batch
+from ergosafe.scoring.rula_score import compute_rula_scores_batch
+from ergosafe.streaming.angles import angles_to_score_columns, compute_angles_batch
+from ergosafe.streaming.backends import OnnxBackend
+from ergosafe.streaming.people import candidates, is_scored, most_central
+from ergosafe.streaming.pose_config import POSE_INT8_MODEL_PATH
+from ergosafe.streaming.quantization import list_frames, quantize_pose_model
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("QuantizePoseModel")
+
+PCK_THRESHOLD = 0.05   # fração da diagonal da caixa da pessoa
+
+
+def select_person(keypoints, frame_shape):
+    """
+    Pessoa avaliada pelo pipeline (mesmos filtros de YoloPoseSkeleton): a mais
+    centrada entre as de confiança suficiente, e só se passar o filtro do
+    nariz que decide o scoring. None se o frame não daria scores.
+    """
+    cand = candidates(keypoints)
+    if not len(cand):
+        return None
+    person = most_central(cand, frame_shape)
+    return person if is_scored(person) else None
+
+
+def run(backend, frames, warmup):
+    for frame in frames[:warmup]:
+        backend.predict([frame])
+    latencies, people = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        keypoints = backend.predict([frame])[0]
+        latencies.append((time.perf_counter() - t0) * 1000)
+        people.append(select_person(keypoints, frame.shape))
+    return np.array(latencies), people
+
+
+def scores(people, frames):
+    angles = np.stack([compute_angles_batch(p[None], f.shape)[0][0] for p, f in zip(people, frames)])
+    columns = angles_to_score_columns(angles)
+    return compute_reba_scores_batch(columns)[0], compute_rula_scores_batch(columns)[0]
+
+
+def report(fp32_path, int8_path, frames_dir, limit, warmup, threads):
+    paths = list_frames(frames_dir, limit)
+    frames = [f for f in (cv2.imread(str(p)) for p in paths) if f is not None]
+    if not frames:
+        logger.error(f"Sem imagens em {frames_dir}")
+        return
+
+    fp32 = OnnxBackend(str(fp32_path), threads=threads)
+    int8 = OnnxBackend(str(int8_path), threads=threads)
+    lat_fp32, people_fp32 = run(fp32, frames, warmup)
+    lat_int8, people_int8 = run(int8, frames, warmup)
+
+    # Só frames em que os dois modelos dariam scores; as diferenças contam nos dois sentidos
+    both = [i for i, (a, b) in enumerate(zip(people_fp32, people_int8)) if a is not None and b is not None]
+    missed = sum(a is not None and b is None for a, b in zip(people_fp32, people_int8))
+    extra = sum(a is None and b is not None for a, b in zip(people_fp32, people_int8))
+
+    logger.info(f"Frames: {len(frames)}  avaliados nos dois modelos: {len(both)}  "
+                f"perdidos no INT8: {missed}  só no INT8: {extra}")
+    if both:
+        ref = np.stack([people_fp32[i] for i in both])
+        cand = np.stack([people_int8[i] for i in both])
+        error = np.linalg.norm(ref[..., :2] - cand[..., :2], axis=-1)  # (n, 17)
+        diag = np.hypot(np.ptp(ref[..., 0], axis=1), np.ptp(ref[..., 1], axis=1))[:, None]
+        logger.info(f"Erro keypoints: média {error.mean():.2f} px  p90 {np.percentile(error, 90):.2f} px  "
+                    f"PCK@{PCK_THRESHOLD}: {(error <= PCK_THRESHOLD * diag).mean() * 100:.1f}%")
+
+        sub = [frames[i] for i in both]
+        reba_fp32, rula_fp32 = scores(ref, sub)
+        reba_int8, rula_int8 = scores(cand, sub)
+        for name, a, b in (("REBA", reba_fp32, reba_int8), ("RULA", rula_fp32, rula_int8)):
+            diff = np.abs(a.astype(int) - b.astype(int))
+            logger.info(f"{name}: igual {(diff == 0).mean() * 100:.1f}%  ±1 {(diff <= 1).mean() * 100:.1f}%  "
+                        f"máx. diferença {diff.max()}")
+
+    for name, lat in (("FP32", lat_fp32), ("INT8", lat_int8)):
+        logger.info(f"Latência {name}: média {lat.mean():.2f} ms  p50 {np.percentile(lat, 50):.2f} ms  "
+                    f"p90 {np.percentile(lat, 90):.2f} ms")
+    logger.info(f"Speedup INT8: {lat_fp32.mean() / lat_int8.mean():.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantização INT8 do modelo de pose e relatório vs FP32")
+    parser.add_argument("--fp32", default="yolov8n-pose.onnx", help="modelo ONNX FP32 (scripts/export_pose_model.py)")
+    parser.add_argument("--int8", default=POSE_INT8_MODEL_PATH, help="destino do modelo quantizado")
+    parser.add_argument("--calib", required=True, help="pasta de frames para calibração")
+    parser.add_argument("--eval", help="pasta de frames para o relatório (por defeito a de calibração)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--calib-frames", type=int, default=200)
+    parser.add_argument("--eval-frames", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--quantize-head", action="store_true", help="quantiza também a cabeça Pose")
+    parser.add_argument("--report-only", action="store_true", help="não quantiza, só compara")
+    args = parser.parse_args()
+
+    if not args.report_only:
+        quantize_pose_model(args.fp32, args.int8, args.calib, imgsz=args.imgsz, limit=args.calib_frames,
+                            exclude_head=not args.quantize_head)
+    report(args.fp32, args.int8, args.eval or args.calib, args.eval_frames, args.warmup, args.threads)
+    logger.info('Para usar o modelo INT8: POSE_PRECISION = "int8" em ergosafe/streaming/pose_config.py')
+
+
+if __name__ == "__main__":
+    main()
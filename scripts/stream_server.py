@@ -5,7 +5,6 @@ import signal
 import time
 import logging
 import cv2 as cv
-import numpy as np
 import multiprocessing as mp
 from pathlib import Path
 from flask import Flask, Response
@@ -14,6 +13,10 @@ from mediapipe.tasks.python.vision import PoseLandmarker, PoseLandmarkerOptions,
 from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ergosafe.streaming.gstreamer import build_pipeline
+from ergosafe.streaming.latest_frame import SharedLatestFrame
+
 # === Logging ===
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("RTSP_Mediapipe")
@@ -48,10 +51,10 @@ options = PoseLandmarkerOptions(
 )
 landmarker = PoseLandmarker.create_from_options(options)
 
-# === Shared Queue and Handler ===
-frame_queue = mp.Queue(maxsize=5)
+# === Ring de frames partilhado (captura -> processamento, sem JPEG) ===
+FRAME_SHAPE = (1080, 1080, 3)  # recorte central
+RING_SLOTS = 4
 
-display_queue = mp.Queue(maxsize=1)  # última frame anotada
 
 
 # === Enviar landmarks para InfluxDB ===
@@ -87,17 +90,22 @@ def generate_stream():
         else:
             time.sleep(0.01)
 
-# === Processar frame da queue ===
-def process_frames(frame_id, display_queue):
+# === Processar frames do ring ===
+def process_frames(frame_id, ring_name, ring_condition, display_name, display_condition):
+    ring = SharedLatestFrame.attach(ring_name, ring_condition)
+    display = SharedLatestFrame.attach(display_name, display_condition)
+    seq = 0
     while True:
-        if not frame_queue.empty():
-            jpeg_bytes = frame_queue.get()
-            frame = cv.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv.IMREAD_COLOR)
-            if frame is None:
+        # Acordado pela captura a cada frame novo
+        seq, view, _ = ring.wait(seq, timeout=1.0)
+        if view is not None:
+            # Pose (cvtColor lê diretamente da memória partilhada)
+            rgb = cv.cvtColor(view, cv.COLOR_BGR2RGB)
+            if not ring.valid(seq):
+                continue  # slot reescrito durante a leitura
+            frame = view.copy()  # cópia local só para anotar
+            if not ring.valid(seq):
                 continue
-
-            # Pose
-            rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
             mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
             timestamp_ms = int(time.time() * 1000)
             result = landmarker.detect_for_video(mp_image, timestamp_ms)
@@ -109,36 +117,30 @@ def process_frames(frame_id, display_queue):
                     y = int(landmark.y * frame.shape[0])
                     cv.circle(frame, (x, y), 3, (0, 255, 0), -1)
 
-            # Envia para Flask
-            success, jpg = cv.imencode('.jpg', frame)
-            if success:
-                if not display_queue.full():
-                    display_queue.put(jpg.tobytes())
-        else:
-            time.sleep(0.01)
+            # Último frame anotado para o Flask
+            display.put(frame)
 
 # === Classe para captura da câmara ===
 class Video:
-    def __init__(self, cam_name, url_cam):
+    def __init__(self, cam_name, url_cam, ring_name, ring_condition):
         self.cam_name = cam_name
         self.url_cam = url_cam
-        self.cap = self.init_gstreamer_capture()
+        self.ring_name = ring_name
+        self.ring_condition = ring_condition
         self.running = True
         self.crop_width = 1080
         self.crop_height = 1080
         self.width = 1920
         self.height = 1080
-        self.mid_x = self.width // 2
-        self.mid_y = self.height // 2
-        self.cw2 = self.crop_width // 2
-        self.ch2 = self.crop_height // 2
+        self.fps = 20
+        self.cap = self.init_gstreamer_capture()
 
     def init_gstreamer_capture(self):
-        pipeline = (
-            f"rtspsrc location={self.url_cam} latency=0 ! "
-            "rtph264depay ! h264parse ! avdec_h264 ! videoconvert ! "
-            "video/x-raw,format=BGR ! appsink drop=1 max-buffers=1 sync=false"
-        )
+        # Recorte central e limite de FPS no pipeline (videocrop / videorate)
+        margin_x = (self.width - self.crop_width) // 2
+        margin_y = (self.height - self.crop_height) // 2
+        pipeline = build_pipeline(self.url_cam, fps=self.fps,
+                                  crop=(margin_x, margin_x, margin_y, margin_y))
         cap = cv.VideoCapture(pipeline, cv.CAP_GSTREAMER)
         return cap if cap.isOpened() else None
 
@@ -147,41 +149,39 @@ class Video:
             raise RuntimeError(f"[Video] Erro ao abrir stream: {self.cam_name}")
 
         logger.info(f"[{self.cam_name}] Câmara iniciada.")
+        ring = SharedLatestFrame.attach(self.ring_name, self.ring_condition)
         while self.running:
-            ret, frame = self.cap.read()
+            # Frame já recortado, descodificado diretamente no slot do ring
+            slot = ring.next_slot()
+            ret, frame = self.cap.read(slot)
             if not ret:
                 logger.warning(f"[{self.cam_name}] Frame não lido")
                 time.sleep(0.1)
                 continue
-
-            cropped = frame[
-                self.mid_y - self.ch2:self.mid_y + self.ch2,
-                self.mid_x - self.cw2:self.mid_x + self.cw2
-            ]
-            success, jpg = cv.imencode('.jpg', cropped)
-            if success:
-                try:
-                    frame_queue.put_nowait(jpg.tobytes())
-                except:
-                    pass
-            time.sleep(0.05)
+            if frame is not slot:
+                cv.resize(frame, (self.crop_width, self.crop_height), dst=slot)
+            ring.commit()
             
             
-def start_flask(display_queue):
+def start_flask(display_name, display_condition):
     app = Flask(__name__)
+    display = SharedLatestFrame.attach(display_name, display_condition)
 
     @app.route('/video_feed')
     def video_feed():
-        return Response(generate_stream(display_queue), mimetype='multipart/x-mixed-replace; boundary=frame')
+        return Response(generate_stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
-    def generate_stream(queue):
+    def generate_stream():
+        seq = 0
         while True:
-            if not queue.empty():
-                jpeg = queue.get()
+            # Espera pelo próximo frame anotado (sem polling)
+            seq, frame, _ = display.wait(seq, timeout=1.0)
+            if frame is None:
+                continue
+            success, jpeg = cv.imencode('.jpg', frame)
+            if success and display.valid(seq):
                 yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
-            else:
-                time.sleep(0.01)
+                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg.tobytes() + b'\r\n')
 
     app.run(host='0.0.0.0', port=5050, threaded=True)
 
@@ -196,10 +196,16 @@ def main():
 
     cam_name, cam_url = next(iter(cameras.items()))
 
+    # Captura -> processamento e processamento -> Flask: último frame em memória
+    # partilhada, com uma condição para acordar quem espera
+    ring = SharedLatestFrame.create(FRAME_SHAPE, mp.Condition(), slots=RING_SLOTS)
+    display = SharedLatestFrame.create(FRAME_SHAPE, mp.Condition(), slots=RING_SLOTS)
+
     # Lançar processos
-    capture_proc = mp.Process(target=Video(cam_name, cam_url).run)
-    process_proc = mp.Process(target=process_frames, args=(cam_name, display_queue))
-    flask_proc = mp.Process(target=start_flask, args=(display_queue,))
+    capture_proc = mp.Process(target=Video(cam_name, cam_url, ring.name, ring.condition).run)
+    process_proc = mp.Process(target=process_frames,
+                              args=(cam_name, ring.name, ring.condition, display.name, display.condition))
+    flask_proc = mp.Process(target=start_flask, args=(display.name, display.condition))
 
     capture_proc.start()
     process_proc.start()
@@ -214,6 +220,8 @@ def main():
         for p in [capture_proc, process_proc, flask_proc]:
             p.terminate()
             p.join()
+        ring.close()
+        display.close()
 
 
 if __name__ == "__main__":
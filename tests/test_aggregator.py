@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from ergosafe.streaming.aggregator import ScoreAggregator, ScoreHistogram
+
+
+def feed(aggregator, scores, times=None):
+    emitted = []
+    for i, score in enumerate(scores):
+        now = times[i] if times is not None else None
+        summary = aggregator.update({"reba": score}, {"reba": {"frame": i}}, now=now)
+        if summary:
+            emitted.append((i, summary))
+    return emitted
+
+
+@pytest.mark.parametrize("q", [0, 10, 50, 90, 100])
+def test_histogram_percentile_matches_numpy(q):
+    scores = [3, 7, 1, 12, 5, 5, 9, 2]
+    histogram = ScoreHistogram()
+    for score in scores:
+        histogram.add(score)
+    assert histogram.percentile(q) == pytest.approx(np.percentile(scores, q))
+
+
+def test_tumbling_frames_emits_at_each_window_boundary_and_resets():
+    aggregator = ScoreAggregator(("reba",), window_frames=3)
+    emitted = feed(aggregator, [1, 2, 9, 4, 4, 5, 7])
+
+    assert [i for i, _ in emitted] == [2, 5]
+    assert emitted[0][1]["scores"] == {"reba": 2.0}
+    assert emitted[1][1]["scores"] == {"reba": 4.0}  # janela anterior não conta
+    assert emitted[1][1]["count"] == 3
+    assert emitted[1][1]["tables"] == {"reba": {"frame": 5}}  # só a última tabela
+
+
+def test_sliding_frames_emits_every_frame_once_full():
+    aggregator = ScoreAggregator(("reba",), window_frames=3, sliding=True)
+    emitted = feed(aggregator, [1, 2, 9, 4, 4, 5])
+
+    assert [i for i, _ in emitted] == [2, 3, 4, 5]
+    assert [summary["scores"]["reba"] for _, summary in emitted] == [2.0, 4.0, 4.0, 4.0]
+    assert all(summary["count"] == 3 for _, summary in emitted)
+
+
+def test_sliding_frames_emit_every():
+    aggregator = ScoreAggregator(("reba",), window_frames=2, sliding=True, emit_every=2)
+    emitted = feed(aggregator, [1, 1, 1, 1, 1, 1])
+    assert [i for i, _ in emitted] == [1, 3, 5]
+
+
+def test_tumbling_time_window_closes_after_window_seconds():
+    aggregator = ScoreAggregator(("reba",), window_seconds=1.0)
+    emitted = feed(aggregator, [1, 3, 5, 2, 8], times=[0.0, 0.4, 0.99, 1.0, 1.5])
+
+    assert [i for i, _ in emitted] == [3]
+    assert emitted[0][1]["count"] == 4
+    # A janela seguinte começa no frame que fechou a anterior
+    assert feed(aggregator, [6], times=[1.99]) == []
+    assert [i for i, _ in feed(aggregator, [6], times=[2.0])] == [0]
+
+
+def test_sliding_time_window_expires_old_buckets():
+    aggregator = ScoreAggregator(("reba",), window_seconds=1.0, sliding=True, time_buckets=10)
+    feed(aggregator, [12] * 5, times=[0.0, 0.1, 0.2, 0.3, 0.4])
+    emitted = feed(aggregator, [1] * 10, times=[1.0 + 0.1 * i for i in range(10)])
+
+    assert emitted, "a janela já tinha window_seconds"
+    last = emitted[-1][1]
+    # Aos 1.9 s os scores 12 (0.0-0.4 s) já saíram da janela
+    assert last["scores"] == {"reba": 1.0}
+    assert last["count"] == 10
+
+
+def test_emit_on_change_suppresses_repeated_summaries():
+    aggregator = ScoreAggregator(("reba",), window_frames=2, emit_on_change=True)
+    emitted = feed(aggregator, [3, 3, 3, 3, 5, 5, 5, 5])
+    assert [(i, summary["scores"]["reba"]) for i, summary in emitted] == [(1, 3.0), (5, 5.0)]
+
+
+def test_mode_and_percentile_statistics():
+    mode = ScoreAggregator(("reba",), window_frames=5, statistic="mode")
+    assert feed(mode, [2, 7, 7, 3, 7])[0][1]["scores"] == {"reba": 7}
+
+    p90 = ScoreAggregator(("reba",), window_frames=5, statistic=90)
+    assert feed(p90, [1, 2, 3, 4, 10])[0][1]["scores"]["reba"] == pytest.approx(np.percentile([1, 2, 3, 4, 10], 90))
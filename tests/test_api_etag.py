@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlmodel")
+
+from ergosafe.api.main import _etag_matches  # noqa: E402
+
+ETAG = '"1-42"'
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('"1-42"', True),
+    ('W/"1-42"', True),
+    ('"1-41", W/"1-42"', True),
+    ('"1-41","1-42"', True),
+    ("*", True),
+    ('"1-41"', False),
+    ('"1-4"', False),
+])
+def test_if_none_match(header, expected):
+    assert _etag_matches(header, ETAG) is expected
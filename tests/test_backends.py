@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ergosafe.streaming.backends import ExportedPoseBackend, PoseBackend, create_backend
+
+
+def test_incomplete_backends_fail_at_creation():
+    class NoPredict(PoseBackend):
+        pass
+
+    class NoInfer(ExportedPoseBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        NoPredict()
+    with pytest.raises(TypeError):
+        NoInfer()
+
+
+def test_exported_backend_decodes_keypoints_to_frame_coordinates():
+    class OnePerson(ExportedPoseBackend):
+        def _infer(self, blob):
+            # Uma âncora: caixa centrada em (320, 320) no letterbox, keypoints em (320, 320)
+            output = np.zeros((blob.shape[0], 56, 1), dtype=np.float32)
+            output[:, :5, 0] = (320, 320, 100, 200, 0.9)
+            output[:, 5:, 0] = np.tile((320, 320, 0.8), 17)
+            return output
+
+    backend = OnePerson(imgsz=640)
+    keypoints = backend.predict([np.zeros((480, 640, 3), np.uint8)])[0]
+    assert keypoints.shape == (1, 17, 3)
+    # 640x480 -> letterbox 640x640 com 80 px de margem em cima: centro (320, 240) no frame
+    assert np.allclose(keypoints[0, :, :2], (320, 240))
+    assert np.allclose(keypoints[0, :, 2], 0.8)
+
+
+def test_create_backend_returns_instances_as_is_and_rejects_unknown_names():
+    class Dummy(PoseBackend):
+        def predict(self, frames, imgsz=None):
+            return []
+
+    dummy = Dummy()
+    assert create_backend(dummy) is dummy
+    with pytest.raises(ValueError):
+        create_backend("tensorrt")
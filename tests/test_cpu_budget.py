@@ -0,0 +1,57 @@
+import os
+import threading
+
+import pytest
+
+from ergosafe.streaming.cpu_budget import _split, apply_thread_budget, plan_layout
+
+
+@pytest.mark.parametrize("n_cores, weights", [
+    (4, [1, 1, 1, 3]),
+    (4, [1, 5]),
+    (7, [2, 1, 1]),
+    (3, [1, 1, 1]),
+    (8, [1, 1, 1, 1, 1, 1, 1, 10]),
+])
+def test_split_uses_every_core_with_at_least_one_per_block(n_cores, weights):
+    cores = list(range(n_cores))
+    blocks = _split(cores, weights)
+    assert len(blocks) == len(weights)
+    assert all(len(block) >= 1 for block in blocks)
+    assert sum(blocks, []) == cores
+
+
+def test_split_more_blocks_than_cores_shares_cores():
+    blocks = _split([0, 1], [1, 1, 1])
+    assert blocks == [[0], [1], [0]]
+
+
+def test_plan_layout_uneven_cameras_gives_every_busy_worker_a_core():
+    layout = plan_layout("processes", [[1], [2], [3], [4, 5, 6]], cores=list(range(5)))
+    assert layout[0]["process"] == "api" and layout[0]["cores"] == [0]
+    workers = layout[1:]
+    assert all(worker["cores"] and worker["torch_threads"] >= 1 for worker in workers)
+    assert sorted(sum((worker["cores"] for worker in workers), [])) == [1, 2, 3, 4]
+
+
+def test_plan_layout_gives_more_cores_to_busier_workers():
+    layout = plan_layout("processes", [[1], [2, 3, 4]], cores=list(range(5)))
+    assert [len(worker["cores"]) for worker in layout[1:]] == [1, 3]
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="sem sched_setaffinity")
+def test_apply_thread_budget_pins_existing_threads():
+    original = os.sched_getaffinity(0)
+    target = {min(original)}
+    started, stop = threading.Event(), threading.Event()
+    thread = threading.Thread(target=lambda: (started.set(), stop.wait()))
+    thread.start()
+    started.wait()
+    try:
+        apply_thread_budget(cores=target)
+        assert os.sched_getaffinity(thread.native_id) == target
+        assert os.sched_getaffinity(0) == target
+    finally:
+        stop.set()
+        thread.join()
+        apply_thread_budget(cores=original)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("influxdb_client")
+
+from ergosafe.streaming.inference import YoloPoseSkeleton  # noqa: E402
+
+
+class FakePoseServer:
+    """
+    Pessoa parada no centro do frame, com confiança alta em todos os keypoints.
+    """
+
+    backend = None
+
+    def __init__(self):
+        self.calls = 0
+        rng = np.random.default_rng(0)
+        xy = np.column_stack([rng.uniform(250, 390, 17), rng.uniform(100, 400, 17)])
+        self.keypoints = np.concatenate([xy, np.full((17, 1), 0.95)], axis=1)[None].astype(np.float32)
+
+    def predict(self, key, frame, imgsz=None):
+        self.calls += 1
+        return self.keypoints
+
+
+def make_detector(annotate=True):
+    server = FakePoseServer()
+    detector = YoloPoseSkeleton(pose_server=server, motion_gate={"max_reuse_age": 3600}, annotate=annotate,
+                                aggregation={"window_frames": 5})
+    sent = []
+    detector._send_data_async = lambda *args, **kwargs: sent.append(args)
+    return detector, server, sent
+
+
+def test_still_frames_keep_feeding_the_aggregator():
+    detector, server, sent = make_detector()
+    frame = np.full((480, 640, 3), 40, np.uint8)
+
+    for _ in range(20):
+        detector.detect_and_compute_angles(frame.copy())
+
+    assert server.calls == 1  # inferência só no primeiro frame
+    assert detector.motion_gate.stats["skipped"] == 19
+    assert len(sent) == 4  # 20 frames / janela de 5: a postura parada continua a ser emitida
+
+
+def test_skipped_frame_returns_current_image_with_previous_overlay():
+    detector, _, _ = make_detector()
+    first = np.full((480, 640, 3), 40, np.uint8)
+    _, annotated_first = detector.detect_and_compute_angles(first)
+
+    current = first.copy()
+    current[0, 0] = 41  # mudança abaixo do limiar do MotionGate
+    angles, annotated = detector.detect_and_compute_angles(current)
+
+    assert detector.motion_gate.stats["skipped"] == 1
+    assert annotated is not annotated_first and annotated is not current
+    assert tuple(annotated[0, 0]) == (41, 41, 41)  # imagem atual
+    assert np.array_equal(annotated[1:], annotated_first[1:])  # com o mesmo desenho
+    assert len(angles) == 1
+
+
+def test_skipped_frame_without_annotation_returns_current_frame():
+    detector, _, _ = make_detector(annotate=False)
+    frame = np.full((480, 640, 3), 40, np.uint8)
+    detector.detect_and_compute_angles(frame)
+    current = frame.copy()
+    _, returned = detector.detect_and_compute_angles(current)
+    assert returned is current
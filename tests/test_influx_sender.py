@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+pytest.importorskip("influxdb_client")
+
+from ergosafe.influx.sender import EmissionSender  # noqa: E402
+
+
+class GatedSend:
+    """
+    send falso: regista as emissões; a primeira espera pelo gate (InfluxDB lento).
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.done = threading.Condition()
+
+    def __call__(self, **emission):
+        self.started.set()
+        if not self.sent:
+            self.gate.wait(5)
+        with self.done:
+            self.sent.append(emission)
+            self.done.notify_all()
+
+    def wait_for(self, n):
+        with self.done:
+            return self.done.wait_for(lambda: len(self.sent) >= n, 5)
+
+
+def test_repeated_keys_coalesce_to_latest_emission():
+    send = GatedSend()
+    sender = EmissionSender(send=send)
+    try:
+        sender.submit("cam1", frame=0)
+        assert send.started.wait(2)  # primeira emissão presa no envio
+        for frame in range(1, 6):
+            sender.submit("cam1", frame=frame)
+        sender.submit("cam2", frame=100)
+        sender.submit("cam1", frame=6)
+        assert sender.get_stats()["pending"] == 2
+
+        send.gate.set()
+        assert send.wait_for(3)
+    finally:
+        sender.close()
+
+    # cam1 mantém o lugar na fila (antes de cam2) com os dados mais recentes
+    assert send.sent == [{"frame": 0}, {"frame": 6}, {"frame": 100}]
+    stats = sender.get_stats()
+    assert stats["submitted"] == 8 and stats["replaced"] == 5 and stats["sent"] == 3 and stats["pending"] == 0
+
+
+def test_new_keys_are_dropped_when_pending_is_full():
+    send = GatedSend()
+    sender = EmissionSender(send=send, max_pending=2)
+    try:
+        sender.submit("busy", frame=0)
+        assert send.started.wait(2)
+        assert sender.submit("a", frame=1)
+        assert sender.submit("b", frame=1)
+        assert not sender.submit("c", frame=1)
+        assert sender.submit("a", frame=2)  # chave já pendente: substitui, não descarta
+        send.gate.set()
+        assert send.wait_for(3)
+    finally:
+        sender.close()
+    assert sender.get_stats()["dropped"] == 1
+    assert send.sent[1:] == [{"frame": 2}, {"frame": 1}]
+
+
+def test_failed_send_is_counted_and_thread_keeps_running():
+    sent = []
+
+    def send(**emission):
+        if emission["frame"] == 0:
+            raise ConnectionError("influx em baixo")
+        sent.append(emission)
+
+    sender = EmissionSender(send=send)
+    sender.submit("cam1", frame=0)
+    sender.submit("cam2", frame=1)
+    sender.close()
+    assert sent == [{"frame": 1}]
+    stats = sender.get_stats()
+    assert stats["failed"] == 1 and stats["sent"] == 1
+
+
+def test_close_drains_pending_emissions():
+    sent = []
+    sender = EmissionSender(send=lambda **emission: sent.append(emission))
+    for camera in range(10):
+        sender.submit(camera, frame=camera)
+    sender.close()
+    assert sorted(emission["frame"] for emission in sent) == list(range(10))
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from ergosafe.influx import writer as writer_module
+from ergosafe.influx.spool import LineSpool
+from ergosafe.influx.writer import InfluxBatchWriter
+
+
+class FakeWriteApi:
+    """
+    Guarda os lotes recebidos; com gate, cada escrita espera até o gate abrir.
+    """
+
+    def __init__(self, gate=None, fail=False):
+        self.batches = []
+        self.gate = gate
+        self.fail = fail
+        self.started = threading.Event()
+
+    def write(self, bucket, record):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise ConnectionError("influx em baixo")
+        self.batches.append(list(record))
+
+
+def lines(prefix, n):
+    return [f"{prefix} v={i}" for i in range(n)]
+
+
+def test_sends_full_batches_and_flushes_remainder():
+    api = FakeWriteApi()
+    writer = InfluxBatchWriter(api, batch_size=3, flush_interval=60, max_queued=100)
+    try:
+        writer.write(lines("a", 4))
+        writer.write(lines("b", 3))
+        assert writer.flush(timeout=5)
+    finally:
+        writer.close()
+
+    assert [len(batch) for batch in api.batches] == [3, 3, 1]
+    assert sum(api.batches, []) == lines("a", 4) + lines("b", 3)
+    stats = writer.get_stats()
+    assert stats["flushed"] == 7 and stats["batches"] == 3 and stats["pending"] == 0
+
+
+def test_flush_interval_sends_partial_batch():
+    api = FakeWriteApi()
+    writer = InfluxBatchWriter(api, batch_size=1000, flush_interval=0.05, max_queued=100)
+    try:
+        writer.write(lines("a", 2))
+        assert api.started.wait(2)
+    finally:
+        writer.close()
+    assert api.batches == [lines("a", 2)]
+
+
+def fill_while_backend_stuck(policy, max_queued=4):
+    # O primeiro lote fica preso no backend; as emissões seguintes só cabem na fila
+    gate = threading.Event()
+    api = FakeWriteApi(gate=gate)
+    writer = InfluxBatchWriter(api, batch_size=2, flush_interval=60, max_queued=max_queued, policy=policy)
+    writer.write(lines("first", 2))
+    assert api.started.wait(2)
+    return gate, api, writer
+
+
+def test_drop_policy_counts_discarded_lines():
+    gate, api, writer = fill_while_backend_stuck("drop")
+    try:
+        accepted = [writer.write(lines(f"e{i}", 2)) for i in range(4)]
+        assert accepted == [True, True, False, False]
+        assert writer.get_stats()["dropped"] == 4
+    finally:
+        gate.set()
+        writer.close()
+    assert sum(len(batch) for batch in api.batches) == 6
+
+
+def test_block_policy_waits_for_room(monkeypatch):
+    monkeypatch.setattr(writer_module, "BLOCK_TIMEOUT", 5.0)
+    gate, api, writer = fill_while_backend_stuck("block")
+    try:
+        writer.write(lines("e0", 2))
+        writer.write(lines("e1", 2))
+        result = []
+        producer = threading.Thread(target=lambda: result.append(writer.write(lines("e2", 2))))
+        producer.start()
+        producer.join(0.2)
+        assert producer.is_alive()  # fila cheia: o produtor espera
+        gate.set()
+        producer.join(5)
+        assert result == [True]
+        assert writer.flush(timeout=5)
+    finally:
+        gate.set()
+        writer.close()
+    assert writer.get_stats()["dropped"] == 0
+    assert sum(len(batch) for batch in api.batches) == 8
+
+
+def test_block_policy_drops_after_timeout(monkeypatch):
+    monkeypatch.setattr(writer_module, "BLOCK_TIMEOUT", 0.05)
+    gate, _, writer = fill_while_backend_stuck("block", max_queued=2)
+    try:
+        assert writer.write(lines("e0", 2))
+        assert not writer.write(lines("e1", 2))
+        assert writer.get_stats()["dropped"] == 2
+    finally:
+        gate.set()
+        writer.close()
+
+
+def test_failed_batches_go_to_spool(tmp_path):
+    spool = LineSpool(tmp_path, segment_bytes=1 << 20, max_bytes=1 << 30)
+    writer = InfluxBatchWriter(FakeWriteApi(fail=True), batch_size=2, flush_interval=60, spool=spool,
+                               retry_interval=60)
+    try:
+        writer.write(lines("a", 2))
+        assert writer.flush(timeout=5)
+        stats = writer.get_stats()
+    finally:
+        writer.close()
+    assert stats["spooled"] == 2 and stats["failed"] == 0 and stats["backend_down"]
+    assert spool.pending_bytes() > 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        InfluxBatchWriter(FakeWriteApi(), policy="wait")
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ergosafe.streaming.jpeg import EncodedFrameCache
+
+
+def fake_encoder(calls, delay=0.0):
+    def encode(frame, quality):
+        calls.append((frame.shape, quality))
+        time.sleep(delay)
+        return f"{frame.shape[1]}x{frame.shape[0]}@{quality}".encode()
+    return encode
+
+
+def test_each_variant_is_encoded_once_under_concurrent_requests():
+    calls = []
+    cache = EncodedFrameCache(encoder=fake_encoder(calls, delay=0.05))
+    frame = np.zeros((480, 640, 3), np.uint8)
+    results = []
+    barrier = threading.Barrier(20)
+
+    def request(width):
+        barrier.wait()
+        results.append(cache.get(1, 7, frame, 80, width))
+
+    threads = [threading.Thread(target=request, args=((None, 320)[i % 2],)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == [((240, 320, 3), 80), ((480, 640, 3), 80)]
+    assert sorted(set(results)) == [b"320x240@80", b"640x480@80"]
+    assert cache.pending == {}
+
+
+def test_failed_encode_does_not_leave_pending_lock():
+    attempts = []
+
+    def encode(frame, quality):
+        attempts.append(quality)
+        if len(attempts) == 1:
+            raise RuntimeError("codificador falhou")
+        return b"jpeg"
+
+    cache = EncodedFrameCache(encoder=encode)
+    frame = np.zeros((4, 4, 3), np.uint8)
+    with pytest.raises(RuntimeError):
+        cache.get(1, 1, frame, 80)
+    assert cache.pending == {}
+    assert cache.get(1, 1, frame, 80) == b"jpeg"
+    assert cache.get(1, 1, frame, 80) == b"jpeg"
+    assert len(attempts) == 2
+
+
+def test_keeps_only_the_most_recent_frames_per_camera():
+    calls = []
+    cache = EncodedFrameCache(encoder=fake_encoder(calls), cached_frames=2)
+    frame = np.zeros((4, 4, 3), np.uint8)
+    for seq in (1, 2, 3):
+        cache.get(1, seq, frame, 80)
+    assert sorted(cache.frames[1]) == [2, 3]
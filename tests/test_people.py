@@ -0,0 +1,28 @@
+import numpy as np
+
+from ergosafe.streaming.people import candidates, is_scored, most_central
+
+
+def person(x, y, conf=0.9, nose_conf=None):
+    keypoints = np.zeros((17, 3), dtype=np.float32)
+    keypoints[:, 0], keypoints[:, 1], keypoints[:, 2] = x, y, conf
+    if nose_conf is not None:
+        keypoints[0, 2] = nose_conf
+    return keypoints
+
+
+def test_candidates_keeps_people_with_enough_mean_confidence():
+    people = np.stack([person(10, 10, conf=0.9), person(20, 20, conf=0.5), person(30, 30, conf=0.7)])
+    assert candidates(people)[:, 0, 0].tolist() == [10, 30]
+    assert candidates(None).shape == (0, 17, 3)
+    assert candidates(np.zeros((0, 17, 3))).shape == (0, 17, 3)
+
+
+def test_most_central_picks_closest_to_frame_center():
+    people = np.stack([person(10, 10), person(330, 250), person(600, 400)])
+    assert most_central(people, (480, 640, 3))[0, 0] == 330
+
+
+def test_nose_gate():
+    assert is_scored(person(0, 0, nose_conf=0.71))
+    assert not is_scored(person(0, 0, nose_conf=0.7))
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from ergosafe.influx.score_cache import LatestScoreCache
+
+CAMERA, OPERATOR = "camera_1", "user_7"
+
+
+class CountingQuery:
+    def __init__(self, result=None, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, measurement, camera, operator):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+def test_published_tables_are_served_without_querying():
+    query = CountingQuery()
+    cache = LatestScoreCache(query=query, ttl=5, max_age=60)
+    cache.publish(CAMERA, OPERATOR, {"reba_table": {"trunk": 3}, "rula_table": {"neck": 2}})
+
+    assert cache.get("reba_table", CAMERA, OPERATOR) == {"trunk": 3.0}
+    assert cache.get("rula_table", CAMERA, OPERATOR) == {"neck": 2.0}
+    assert query.calls == 0
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_older_publication_does_not_replace_newer():
+    cache = LatestScoreCache(ttl=5, max_age=60)
+    now = time.time()
+    cache.publish(CAMERA, OPERATOR, {"reba_table": {"trunk": 4}}, timestamp=now)
+    cache.publish(CAMERA, OPERATOR, {"reba_table": {"trunk": 1}}, timestamp=now - 1)
+    assert cache.peek("reba_table", CAMERA, OPERATOR) == {"trunk": 4.0}
+
+
+def test_stale_publication_falls_back_to_query():
+    query = CountingQuery(result={"trunk": 9.0})
+    cache = LatestScoreCache(query=query, ttl=5, max_age=10)
+    cache.publish(CAMERA, OPERATOR, {"reba_table": {"trunk": 1}}, timestamp=time.time() - 11)
+
+    assert cache.get("reba_table", CAMERA, OPERATOR) == {"trunk": 9.0}
+    assert query.calls == 1
+
+
+def test_query_result_is_cached_for_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    query = CountingQuery(result={"trunk": 2.0})
+    cache = LatestScoreCache(query=query, ttl=5, max_age=60)
+
+    for _ in range(3):
+        assert cache.get("reba_table", CAMERA, OPERATOR) == {"trunk": 2.0}
+    assert query.calls == 1
+    clock[0] += 4.9
+    cache.get("reba_table", CAMERA, OPERATOR)
+    assert query.calls == 1
+    clock[0] += 0.2  # TTL expirado
+    cache.get("reba_table", CAMERA, OPERATOR)
+    assert query.calls == 2
+
+
+def test_empty_query_results_are_cached_too():
+    query = CountingQuery(result={})
+    cache = LatestScoreCache(query=query, ttl=5, max_age=60)
+    assert cache.get("reba_table", CAMERA, OPERATOR) == {}
+    assert cache.get("reba_table", CAMERA, OPERATOR) == {}
+    assert query.calls == 1
+
+
+def test_concurrent_misses_share_one_query_per_key():
+    query = CountingQuery(result={"trunk": 5.0}, delay=0.1)
+    cache = LatestScoreCache(query=query, ttl=5, max_age=60)
+    results = []
+    barrier = threading.Barrier(40)
+
+    def reader(measurement):
+        barrier.wait()
+        results.append(cache.get(measurement, CAMERA, OPERATOR))
+
+    threads = [threading.Thread(target=reader, args=(("reba_table", "rula_table")[i % 2],)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert query.calls == 2  # uma consulta por (measurement, câmara, operador)
+    assert results == [{"trunk": 5.0}] * 40
+    assert cache.get_stats()["queries"] == 2
@@ -0,0 +1,33 @@
+import os
+
+from ergosafe.influx.spool import LineSpool
+
+
+def test_recovers_segments_left_by_a_previous_run_with_the_same_pid(tmp_path):
+    pid = os.getpid()
+    (tmp_path / f"{pid}-100-1.open").write_text("a 1\nb 2\n")
+    (tmp_path / f"{pid}-101-1.replaying-{pid}").write_text("c 3\n")
+
+    spool = LineSpool(tmp_path, segment_bytes=1 << 20, max_bytes=1 << 30)
+    assert spool.pending_bytes() == 12
+
+    sent = []
+    assert spool.replay(sent.extend, batch_lines=10) == 3
+    assert sent == ["a 1", "b 2", "c 3"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_replay_keeps_segment(tmp_path):
+    spool = LineSpool(tmp_path, segment_bytes=1 << 20, max_bytes=1 << 30)
+    spool.append(["a 1", "b 2"])
+
+    def fail(lines):
+        raise ConnectionError("influx em baixo")
+
+    try:
+        spool.replay(fail, batch_lines=10)
+    except ConnectionError:
+        pass
+    sent = []
+    assert spool.replay(sent.extend, batch_lines=10) == 2
+    assert sent == ["a 1", "b 2"]